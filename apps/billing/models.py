@@ -3,6 +3,8 @@ from django.db import models
 from decimal import Decimal
 from apps.authentication.models import Company
 from apps.bookings.models import Booking
+from core.db.routers import use_replica
+from core.tracing import annotate, traced
 
 class Invoice(models.Model):
     """Corporate invoice generation"""
@@ -113,6 +115,7 @@ class BillingCycle(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    @traced('billing.generate_invoice')
     def generate_invoice(self):
         """Generate invoice for this billing cycle"""
         if self.invoice_generated:
@@ -157,6 +160,11 @@ class BillingCycle(models.Model):
         
         # Calculate totals
         invoice.calculate_totals()
+        annotate(
+            billing__company_id=str(self.company_id),
+            billing__invoice_number=invoice.invoice_number,
+            billing__line_items=len(bookings),
+        )
         
         # Update cycle
         self.invoice = invoice
@@ -186,8 +194,9 @@ class UsageReport(models.Model):
     
     generated_at = models.DateTimeField(auto_now_add=True)
     
+    @use_replica()
     def generate_report(self):
-        """Generate usage report"""
+        """Generate usage report from a replica; the final save goes to the primary"""
         bookings = Booking.objects.filter(
             company=self.company,
             booking_start_time__date__range=[self.report_period_start, self.report_period_end],
@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+check_availability_view = views.check_availability_async if settings.ASYNC_FAST_PATH else views.check_availability
+
 urlpatterns = [
     path('', views.BookingListCreateView.as_view(), name='booking-list'),
     path('<uuid:booking_id>/', views.BookingDetailView.as_view(), name='booking-detail'),
-    path('availability/', views.check_availability, name='check-availability'),
+    path('availability/', check_availability_view, name='check-availability'),
     path('policies/', views.BookingPolicyListView.as_view(), name='booking-policies'),
     path('<uuid:booking_id>/confirm/', views.confirm_booking, name='confirm-booking'),
 ]
\ No newline at end of file
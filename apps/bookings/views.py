@@ -5,8 +5,11 @@ from django.db.models import Q
 from django.utils import timezone
 from .models import Booking, BookingPolicy
 from .serializers import BookingSerializer, BookingPolicySerializer, BookingAvailabilitySerializer
-from apps.venues.models import Venue, Space
+from apps.venues.models import Venue
+from apps.venues.cache import space_state_cache
+from apps.venues.hours import is_venue_open
 from core.permissions.rbac import IsCorporateUser
+from core.utils.async_api import async_api_view, json_response
 
 class BookingListCreateView(generics.ListCreateAPIView):
     """Booking management"""
@@ -14,7 +17,9 @@ class BookingListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Booking.objects.filter(user=user).select_related('venue', 'space', 'company')
+        queryset = Booking.objects.filter(user=user).select_related(
+            'venue', 'space', 'company'
+        ).prefetch_related('participants', 'venue__spaces')
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -42,7 +47,9 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'booking_id'
     
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        return Booking.objects.filter(user=self.request.user).select_related(
+            'venue', 'space', 'company'
+        ).prefetch_related('participants', 'venue__spaces')
     
     def perform_update(self, serializer):
         booking = self.get_object()
@@ -58,6 +65,43 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.booking_status_code = 'Cancelled'
         instance.save()
 
+def _conflict_query(candidates, data):
+    return Booking.objects.filter(
+        space_id__in=[state['space_id'] for state in candidates],
+        booking_status_code__in=['Pending', 'Confirmed'],
+        booking_start_time__lt=data['end_time'],
+        booking_end_time__gt=data['start_time']
+    ).values_list('space_id', flat=True)
+
+def _availability_candidates(venue, states, space_ids, data):
+    if data.get('space_id'):
+        return [state for state in states.values() if state['venue_id'] == venue.venue_id]
+    return [
+        states[space_id] for space_id in space_ids
+        if space_id in states and states[space_id]['availability_status'] == 'Available'
+    ]
+
+def _availability_response(venue, candidates, conflicting, data):
+    available_spaces = [
+        {
+            'space_id': state['space_id'],
+            'space_name': state['space_name'],
+            'capacity': state['capacity'],
+            'hourly_rate': state['hourly_rate'],
+            'daily_rate': state['daily_rate'],
+        }
+        for state in candidates
+        if state['space_id'] not in conflicting
+    ]
+    
+    return {
+        'venue_id': venue.venue_id,
+        'venue_name': venue.venue_name,
+        'venue_open': is_venue_open(venue, data['start_time'], data['end_time']),
+        'available_spaces': available_spaces,
+        'total_available': len(available_spaces)
+    }
+
 @api_view(['POST'])
 def check_availability(request):
     """Check space availability"""
@@ -72,37 +116,40 @@ def check_availability(request):
     except Venue.DoesNotExist:
         return Response({'error': 'Venue not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Check specific space or all spaces in venue
+    # Space state comes from the write-through cache; only conflicts hit the database
     if data.get('space_id'):
-        spaces = Space.objects.filter(space_id=data['space_id'], venue=venue)
+        space_ids = [str(data['space_id'])]
     else:
-        spaces = venue.spaces.filter(availability_status='Available')
+        space_ids = [str(space_id) for space_id in venue.spaces.values_list('space_id', flat=True)]
+    states = space_state_cache.get_many(space_ids)
+    candidates = _availability_candidates(venue, states, space_ids, data)
+    conflicting = set(_conflict_query(candidates, data))
     
-    available_spaces = []
+    return Response(_availability_response(venue, candidates, conflicting, data))
+
+@async_api_view(['POST'])
+async def check_availability_async(request, data):
+    """Check space availability on the async fast path"""
+    serializer = BookingAvailabilitySerializer(data=data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    for space in spaces:
-        conflicts = Booking.objects.filter(
-            space=space,
-            booking_status_code__in=['Pending', 'Confirmed'],
-            booking_start_time__lt=data['end_time'],
-            booking_end_time__gt=data['start_time']
-        )
-        
-        if not conflicts.exists():
-            available_spaces.append({
-                'space_id': space.space_id,
-                'space_name': space.space_name,
-                'capacity': space.capacity,
-                'hourly_rate': space.hourly_rate,
-                'daily_rate': space.daily_rate,
-            })
-    
-    return Response({
-        'venue_id': venue.venue_id,
-        'venue_name': venue.venue_name,
-        'available_spaces': available_spaces,
-        'total_available': len(available_spaces)
-    })
+    data = serializer.validated_data
+    
+    try:
+        venue = await Venue.objects.aget(venue_id=data['venue_id'])
+    except Venue.DoesNotExist:
+        return json_response({'error': 'Venue not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if data.get('space_id'):
+        space_ids = [str(data['space_id'])]
+    else:
+        space_ids = [str(space_id) async for space_id in venue.spaces.values_list('space_id', flat=True)]
+    states = await space_state_cache.aget_many(space_ids)
+    candidates = _availability_candidates(venue, states, space_ids, data)
+    conflicting = {space_id async for space_id in _conflict_query(candidates, data)}
+    
+    return json_response(_availability_response(venue, candidates, conflicting, data))
 
 class BookingPolicyListView(generics.ListCreateAPIView):
     """Booking policy management"""
@@ -3,6 +3,7 @@ from django.db import models
 from django.utils import timezone
 from apps.venues.models import Venue, Space
 from apps.bookings.models import Booking
+from core.tracing import annotate, traced
 
 class IoTSensor(models.Model):
     """IoT sensor registration and management"""
@@ -95,6 +96,7 @@ class BookingVerification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    @traced('iot.verify_booking_usage')
     def verify_booking_usage(self):
         """Verify booking usage based on IoT data"""
         booking = self.booking
@@ -135,6 +137,11 @@ class BookingVerification(models.Model):
             'verification_timestamp': timezone.now().isoformat()
         }
         
+        annotate(
+            booking__id=str(booking.booking_id),
+            iot__verification_status=self.verification_status,
+            iot__events=self.verification_data['total_events'],
+        )
         self.save()
         
         # Update booking with IoT verification
@@ -0,0 +1,121 @@
+"""Live per-venue occupancy shared by every worker through Redis
+
+Each occupancy reading replaces its space's entry in one hash, compared and
+set in a Lua script so an older reading never overwrites a newer one.
+Scrapes read the hash with one HGETALL and sum it per venue, so the totals
+are always derived from the stored readings: eviction or a flush can lose
+readings until the sensors report again, but never skews a venue's totals.
+Readings older than OCCUPANCY_STALE_SECONDS are left out and pruned, and the
+hash expires once no sensor has reported for that long.
+    
+    <prefix>spaces  space_id -> "timestamp count capacity venue_id venue_type"
+"""
+
+import logging
+import time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RECORD_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous and tonumber(string.match(previous, '^(%S+)')) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# Only readings still stale when the script runs, not ones refreshed since the scrape read them
+PRUNE_SCRIPT = """
+local removed = 0
+for i = 2, #ARGV do
+    local current = redis.call('HGET', KEYS[1], ARGV[i])
+    if current and tonumber(string.match(current, '^(%S+)')) < tonumber(ARGV[1]) then
+        removed = removed + redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+class VenueOccupancy:
+    """Occupied/capacity totals per venue, summed from the latest reading of each space
+    
+    Readings older than the one already stored for a space are ignored.
+    Redis errors are logged and swallowed when recording: the gauge is best
+    effort and must not fail sensor ingestion.
+    """
+    
+    def __init__(self, key_prefix='occupancy:', url=None):
+        self.spaces_key = f'{key_prefix}spaces'
+        self.url = url
+        self._client = None
+        self._scripts = {}
+    
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            # redis-py pools reconnect after fork, so one client per process is enough
+            self._client = redis.Redis.from_url(
+                self.url or settings.OCCUPANCY_REDIS_URL,
+                socket_timeout=settings.OCCUPANCY_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.OCCUPANCY_REDIS_TIMEOUT,
+            )
+        return self._client
+    
+    def _run(self, source, args):
+        # EVALSHA, falling back to EVAL the first time Redis sees the script
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.client.register_script(source)
+        return script(keys=[self.spaces_key], args=args)
+    
+    def record(self, space, occupancy_count, timestamp):
+        """Store a space's latest reading; False if it was stale or could not be stored
+        
+        Reads space.venue for the venue type, so select it with the space.
+        """
+        import redis
+        try:
+            timestamp = repr(timestamp.timestamp())
+            reading = f'{timestamp} {int(occupancy_count)} {space.capacity} {space.venue_id} {space.venue.venue_type_code}'
+            return bool(self._run(RECORD_SCRIPT, [
+                str(space.pk), timestamp, reading, max(1, int(settings.OCCUPANCY_STALE_SECONDS)),
+            ]))
+        except redis.RedisError:
+            logger.warning('Could not record occupancy for space %s', space.pk, exc_info=True)
+            return False
+    
+    def remove_space(self, space_id):
+        """Take a deleted or moved space out of its venue's totals"""
+        self.remove_spaces([space_id])
+    
+    def remove_spaces(self, space_ids):
+        import redis
+        try:
+            self.client.hdel(self.spaces_key, *(str(space_id) for space_id in space_ids))
+        except redis.RedisError:
+            logger.warning('Could not remove occupancy for spaces %s', space_ids, exc_info=True)
+    
+    def venues(self):
+        """{venue_id: {'occupied', 'capacity', 'venue_type'}} for every venue with fresh readings"""
+        cutoff = time.time() - settings.OCCUPANCY_STALE_SECONDS
+        venues, stale = {}, []
+        for field, value in self.client.hgetall(self.spaces_key).items():
+            timestamp, count, capacity, venue_id, venue_type = value.decode().split(' ')
+            if float(timestamp) < cutoff:
+                stale.append(field)
+                continue
+            venue = venues.setdefault(venue_id, {'occupied': 0, 'capacity': 0, 'venue_type': venue_type})
+            venue['occupied'] += int(count)
+            venue['capacity'] += int(capacity)
+        if stale:
+            self._run(PRUNE_SCRIPT, [repr(cutoff), *stale])
+        return venues
+    
+    def clear(self):
+        self.client.delete(self.spaces_key)
+
+venue_occupancy = VenueOccupancy()
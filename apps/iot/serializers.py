@@ -24,7 +24,7 @@ class SensorDataSerializer(serializers.ModelSerializer):
 class OccupancyEventSerializer(serializers.ModelSerializer):
     """Occupancy event serializer"""
     space_name = serializers.CharField(source='space.space_name', read_only=True)
-    booking_user = serializers.CharField(source='booking.user.userprofile.full_name', read_only=True)
+    booking_user = serializers.CharField(source='booking.user.profile.full_name', read_only=True)
     
     class Meta:
         model = OccupancyEvent
@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+space_occupancy_view = views.space_occupancy_status_async if settings.ASYNC_FAST_PATH else views.space_occupancy_status
+
 urlpatterns = [
     path('sensors/', views.IoTSensorListView.as_view(), name='iot-sensor-list'),
     path('sensors/<uuid:sensor_id>/data/', views.SensorDataListView.as_view(), name='sensor-data'),
     path('webhook/', views.sensor_webhook, name='iot-webhook'),
-    path('spaces/<uuid:space_id>/occupancy/', views.space_occupancy_status, name='space-occupancy'),
+    path('spaces/<uuid:space_id>/occupancy/', space_occupancy_view, name='space-occupancy'),
     path('spaces/<uuid:space_id>/events/', views.OccupancyEventListView.as_view(), name='occupancy-events'),
 ]
\ No newline at end of file
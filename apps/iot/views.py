@@ -9,10 +9,14 @@ import json
 import hmac
 import hashlib
 from django.conf import settings
+from django.db import transaction
 from .models import IoTSensor, SensorData, OccupancyEvent, BookingVerification, EnvironmentalData
 from .serializers import IoTSensorSerializer, SensorDataSerializer, OccupancyEventSerializer
-from apps.venues.models import Space
+from .occupancy import venue_occupancy
+from apps.venues.cache import space_state_cache
 from apps.bookings.models import Booking
+from core.db.routers import ReplicaReadMixin
+from core.utils.async_api import async_api_view, json_response
 
 class IoTSensorListView(generics.ListCreateAPIView):
     """IoT sensor management"""
@@ -21,10 +25,10 @@ class IoTSensorListView(generics.ListCreateAPIView):
     def get_queryset(self):
         venue_id = self.request.query_params.get('venue_id')
         if venue_id:
-            return IoTSensor.objects.filter(venue__venue_id=venue_id, is_active=True)
-        return IoTSensor.objects.filter(is_active=True)
+            return IoTSensor.objects.filter(venue__venue_id=venue_id, is_active=True).select_related('venue', 'space')
+        return IoTSensor.objects.filter(is_active=True).select_related('venue', 'space')
 
-class SensorDataListView(generics.ListAPIView):
+class SensorDataListView(ReplicaReadMixin, generics.ListAPIView):
     """Sensor data retrieval"""
     serializer_class = SensorDataSerializer
     
@@ -36,7 +40,7 @@ class SensorDataListView(generics.ListAPIView):
         return SensorData.objects.filter(
             sensor__sensor_id=sensor_id,
             timestamp__gte=since
-        ).order_by('-timestamp')
+        ).select_related('sensor').order_by('-timestamp')
 
 @method_decorator(csrf_exempt, name='dispatch')
 @api_view(['POST'])
@@ -54,13 +58,15 @@ def sensor_webhook(request):
         sensor_external_id = payload.get('sensor_id')
         sensor_type = payload.get('sensor_type')
         timestamp = timezone.datetime.fromisoformat(payload.get('timestamp'))
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
         value = payload.get('value')
         unit = payload.get('unit', '')
         metadata = payload.get('metadata', {})
         
         # Find sensor
         try:
-            sensor = IoTSensor.objects.get(
+            sensor = IoTSensor.objects.select_related('space__venue').get(
                 sensor_external_id=sensor_external_id,
                 is_active=True
             )
@@ -87,7 +93,7 @@ def sensor_webhook(request):
             process_environmental_data(sensor, sensor_type, value, timestamp)
         
         return Response({'message': 'Data processed successfully', 'data_id': sensor_data.data_id})
-        
+    
     except json.JSONDecodeError:
         return Response({'error': 'Invalid JSON'}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
@@ -123,6 +129,11 @@ def process_occupancy_data(sensor, occupancy_count, timestamp, metadata):
         timestamp=timestamp,
         sensor_data=metadata
     )
+    # A reading rolled back with the webhook must never reach the shared cache
+    transaction.on_commit(
+        lambda: space_state_cache.update_occupancy(sensor.space, occupancy_event.occupancy_count, timestamp)
+    )
+    venue_occupancy.record(sensor.space, occupancy_event.occupancy_count, timestamp)
     
     # Check for active bookings and verify
     active_bookings = Booking.objects.filter(
@@ -170,38 +181,25 @@ def process_environmental_data(sensor, sensor_type, value, timestamp):
     
     env_data.save()
 
-@api_view(['GET'])
-def space_occupancy_status(request, space_id):
-    """Get real-time occupancy status for a space"""
-    try:
-        space = Space.objects.get(space_id=space_id)
-    except Space.DoesNotExist:
-        return Response({'error': 'Space not found'}, status=status.HTTP_404_NOT_FOUND)
-    
-    # Get latest occupancy event
-    latest_event = OccupancyEvent.objects.filter(space=space).first()
-    
-    # Get current booking
+def _current_booking_query(space_id):
     now = timezone.now()
-    current_booking = Booking.objects.filter(
-        space=space,
+    return Booking.objects.filter(
+        space_id=space_id,
         booking_status_code='Confirmed',
         booking_start_time__lte=now,
         booking_end_time__gte=now
-    ).first()
-    
-    # Get environmental data
-    env_data = EnvironmentalData.objects.filter(space=space).first()
-    
-    return Response({
-        'space_id': space.space_id,
-        'space_name': space.space_name,
-        'current_occupancy': latest_event.occupancy_count if latest_event else 0,
-        'capacity': space.capacity,
-        'last_updated': latest_event.timestamp if latest_event else None,
+    ).select_related('user__profile')
+
+def _occupancy_response(state, current_booking, env_data):
+    return {
+        'space_id': state['space_id'],
+        'space_name': state['space_name'],
+        'current_occupancy': state['current_occupancy'] or 0,
+        'capacity': state['capacity'],
+        'last_updated': state['occupancy_updated_at'],
         'current_booking': {
             'booking_id': current_booking.booking_id,
-            'user_name': current_booking.user.userprofile.full_name,
+            'user_name': current_booking.user.profile.full_name,
             'end_time': current_booking.booking_end_time
         } if current_booking else None,
         'environmental_data': {
@@ -210,9 +208,34 @@ def space_occupancy_status(request, space_id):
             'air_quality_index': env_data.air_quality_index,
             'noise_level': env_data.noise_level
         } if env_data else None
-    })
+    }
+
+@api_view(['GET'])
+def space_occupancy_status(request, space_id):
+    """Get real-time occupancy status for a space"""
+    # Occupancy is written through on every sensor reading, so no event scan
+    state = space_state_cache.get(space_id)
+    if state is None:
+        return Response({'error': 'Space not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    current_booking = _current_booking_query(space_id).first()
+    env_data = EnvironmentalData.objects.filter(space_id=space_id).first()
+    
+    return Response(_occupancy_response(state, current_booking, env_data))
+
+@async_api_view(['GET'])
+async def space_occupancy_status_async(request, data, space_id):
+    """Get real-time occupancy status for a space on the async fast path"""
+    state = await space_state_cache.aget(space_id)
+    if state is None:
+        return json_response({'error': 'Space not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    current_booking = await _current_booking_query(space_id).afirst()
+    env_data = await EnvironmentalData.objects.filter(space_id=space_id).afirst()
+    
+    return json_response(_occupancy_response(state, current_booking, env_data))
 
-class OccupancyEventListView(generics.ListAPIView):
+class OccupancyEventListView(ReplicaReadMixin, generics.ListAPIView):
     """Occupancy events for a space"""
     serializer_class = OccupancyEventSerializer
     
@@ -224,4 +247,4 @@ class OccupancyEventListView(generics.ListAPIView):
         return OccupancyEvent.objects.filter(
             space__space_id=space_id,
             timestamp__gte=since
-        ).order_by('-timestamp')
\ No newline at end of file
+        ).select_related('space', 'booking__user__profile').order_by('-timestamp')
\ No newline at end of file
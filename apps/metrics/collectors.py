@@ -1,64 +1,206 @@
 """Custom business metrics collection for enterprise monitoring"""
 
-from prometheus_client import Counter, Histogram, Gauge, Info
+import logging
+import threading
 import time
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+_lazy_metrics = []
+
+class LazyMetric:
+    """Prometheus metric that is created and registered on first use
+    
+    Importing prometheus_client and registering every metric otherwise
+    happens when the middleware is loaded, on the start-up path of each
+    worker. Attribute access (labels, inc, observe, ...) is forwarded to
+    the real metric.
+    """
+    
+    def __init__(self, kind, *args, setup=None, **kwargs):
+        self._kind = kind
+        self._args = args
+        self._kwargs = kwargs
+        self._setup = setup
+        self._metric = None
+        self._lock = threading.Lock()
+        _lazy_metrics.append(self)
+    
+    def resolve(self):
+        if self._metric is None:
+            with self._lock:
+                if self._metric is None:
+                    import prometheus_client
+                    metric = getattr(prometheus_client, self._kind)(*self._args, **self._kwargs)
+                    if self._setup:
+                        self._setup(metric)
+                    self._metric = metric
+        return self._metric
+    
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+def register_all():
+    """Register every metric, e.g. before the first scrape"""
+    for metric in _lazy_metrics:
+        metric.resolve()
 
 # Business Metrics
-payment_counter = Counter(
+payment_counter = LazyMetric(
+    'Counter',
     'payments_total', 
     'Total payments processed',
     ['method', 'status', 'currency']
 )
 
-booking_counter = Counter(
+booking_counter = LazyMetric(
+    'Counter',
     'bookings_total',
     'Total bookings created',
     ['venue_type', 'status']
 )
 
-booking_duration = Histogram(
+booking_duration = LazyMetric(
+    'Histogram',
     'booking_duration_seconds',
     'Booking processing time',
     buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0]
 )
 
-payment_amount = Histogram(
+payment_amount = LazyMetric(
+    'Histogram',
     'payment_amount',
     'Payment amounts processed',
     ['currency'],
     buckets=[10, 50, 100, 500, 1000, 5000]
 )
 
-active_users = Gauge(
+active_users = LazyMetric(
+    'Gauge',
     'active_users_current',
-    'Currently active users'
+    'Currently active users',
+    multiprocess_mode='livesum'
 )
 
-venue_occupancy = Gauge(
-    'venue_occupancy_rate',
-    'Current venue occupancy rate',
-    ['venue_id', 'venue_type']
-)
+class VenueOccupancyCollector:
+    """Venue occupancy read from the shared Redis totals at scrape time
+    
+    The totals are maintained by the IoT pipeline across all workers (see
+    apps.iot.occupancy), so this is registered on the scrape's registry
+    rather than written to per-process multiprocess files.
+    """
+    
+    def __init__(self, store=None):
+        self.store = store
+    
+    def families(self):
+        from prometheus_client.core import GaugeMetricFamily
+        labels = ['venue_id', 'venue_type']
+        return (
+            GaugeMetricFamily('venue_occupancy_rate', 'Current venue occupancy rate', labels=labels),
+            GaugeMetricFamily('venue_occupants', 'People currently detected in the venue', labels=labels),
+        )
+    
+    def describe(self):
+        return self.families()
+    
+    def collect(self):
+        import redis
+        from apps.iot.occupancy import venue_occupancy
+        rate, occupants = self.families()
+        try:
+            venues = (self.store or venue_occupancy).venues()
+        except redis.RedisError:
+            logger.warning('Could not read venue occupancy', exc_info=True)
+            venues = {}
+        for venue_id, venue in sorted(venues.items()):
+            if venue['capacity'] <= 0:
+                continue
+            labels = [venue_id, venue['venue_type']]
+            rate.add_metric(labels, venue['occupied'] / venue['capacity'])
+            occupants.add_metric(labels, venue['occupied'])
+        yield rate
+        yield occupants
 
-api_requests = Counter(
+api_requests = LazyMetric(
+    'Counter',
     'api_requests_total',
     'Total API requests',
     ['method', 'endpoint', 'status']
 )
 
-response_time = Histogram(
+response_time = LazyMetric(
+    'Histogram',
     'api_response_time_seconds',
     'API response time',
     ['method', 'endpoint']
 )
 
-# Application Info
-app_info = Info('coworking_platform_info', 'Application information')
-app_info.info({
-    'version': '1.0.0',
-    'environment': 'production'
-})
+db_connections_opened = LazyMetric(
+    'Counter',
+    'db_connections_opened_total',
+    'Database connections opened',
+    ['alias']
+)
+
+db_connection_requests = LazyMetric(
+    'Counter',
+    'db_connection_requests_total',
+    'Requests by whether they started on an already open database connection',
+    ['alias', 'reused']
+)
+
+db_queries_per_request = LazyMetric(
+    'Histogram',
+    'db_queries_per_request',
+    'Database queries executed per sampled request',
+    ['endpoint'],
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500]
+)
+
+db_time_per_request = LazyMetric(
+    'Histogram',
+    'db_time_per_request_seconds',
+    'Time spent in database queries per sampled request',
+    ['endpoint'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+outbound_http_requests = LazyMetric(
+    'Counter',
+    'outbound_http_requests_total',
+    'Requests sent through pooled outbound sessions',
+    ['upstream']
+)
+
+outbound_http_connections_opened = LazyMetric(
+    'Counter',
+    'outbound_http_connections_opened_total',
+    'Connections opened by pooled outbound sessions (requests minus reuses)',
+    ['upstream']
+)
+
+outbound_http_in_flight = LazyMetric(
+    'Gauge',
+    'outbound_http_in_flight',
+    'Outbound requests currently waiting on an upstream',
+    ['upstream'],
+    multiprocess_mode='livesum'
+)
+
+# Application Info (a gauge rather than an Info, which multiprocess mode can't aggregate)
+app_info = LazyMetric(
+    'Gauge',
+    'coworking_platform_info',
+    'Application information',
+    ['version', 'environment'],
+    multiprocess_mode='max',
+    setup=lambda info: info.labels(version='1.0.0', environment='production').set(1)
+)
 
 def track_payment(method: str, status: str, currency: str, amount: float):
     """Track payment metrics"""
@@ -75,16 +217,85 @@ def track_api_request(method: str, endpoint: str, status: int, duration: float):
     api_requests.labels(method=method, endpoint=endpoint, status=status).inc()
     response_time.labels(method=method, endpoint=endpoint).observe(duration)
 
+def track_db_connection_opened(alias: str):
+    """Track a newly opened database connection"""
+    db_connections_opened.labels(alias=alias).inc()
+
+def track_db_connection_reuse(alias: str, reused: bool):
+    """Track whether a request found a persistent connection to reuse"""
+    db_connection_requests.labels(alias=alias, reused=str(reused).lower()).inc()
+
+def track_db_request(endpoint: str, queries: int, duration: float):
+    """Track database work done by one request"""
+    db_queries_per_request.labels(endpoint=endpoint).observe(queries)
+    db_time_per_request.labels(endpoint=endpoint).observe(duration)
+
+HTTP_METHODS = frozenset(['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+
+class EndpointLabels:
+    """Bounded set of endpoint label values derived from URL patterns
+    
+    Requests are labelled with the route template they resolved to
+    ('/api/v1/bookings/<uuid:pk>/'), never the raw path, so ids don't create
+    a new time series per object. Past `limit` distinct routes, further ones
+    share OVERFLOW so a stray pattern can't grow the registry without bound.
+    """
+    
+    UNMATCHED = '<unmatched>'
+    OVERFLOW = '<other>'
+    
+    def __init__(self, limit=500):
+        self.limit = limit
+        self._seen = set()
+        self._lock = threading.Lock()
+    
+    def __call__(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return self.UNMATCHED
+        
+        route = f'/{match.route}'
+        if route in self._seen:
+            return route
+        with self._lock:
+            if route in self._seen:
+                return route
+            if len(self._seen) >= self.limit:
+                return self.OVERFLOW
+            self._seen.add(route)
+        return route
+
+def method_label(request):
+    return request.method if request.method in HTTP_METHODS else 'OTHER'
+
+@sync_and_async_middleware
 def metrics_middleware(get_response):
     """Django middleware to track API metrics"""
+    endpoint_label = EndpointLabels(settings.METRICS_MAX_ENDPOINT_LABELS)
+    
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            start_time = time.time()
+            response = await get_response(request)
+            duration = time.time() - start_time
+            
+            track_api_request(
+                method=method_label(request),
+                endpoint=endpoint_label(request),
+                status=response.status_code,
+                duration=duration
+            )
+            return response
+        return middleware
+    
     def middleware(request):
         start_time = time.time()
         response = get_response(request)
         duration = time.time() - start_time
         
         track_api_request(
-            method=request.method,
-            endpoint=request.path,
+            method=method_label(request),
+            endpoint=endpoint_label(request),
             status=response.status_code,
             duration=duration
         )
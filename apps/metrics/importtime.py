@@ -0,0 +1,71 @@
+"""Cold-start import profiling based on `python -X importtime`"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+STARTUP_SCRIPT = '''
+import {module}
+if {load_urls}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+'''
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(output):
+    """Parse `-X importtime` stderr into records, in the order printed"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        name = fields[2][1:]
+        stripped = name.lstrip(' ')
+        records.append(ImportRecord(
+            module=stripped.rstrip(),
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped)) // 2,
+        ))
+    return records
+
+def profile_startup(module='config.wsgi', load_urls=True, settings_module=None):
+    """Import `module` in a fresh interpreter and return (records, wall seconds)"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    script = STARTUP_SCRIPT.format(module=module, load_urls=bool(load_urls))
+    
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError('\n'.join(errors[-20:]) or f'Import of {module} failed')
+    return parse_importtime(result.stderr), elapsed
+
+def total_import_us(records):
+    return sum(record.cumulative_us for record in records if record.depth == 0)
+
+def by_package(records):
+    """Self time summed per top-level package, largest first"""
+    totals = defaultdict(int)
+    for record in records:
+        totals[record.module.split('.')[0]] += record.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,59 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.metrics.importtime import by_package, profile_startup, total_import_us
+
+class Command(BaseCommand):
+    help = 'Profile the imports a worker performs on cold start (python -X importtime)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='config.wsgi', help='Entry point a worker imports')
+        parser.add_argument('--no-urls', action='store_true', help='Skip loading the URLconf')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative')
+        parser.add_argument('--group', choices=['module', 'package'], default='module')
+        parser.add_argument('--limit', type=int, default=30)
+        parser.add_argument('--runs', type=int, default=3, help='Report the fastest of this many runs')
+        parser.add_argument('--json', action='store_true')
+    
+    def handle(self, *args, **options):
+        runs = []
+        for _ in range(max(1, options['runs'])):
+            try:
+                runs.append(profile_startup(
+                    options['module'],
+                    load_urls=not options['no_urls'],
+                    settings_module=settings.SETTINGS_MODULE,
+                ))
+            except RuntimeError as e:
+                raise CommandError(str(e))
+        records, elapsed = min(runs, key=lambda run: run[1])
+        
+        limit = options['limit']
+        if options['group'] == 'package':
+            rows = [{'module': package, 'self_us': self_us} for package, self_us in by_package(records)[:limit]]
+        else:
+            key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+            ranked = sorted(records, key=lambda record: getattr(record, key), reverse=True)[:limit]
+            rows = [
+                {'module': r.module, 'self_us': r.self_us, 'cumulative_us': r.cumulative_us}
+                for r in ranked
+            ]
+        
+        summary = {
+            'module': options['module'],
+            'wall_ms': round(elapsed * 1000, 1),
+            'import_ms': round(total_import_us(records) / 1000, 1),
+            'modules_imported': len(records),
+            'top': rows,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        
+        self.stdout.write(
+            f"{summary['module']}: {summary['import_ms']} ms importing {summary['modules_imported']} modules "
+            f"({summary['wall_ms']} ms wall)"
+        )
+        for row in rows:
+            cumulative = f"{row['cumulative_us'] / 1000:9.1f}" if 'cumulative_us' in row else ''
+            self.stdout.write(f"{row['self_us'] / 1000:9.1f} {cumulative:>9} ms  {row['module']}")
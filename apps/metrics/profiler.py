@@ -0,0 +1,187 @@
+"""Statistical stack sampler for live worker processes
+
+A real OS thread wakes every `interval` seconds, reads every other thread's
+current frame with sys._current_frames() and counts the collapsed stacks
+("thread;outer;...;inner count" lines, the input format of flamegraph.pl and
+speedscope). Nothing is traced between samples, so the cost is one frame
+walk per thread per tick. Only one sampler runs per process at a time, and
+duration, rate and distinct stacks are capped by settings.
+
+Under gevent the sampler uses the unpatched thread primitives, so it keeps
+ticking while greenlets run and sees whichever greenlet holds the hub
+thread.
+"""
+
+import logging
+import math
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 128
+
+def _os_threads():
+    """_thread primitives and time.sleep, unpatched if gevent has patched them"""
+    import _thread
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        return SimpleNamespace(
+            start_new_thread=monkey.get_original('_thread', 'start_new_thread'),
+            get_ident=monkey.get_original('_thread', 'get_ident'),
+            allocate_lock=monkey.get_original('_thread', 'allocate_lock'),
+            sleep=monkey.get_original('time', 'sleep'),
+        )
+    return SimpleNamespace(
+        start_new_thread=_thread.start_new_thread,
+        get_ident=_thread.get_ident,
+        allocate_lock=_thread.allocate_lock,
+        sleep=time.sleep,
+    )
+
+# Released by the sampler thread, so it must be a real lock under gevent too
+_running = _os_threads().allocate_lock()
+
+class ProfilerBusy(Exception):
+    """A sampler is already running in this process"""
+
+class StackSampler:
+    def __init__(self, interval, max_stacks, exclude=()):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.exclude = set(exclude)
+        self.stacks = Counter()
+        self.samples = 0
+        self.truncated = 0
+        self.finished = False
+        self._labels = {}
+    
+    def label(self, code, lineno):
+        key = (code, lineno)
+        label = self._labels.get(key)
+        if label is None:
+            filename = code.co_filename
+            for prefix in sys.path:
+                if prefix and filename.startswith(prefix):
+                    filename = filename[len(prefix):].lstrip(os.sep)
+                    break
+            label = self._labels[key] = f'{code.co_name} ({filename}:{lineno})'
+        return label
+    
+    def collapse(self, frame, thread_name):
+        frames = []
+        while frame is not None and len(frames) < MAX_DEPTH:
+            frames.append(self.label(frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ';'.join(reversed(frames))
+    
+    def sample_once(self, own_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or ident in self.exclude:
+                continue
+            stack = self.collapse(frame, names.get(ident, f'thread-{ident}'))
+            if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                self.stacks[stack] += 1
+            else:
+                self.truncated += 1
+        self.samples += 1
+    
+    def run(self, duration, get_ident, sleep):
+        own_ident = get_ident()
+        deadline = time.monotonic() + duration
+        next_tick = time.monotonic()
+        while True:
+            self.sample_once(own_ident)
+            next_tick += self.interval
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            # Behind schedule (a long GIL hold) skips ticks rather than bursting
+            if next_tick < now:
+                next_tick = now + self.interval
+            sleep(min(next_tick, deadline) - now)
+    
+    def collapsed(self):
+        lines = [f'{stack} {count}' for stack, count in self.stacks.most_common()]
+        if self.truncated:
+            lines.append(f'<truncated> {self.truncated}')
+        return '\n'.join(lines) + '\n'
+
+def clamp(seconds, interval_ms):
+    """Seconds and interval bounded by PROFILER_MAX_SECONDS and PROFILER_MIN_INTERVAL_MS"""
+    if not (math.isfinite(seconds) and math.isfinite(interval_ms)):
+        raise ValueError('seconds and interval_ms must be finite')
+    seconds = min(max(float(seconds), 0.1), settings.PROFILER_MAX_SECONDS)
+    interval = max(float(interval_ms), settings.PROFILER_MIN_INTERVAL_MS) / 1000
+    return seconds, interval
+
+def start(seconds, interval_ms, on_done, exclude=()):
+    """Sample this process in a background OS thread; `on_done(sampler)` runs there"""
+    seconds, interval = clamp(seconds, interval_ms)
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy()
+    sampler = StackSampler(interval, settings.PROFILER_MAX_STACKS, exclude)
+    threads = _os_threads()
+    
+    def target():
+        try:
+            sampler.run(seconds, threads.get_ident, threads.sleep)
+            if on_done is not None:
+                on_done(sampler)
+        except Exception:
+            logger.exception('Stack sampling failed')
+        finally:
+            # Released first, so a caller that sees `finished` can start the next run
+            _running.release()
+            sampler.finished = True
+    
+    threads.start_new_thread(target, ())
+    return sampler
+
+def can_profile_request(environ):
+    """False in a single-threaded sync worker, where the waiting request is the only thread
+    
+    ASGI requests carry no wsgi.* keys; gevent workers report a single
+    thread but keep serving other greenlets while the request waits.
+    """
+    if environ.get('wsgi.multithread', True):
+        return True
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        return monkey.is_module_patched('threading')
+    return False
+
+def profile(seconds, interval_ms):
+    """Sample for `seconds` and return the sampler; blocks the calling thread or greenlet"""
+    # The waiting thread is left out; under gevent this ident is a greenlet's
+    # and matches no OS thread, so the hub thread is still sampled
+    sampler = start(seconds, interval_ms, None, exclude=[threading.get_ident()])
+    # Polled with the (possibly patched) sleep so a gevent worker keeps serving
+    while not sampler.finished:
+        time.sleep(0.05)
+    return sampler
+
+def _write_profile(sampler):
+    path = os.path.join(settings.PROFILER_OUTPUT_DIR, f'profile-{os.getpid()}-{int(time.time())}.folded')
+    with open(path, 'w') as f:
+        f.write(sampler.collapsed())
+    logger.warning('Wrote %d stack samples to %s', sampler.samples, path)
+
+def _handle_signal(signum, frame):
+    # Runs between bytecodes in the main thread: only hand off to the sampler
+    try:
+        start(settings.PROFILER_SIGNAL_SECONDS, settings.PROFILER_MIN_INTERVAL_MS, _write_profile)
+    except ProfilerBusy:
+        logger.warning('Stack sampler already running in %s', os.getpid())
+
+def install_signal_handler(signum=signal.SIGUSR2):
+    """`kill -USR2 <worker pid>` profiles that worker into PROFILER_OUTPUT_DIR"""
+    signal.signal(signum, _handle_signal)
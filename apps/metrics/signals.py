@@ -0,0 +1,15 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from .collectors import track_db_connection_opened, track_db_connection_reuse
+
+@receiver(connection_created)
+def db_connection_created(sender, connection, **kwargs):
+    track_db_connection_opened(connection.alias)
+
+@receiver(request_started)
+def db_connection_request_started(sender, **kwargs):
+    """Record connection reuse after Django has closed obsolete connections"""
+    for connection in connections.all(initialized_only=True):
+        track_db_connection_reuse(connection.alias, connection.connection is not None)
@@ -0,0 +1,72 @@
+import hmac
+import math
+import os
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .collectors import VenueOccupancyCollector, register_all
+
+def _authorized(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        return True
+    scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+    return scheme.lower() == 'bearer' and hmac.compare_digest(supplied.encode(), token.encode())
+
+@require_GET
+def metrics(request):
+    """Prometheus exposition for every worker process
+    
+    With PROMETHEUS_MULTIPROC_DIR set (see config/gunicorn.py), workers write
+    samples to per-process mmap'd files and a scrape served by any one worker
+    merges them; otherwise only this process's registry is exposed. Venue
+    occupancy comes from Redis either way.
+    """
+    if not _authorized(request):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+    register_all()
+    registry = CollectorRegistry()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    # Already aggregated across workers in Redis
+    registry.register(VenueOccupancyCollector())
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile(request):
+    """Sample this worker's threads and return flamegraph collapsed stacks
+    
+    ?seconds= (default 10) and ?interval_ms= (default 10) are capped by
+    PROFILER_MAX_SECONDS and PROFILER_MIN_INTERVAL_MS. The request holds its
+    own thread while sampling, so this only sees other work in threaded,
+    gevent or ASGI workers and is refused in sync workers; send SIGUSR2 to
+    those instead.
+    """
+    from .profiler import ProfilerBusy, can_profile_request, profile as sample
+    try:
+        seconds = float(request.query_params.get('seconds', 10))
+        interval_ms = float(request.query_params.get('interval_ms', 10))
+    except ValueError:
+        return Response({'error': 'seconds and interval_ms must be numbers'}, status=400)
+    if not (math.isfinite(seconds) and math.isfinite(interval_ms)):
+        return Response({'error': 'seconds and interval_ms must be finite'}, status=400)
+    # A sync worker would only stall until its timeout with nothing else to sample
+    if not can_profile_request(request.META):
+        return Response({'error': 'Profiling over HTTP needs a threaded, gevent or ASGI worker; send SIGUSR2 instead'}, status=409)
+    try:
+        sampler = sample(seconds, interval_ms)
+    except ProfilerBusy:
+        return Response({'error': 'A profile is already running in this worker'}, status=409)
+    return HttpResponse(sampler.collapsed(), content_type='text/plain', headers={
+        'X-Profile-Samples': str(sampler.samples),
+        'X-Profile-Pid': str(os.getpid()),
+    })
\ No newline at end of file
@@ -2,6 +2,8 @@ import requests
 import json
 from abc import ABC, abstractmethod
 from django.conf import settings
+from core.tracing import annotate, mark_failed, traced
+from core.utils.http import get_session
 from .models import PaymentGatewayConfig, Payment, PaymentAuditLog
 
 class PaymentGatewayInterface(ABC):
@@ -22,11 +24,13 @@ class PaymentGatewayInterface(ABC):
 class JavaSpringPaymentGateway(PaymentGatewayInterface):
     """Java Spring payment service integration"""
     
-    def __init__(self):
-        self.config = PaymentGatewayConfig.objects.get(
-            gateway_type='java_spring',
-            is_active=True
-        )
+    def __init__(self, config=None):
+        if config is None:
+            config = PaymentGatewayConfig.objects.get(
+                gateway_type='java_spring',
+                is_active=True
+            )
+        self.config = config
         self.base_url = self.config.endpoint_url
         self.headers = {
             'Content-Type': 'application/json',
@@ -47,11 +51,10 @@ class JavaSpringPaymentGateway(PaymentGatewayInterface):
         }
         
         try:
-            response = requests.post(
+            response = get_session('payment_gateway').post(
                 endpoint,
                 json=payload,
-                headers=self.headers,
-                timeout=30
+                headers=self.headers
             )
             response.raise_for_status()
             return response.json()
@@ -68,11 +71,10 @@ class JavaSpringPaymentGateway(PaymentGatewayInterface):
         }
         
         try:
-            response = requests.post(
+            response = get_session('payment_gateway').post(
                 endpoint,
                 json=payload,
-                headers=self.headers,
-                timeout=30
+                headers=self.headers
             )
             response.raise_for_status()
             return response.json()
@@ -84,10 +86,9 @@ class JavaSpringPaymentGateway(PaymentGatewayInterface):
         endpoint = f"{self.base_url}/api/payments/{transaction_ref}/status"
         
         try:
-            response = requests.get(
+            response = get_session('payment_gateway').get(
                 endpoint,
-                headers=self.headers,
-                timeout=30
+                headers=self.headers
             )
             response.raise_for_status()
             return response.json()
@@ -97,16 +98,14 @@ class JavaSpringPaymentGateway(PaymentGatewayInterface):
 class PaymentProcessor:
     """Main payment processor with gateway abstraction"""
     
-    def __init__(self):
-        self.gateways = {
-            'java_spring': JavaSpringPaymentGateway(),
-        }
+    def __init__(self, registry=None):
+        from .registry import gateway_registry
+        self.registry = registry or gateway_registry
     
+    @traced('payments.process_payment')
     def process_payment(self, payment: Payment, gateway_type='java_spring'):
         """Process payment through specified gateway"""
-        gateway = self.gateways.get(gateway_type)
-        if not gateway:
-            raise ValueError(f"Gateway {gateway_type} not supported")
+        gateway = self.registry.get(gateway_type)
         
         payment_data = {
             'amount': payment.amount,
@@ -121,6 +120,12 @@ class PaymentProcessor:
         }
         
         result = gateway.process_payment(payment_data)
+        annotate(
+            payment__id=str(payment.payment_id),
+            payment__gateway=gateway_type,
+            payment__amount=float(payment.amount),
+            payment__success=bool(result.get('success')),
+        )
         
         # Update payment status
         if result.get('success'):
@@ -140,6 +145,7 @@ class PaymentProcessor:
                 snapshot_json=result
             )
         else:
+            mark_failed(result.get('error', 'Unknown error'))
             payment.status_code = 'Failed'
             payment.gateway_payload = result
             
@@ -161,7 +167,7 @@ class PaymentProcessor:
         
         refund_amount = amount or payment.amount
         gateway_type = 'java_spring'  # Default gateway
-        gateway = self.gateways.get(gateway_type)
+        gateway = self.registry.get(gateway_type)
         
         result = gateway.refund_payment(payment.transaction_ref, refund_amount)
         
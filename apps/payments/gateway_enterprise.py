@@ -5,6 +5,7 @@ import time
 from decimal import Decimal
 from django.conf import settings
 from django.utils import timezone
+from core.utils.http import get_session
 from .models import Payment
 
 logger = logging.getLogger(__name__)
@@ -18,7 +19,6 @@ class EnterprisePaymentProcessor:
     
     def __init__(self):
         self.gateway_url = settings.PAYMENT_GATEWAY_URL
-        self.timeout = 30
         self.max_retries = 3
         self.retry_delay = 1
     
@@ -39,10 +39,9 @@ class EnterprisePaymentProcessor:
             try:
                 logger.info(f"Payment attempt {attempt + 1} for {payment.payment_id}")
                 
-                response = requests.post(
+                response = get_session('payment_gateway').post(
                     f'{self.gateway_url}/api/payments/process',
                     json=payload,
-                    timeout=self.timeout,
                     headers={
                         'Content-Type': 'application/json',
                         'X-API-Key': getattr(settings, 'PAYMENT_GATEWAY_API_KEY', 'demo-key'),
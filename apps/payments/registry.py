@@ -0,0 +1,91 @@
+"""Per-worker payment gateway clients built from PaymentGatewayConfig
+
+Loading a config costs a query and a Fernet decryption of its credentials,
+so each worker does it once per gateway type and reuses the client. Saving
+or deleting a config stores a fresh version token in the shared cache;
+workers compare it with the token they loaded at most every
+PAYMENT_GATEWAY_CONFIG_CHECK_SECONDS and drop their clients when it changed.
+An unreachable cache leaves workers on the clients they already loaded.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from .gateway import JavaSpringPaymentGateway
+from .models import PaymentGatewayConfig
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_CLASSES = {
+    'java_spring': JavaSpringPaymentGateway,
+}
+
+class GatewayRegistry:
+    """Gateway clients keyed by gateway type, dropped when the config version moves"""
+    
+    version_key = 'payments:gateway_config_version'
+    
+    def __init__(self, gateway_classes):
+        self.gateway_classes = gateway_classes
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+    
+    def _reset(self):
+        # Each worker loads its own clients; a lock inherited mid-load would never be released
+        self._gateways = {}
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+    
+    def get(self, gateway_type):
+        """Client for the newest active config of `gateway_type`"""
+        if gateway_type not in self.gateway_classes:
+            raise ValueError(f"Gateway {gateway_type} not supported")
+        self._check_version()
+        gateway = self._gateways.get(gateway_type)
+        if gateway is None:
+            with self._lock:
+                gateway = self._gateways.get(gateway_type)
+                if gateway is None:
+                    gateway = self._gateways[gateway_type] = self._load(gateway_type)
+        return gateway
+    
+    def _load(self, gateway_type):
+        config = PaymentGatewayConfig.objects.filter(
+            gateway_type=gateway_type,
+            is_active=True
+        ).order_by('-created_at').first()
+        if config is None:
+            raise PaymentGatewayConfig.DoesNotExist(f'No active {gateway_type} gateway configuration')
+        return self.gateway_classes[gateway_type](config)
+    
+    def _check_version(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.PAYMENT_GATEWAY_CONFIG_CHECK_SECONDS:
+            return
+        try:
+            version = cache.get(self.version_key)
+        except Exception:
+            # Keep serving the loaded clients and try again after the next interval
+            logger.warning('Could not read the payment gateway config version', exc_info=True)
+            self._checked_at = now
+            return
+        with self._lock:
+            if version != self._version:
+                self._gateways = {}
+                self._version = version
+            self._checked_at = now
+    
+    def invalidate(self):
+        """Make every worker reload its clients; call once a config change has committed"""
+        # A fresh token rather than a counter, which would restart at a seen value after eviction
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        with self._lock:
+            self._gateways = {}
+            self._checked_at = None
+
+gateway_registry = GatewayRegistry(GATEWAY_CLASSES)
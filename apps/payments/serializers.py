@@ -23,7 +23,7 @@ class PaymentSerializer(serializers.ModelSerializer):
 
 class PaymentAuditLogSerializer(serializers.ModelSerializer):
     """Payment audit log serializer"""
-    performed_by_name = serializers.CharField(source='performed_by_user.userprofile.full_name', read_only=True)
+    performed_by_name = serializers.CharField(source='performed_by_user.profile.full_name', read_only=True)
     
     class Meta:
         model = PaymentAuditLog
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import PaymentGatewayConfig
+from .registry import gateway_registry
+
+@receiver(post_save, sender=PaymentGatewayConfig)
+@receiver(post_delete, sender=PaymentGatewayConfig)
+def gateway_config_changed(sender, instance, **kwargs):
+    """Drop cached gateway clients in every worker once the change is visible to them"""
+    transaction.on_commit(gateway_registry.invalidate)
@@ -17,7 +17,7 @@ class PaymentListView(generics.ListAPIView):
     def get_queryset(self):
         return Payment.objects.filter(
             booking__user=self.request.user
-        ).select_related('booking').order_by('-created_at')
+        ).select_related('booking__venue', 'booking__space').order_by('-created_at')
 
 class PaymentDetailView(generics.RetrieveAPIView):
     """Payment detail view"""
@@ -25,7 +25,9 @@ class PaymentDetailView(generics.RetrieveAPIView):
     lookup_field = 'payment_id'
     
     def get_queryset(self):
-        return Payment.objects.filter(booking__user=self.request.user)
+        return Payment.objects.filter(
+            booking__user=self.request.user
+        ).select_related('booking__venue', 'booking__space')
 
 @api_view(['POST'])
 def process_payment(request):
@@ -204,4 +206,4 @@ class PaymentAuditLogView(generics.ListAPIView):
         return PaymentAuditLog.objects.filter(
             payment__payment_id=payment_id,
             payment__booking__user=self.request.user
-        ).order_by('-performed_at')
\ No newline at end of file
+        ).select_related('performed_by_user__profile').order_by('-performed_at')
\ No newline at end of file
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class VenuesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.venues'
\ No newline at end of file
+    name = 'apps.venues'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
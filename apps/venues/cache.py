@@ -0,0 +1,199 @@
+"""Write-through cache of space state for availability and occupancy reads"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+SPACE_STATE_FIELDS = (
+    'space_id', 'venue_id', 'space_name', 'capacity', 'hourly_rate', 'daily_rate',
+    'availability_status', 'space_type_code',
+)
+
+OCCUPANCY_FIELDS = ('current_occupancy', 'occupancy_updated_at')
+
+class SpaceStateCache:
+    """Space state in the shared cache with a short-lived per-process LRU in front
+    
+    Entries are plain dicts keyed by space_id. Writes go through to both
+    tiers; other processes pick up a change once their local copy expires
+    after `local_ttl` seconds. Misses are loaded from the database in one
+    query and written back, so callers always get a state for existing spaces.
+    Writes that merge with the cached state hold a short per-space lock in
+    the shared cache, so a concurrent write can't replace a newer reading.
+    """
+    key_prefix = 'space_state:'
+    lock_prefix = 'space_state_lock:'
+    
+    def __init__(self, timeout=3600, local_ttl=5, max_local_entries=10000, lock_timeout=5):
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.local_ttl = local_ttl
+        self.max_local_entries = max_local_entries
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _key(self, space_id):
+        return f'{self.key_prefix}{space_id}'
+    
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return state
+    
+    def _set_local(self, key, state):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, state)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+    
+    @contextmanager
+    def _locked(self, space_id):
+        # Expires on its own if the holder dies, so waiting past lock_timeout means it is gone
+        lock_key = f'{self.lock_prefix}{space_id}'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while not cache.add(lock_key, token, self.lock_timeout) and time.monotonic() < deadline:
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+    
+    def _write(self, states):
+        entries = {self._key(state['space_id']): state for state in states}
+        if not entries:
+            return
+        cache.set_many(entries, self.timeout)
+        for key, state in entries.items():
+            self._set_local(key, state)
+    
+    @staticmethod
+    def state_from_space(space):
+        state = {field: getattr(space, field) for field in SPACE_STATE_FIELDS}
+        for field in OCCUPANCY_FIELDS:
+            state[field] = getattr(space, field, None)
+        return state
+    
+    def _load_queryset(self, space_ids):
+        from apps.iot.models import OccupancyEvent
+        from .models import Space
+        
+        latest = OccupancyEvent.objects.filter(space=OuterRef('pk')).order_by('-timestamp')
+        return Space.objects.filter(pk__in=space_ids).only(*SPACE_STATE_FIELDS).annotate(
+            current_occupancy=Subquery(latest.values('occupancy_count')[:1]),
+            occupancy_updated_at=Subquery(latest.values('timestamp')[:1]),
+        )
+    
+    def _split_local(self, space_ids):
+        states = {}
+        remote_keys = []
+        for space_id in space_ids:
+            key = self._key(space_id)
+            state = self._get_local(key)
+            if state is not None:
+                states[str(space_id)] = state
+            else:
+                remote_keys.append(key)
+        return states, remote_keys
+    
+    def _merge_remote(self, states, remote):
+        for key, state in remote.items():
+            self._set_local(key, state)
+            states[key[len(self.key_prefix):]] = state
+    
+    def get(self, space_id):
+        """State for one space, or None if it does not exist"""
+        return self.get_many([space_id]).get(str(space_id))
+    
+    def get_many(self, space_ids):
+        """States for many spaces keyed by str(space_id), in one cache round trip
+        
+        Missing spaces are absent from the result.
+        """
+        states, remote_keys = self._split_local(space_ids)
+        if remote_keys:
+            self._merge_remote(states, cache.get_many(remote_keys))
+        
+        missing = [space_id for space_id in space_ids if str(space_id) not in states]
+        if missing:
+            loaded = [self.state_from_space(space) for space in self._load_queryset(missing)]
+            self._write(loaded)
+            states.update((str(state['space_id']), state) for state in loaded)
+        
+        return states
+    
+    async def aget(self, space_id):
+        return (await self.aget_many([space_id])).get(str(space_id))
+    
+    async def aget_many(self, space_ids):
+        """Async get_many using the async cache and ORM APIs"""
+        states, remote_keys = self._split_local(space_ids)
+        if remote_keys:
+            self._merge_remote(states, await cache.aget_many(remote_keys))
+        
+        missing = [space_id for space_id in space_ids if str(space_id) not in states]
+        if missing:
+            loaded = [self.state_from_space(space) async for space in self._load_queryset(missing)]
+            if loaded:
+                entries = {self._key(state['space_id']): state for state in loaded}
+                await cache.aset_many(entries, self.timeout)
+                for key, state in entries.items():
+                    self._set_local(key, state)
+            states.update((str(state['space_id']), state) for state in loaded)
+        
+        return states
+    
+    def set(self, space):
+        """Write through a saved space, keeping the last known occupancy"""
+        state = self.state_from_space(space)
+        with self._locked(space.pk):
+            previous = cache.get(self._key(space.pk))
+            if previous is not None and state['current_occupancy'] is None:
+                for field in OCCUPANCY_FIELDS:
+                    state[field] = previous.get(field)
+            self._write([state])
+    
+    def update_occupancy(self, space, occupancy_count, timestamp):
+        """Record a sensor reading, ignoring readings older than the cached one"""
+        # Sensors may send offset-less ISO timestamps; compare them as aware datetimes
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        with self._locked(space.pk):
+            state = cache.get(self._key(space.pk)) or self.state_from_space(space)
+            updated_at = state.get('occupancy_updated_at')
+            if updated_at is not None and updated_at > timestamp:
+                return state
+            
+            state = dict(state, current_occupancy=occupancy_count, occupancy_updated_at=timestamp)
+            self._write([state])
+        return state
+    
+    def delete_many(self, space_ids):
+        keys = [self._key(space_id) for space_id in space_ids]
+        cache.delete_many(keys)
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+    
+    def delete(self, space_id):
+        self.delete_many([space_id])
+    
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+space_state_cache = SpaceStateCache()
@@ -0,0 +1,189 @@
+"""Operating hours parsing into minute-of-week intervals"""
+
+import re
+import threading
+from collections import OrderedDict
+from django.utils import timezone
+from psycopg2.extras import NumericRange
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+DAY_ALIASES = {day[:3]: [index] for index, day in enumerate(DAYS)}
+DAY_ALIASES.update({day: [index] for index, day in enumerate(DAYS)})
+DAY_ALIASES.update({
+    'daily': list(range(7)),
+    'everyday': list(range(7)),
+    'weekdays': list(range(5)),
+    'weekends': [5, 6],
+})
+
+CLOSED_VALUES = {'', 'closed', 'none', 'off'}
+ALL_DAY_VALUES = {'24h', '24/7', '24 hours', 'open 24 hours', 'all day'}
+
+RANGE_PATTERN = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?')
+
+def _to_minutes(hours, minutes):
+    value = int(hours) * 60 + int(minutes or 0)
+    if value > MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time of day: {hours}:{minutes}")
+    return value
+
+def _parse_day_value(value):
+    """Parse a single day's hours into (open, close) minute pairs"""
+    if value is None or value is False:
+        return []
+    if value is True:
+        return [(0, MINUTES_PER_DAY)]
+    if isinstance(value, dict):
+        if value.get('closed'):
+            return []
+        if value.get('open') and value.get('close'):
+            return _parse_day_value(f"{value['open']}-{value['close']}")
+        return []
+    if isinstance(value, (list, tuple)):
+        ranges = []
+        for item in value:
+            ranges.extend(_parse_day_value(item))
+        return ranges
+
+    text = str(value).strip().lower()
+    if text in CLOSED_VALUES:
+        return []
+    if text in ALL_DAY_VALUES:
+        return [(0, MINUTES_PER_DAY)]
+
+    ranges = []
+    for match in RANGE_PATTERN.finditer(text):
+        open_at = _to_minutes(match.group(1), match.group(2))
+        close_at = _to_minutes(match.group(3), match.group(4))
+        ranges.append((open_at, close_at))
+    return ranges
+
+def merge_intervals(intervals):
+    """Sort and merge overlapping or touching intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def parse_operating_hours(hours_json):
+    """Convert free-form operating_hours_json into merged minute-of-week intervals
+
+    Unrecognized keys and values are ignored, so a venue with unparseable
+    hours yields no intervals rather than an error.
+    """
+    if not isinstance(hours_json, dict):
+        return []
+
+    intervals = []
+    for key, value in hours_json.items():
+        days = DAY_ALIASES.get(str(key).strip().lower())
+        if not days:
+            continue
+        try:
+            day_ranges = _parse_day_value(value)
+        except ValueError:
+            continue
+
+        for day in days:
+            day_start = day * MINUTES_PER_DAY
+            for open_at, close_at in day_ranges:
+                if close_at <= open_at:
+                    # Overnight hours spill into the next day, wrapping past Sunday
+                    close_at += MINUTES_PER_DAY
+                start = day_start + open_at
+                end = day_start + close_at
+                if end > MINUTES_PER_WEEK:
+                    intervals.append((start, MINUTES_PER_WEEK))
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                else:
+                    intervals.append((start, end))
+
+    return merge_intervals(intervals)
+
+def minute_of_week(value):
+    """Minute offset of a datetime from Monday 00:00 in the current timezone"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.weekday() * MINUTES_PER_DAY + value.hour * 60 + value.minute
+
+def intervals_cover(intervals, start, end=None):
+    """Check whether intervals cover the datetime span [start, end)"""
+    if not intervals:
+        return False
+
+    cursor = minute_of_week(start)
+    if end is None:
+        stop = cursor + 1
+    else:
+        stop = cursor + max(1, int((end - start).total_seconds() // 60))
+
+    while cursor < stop:
+        week_offset = cursor - cursor % MINUTES_PER_WEEK
+        position = cursor % MINUTES_PER_WEEK
+        for interval_start, interval_end in intervals:
+            if interval_start <= position < interval_end:
+                cursor = week_offset + interval_end
+                break
+        else:
+            return False
+    return True
+
+def sync_opening_intervals(venues):
+    """Rebuild normalized opening intervals for the given venues"""
+    from .models import VenueOpeningInterval
+
+    venues = list(venues)
+    if not venues:
+        return 0
+
+    rows = [
+        VenueOpeningInterval(venue_id=venue.pk, minutes=NumericRange(start, end))
+        for venue in venues
+        for start, end in parse_operating_hours(venue.operating_hours_json)
+    ]
+    VenueOpeningInterval.objects.filter(venue_id__in=[venue.pk for venue in venues]).delete()
+    VenueOpeningInterval.objects.bulk_create(rows)
+    return len(rows)
+
+class OpeningHoursCache:
+    """Per-process LRU of parsed hours keyed by venue and its updated_at"""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, venue):
+        key = (venue.pk, venue.updated_at)
+        with self._lock:
+            intervals = self._entries.get(key)
+            if intervals is not None:
+                self._entries.move_to_end(key)
+                return intervals
+
+        intervals = parse_operating_hours(venue.operating_hours_json)
+        with self._lock:
+            self._entries[key] = intervals
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return intervals
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+opening_hours_cache = OpeningHoursCache()
+
+def is_venue_open(venue, start, end=None):
+    """Whether the venue is open across [start, end), or None if hours are unknown"""
+    intervals = opening_hours_cache.get(venue)
+    if not intervals:
+        return None
+    return intervals_cover(intervals, start, end)
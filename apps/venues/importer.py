@@ -0,0 +1,363 @@
+"""Bulk venue and space import from partner CSV/GeoJSON files"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from rest_framework import serializers
+from .models import Venue, Space, refresh_space_summaries
+from .hours import sync_opening_intervals
+from .cache import space_state_cache
+from .search import invalidate_autocomplete
+
+IMPORT_NAMESPACE = uuid.UUID('5b0f1d8e-8a5e-4f59-9f3c-6d1c0a7e2b41')
+MAX_REPORTED_ERRORS = 1000
+
+VENUE_UPDATE_FIELDS = [
+    'venue_name', 'venue_type_code', 'address', 'city', 'country_code',
+    'location', 'wifi_speed_mbps', 'amenities_json', 'operating_hours_json',
+    'pricing_model', 'active_flag', 'updated_at',
+]
+
+SPACE_UPDATE_FIELDS = [
+    'space_name', 'capacity', 'hourly_rate', 'daily_rate', 'space_amenities_json',
+    'space_type_code', 'updated_at',
+]
+
+class JSONTextField(serializers.JSONField):
+    """JSON field that also accepts JSON-encoded strings from CSV cells"""
+    
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            if not data.strip():
+                return {}
+            try:
+                data = json.loads(data)
+            except ValueError:
+                self.fail('invalid')
+        return super().to_internal_value(data)
+
+class SpaceImportSerializer(serializers.Serializer):
+    """Space row validation for bulk import"""
+    space_name = serializers.CharField(max_length=255)
+    capacity = serializers.IntegerField(min_value=0)
+    hourly_rate = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    daily_rate = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    space_type_code = serializers.ChoiceField(choices=Space.SPACE_TYPES, required=False, allow_blank=True)
+    space_amenities_json = JSONTextField(required=False, default=dict)
+
+class VenueImportSerializer(serializers.Serializer):
+    """Venue row validation for bulk import"""
+    venue_id = serializers.UUIDField(required=False, allow_null=True)
+    external_ref = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    venue_name = serializers.CharField(max_length=255)
+    venue_type_code = serializers.ChoiceField(choices=Venue.VENUE_TYPES)
+    address = serializers.CharField()
+    city = serializers.CharField(max_length=100)
+    country_code = serializers.CharField(min_length=2, max_length=2)
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    wifi_speed_mbps = serializers.IntegerField(required=False, allow_null=True)
+    amenities_json = JSONTextField(required=False, default=dict)
+    operating_hours_json = JSONTextField(required=False, default=dict)
+    pricing_model = serializers.CharField(max_length=50)
+    active_flag = serializers.BooleanField(required=False, default=True)
+    spaces = SpaceImportSerializer(many=True, required=False, default=list)
+
+class MalformedRecord:
+    """Stand-in for a record that could not be decoded, reported as its row's error"""
+    
+    def __init__(self, message):
+        self.errors = {'non_field_errors': [message]}
+
+def _drop_blank_cells(row):
+    # Missing cells fall back to serializer defaults instead of failing as null
+    return {key: value for key, value in row.items() if key and value not in ('', None)}
+
+def iter_csv_records(stream):
+    """Yield (row_number, record) from a CSV with one space per row
+    
+    Venue columns repeat on every row of the same venue; rows without a
+    space_name describe the venue alone.
+    """
+    space_fields = set(SpaceImportSerializer().fields)
+    for row_number, row in enumerate(csv.DictReader(stream), start=2):
+        row = _drop_blank_cells(row)
+        space = {key: row.pop(key) for key in list(row) if key in space_fields}
+        row['spaces'] = [space] if space.get('space_name') else []
+        yield row_number, row
+
+def iter_geojson_features(stream, read_size=64 * 1024):
+    """Incrementally decode features from a GeoJSON FeatureCollection
+    
+    Only the features array is buffered, one feature at a time, so large
+    files are never loaded whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    in_features = False
+    eof = False
+    
+    while True:
+        if not in_features:
+            marker = buffer.find('"features"')
+            bracket = buffer.find('[', marker) if marker != -1 else -1
+            if bracket != -1:
+                buffer = buffer[bracket + 1:]
+                in_features = True
+                continue
+        else:
+            buffer = buffer.lstrip(' \t\r\n,')
+            if buffer.startswith(']'):
+                return
+            if buffer:
+                try:
+                    feature, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield feature
+                    buffer = buffer[end:]
+                    continue
+        
+        if eof:
+            if not in_features:
+                raise ValueError('No "features" array found in GeoJSON document')
+            return
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer += chunk
+
+def iter_geojson_lines(stream):
+    """Yield features from newline-delimited GeoJSON
+    
+    A line that is not valid JSON yields a MalformedRecord so the lines
+    after it are still imported.
+    """
+    for line in stream:
+        line = line.strip().lstrip('\x1e')
+        if line:
+            try:
+                feature = json.loads(line)
+            except ValueError as e:
+                feature = MalformedRecord(f'Malformed GeoJSON: {e}')
+            yield feature
+
+def _feature_to_record(feature):
+    if isinstance(feature, MalformedRecord):
+        return feature
+    if not isinstance(feature, dict):
+        return MalformedRecord('Expected a GeoJSON Feature object')
+    record = dict(feature.get('properties') or {})
+    geometry = feature.get('geometry') or {}
+    if geometry.get('type') == 'Point':
+        coordinates = geometry.get('coordinates') or [None, None]
+        record['longitude'], record['latitude'] = coordinates[0], coordinates[1]
+    record.setdefault('spaces', [])
+    return record
+
+def iter_records(stream, file_format):
+    """Iterator of (row_number, record) pairs for a supported file format"""
+    if file_format == 'csv':
+        return iter_csv_records(stream)
+    if file_format == 'geojson':
+        features = iter_geojson_features(stream)
+    elif file_format == 'geojsonl':
+        features = iter_geojson_lines(stream)
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+    return ((row_number, _feature_to_record(feature)) for row_number, feature in enumerate(features, start=1))
+
+class VenueImporter:
+    """Validate and upsert venues and spaces in chunked transactions
+    
+    Records without a venue_id get a deterministic one derived from the
+    owner and external_ref (or name and address), so re-importing the same
+    file updates rows instead of duplicating them. Spaces are matched by
+    name within their venue, so spaces created through the API are updated
+    rather than copied. Existing venues are only updated when they already
+    belong to the importing owner, and their owner is never changed. A file
+    that cannot be read to the end (malformed CSV, truncated GeoJSON, not
+    UTF-8) stops the import with a file error after the rows before it.
+    """
+    
+    def __init__(self, owner=None, chunk_size=500, dry_run=False):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+    
+    def run(self, stream, file_format):
+        """Import every record from a text stream and return a report"""
+        report = {
+            'rows_total': 0,
+            'rows_imported': 0,
+            'venues_upserted': 0,
+            'spaces_upserted': 0,
+            'errors': [],
+            'errors_truncated': 0,
+            'dry_run': self.dry_run,
+        }
+        started = time.monotonic()
+        
+        chunk = []
+        for row_number, record in self._read_records(stream, file_format, report):
+            chunk.append((row_number, record))
+            if len(chunk) >= self.chunk_size:
+                self._process_chunk(chunk, report)
+                chunk = []
+        self._process_chunk(chunk, report)
+        
+        if report['venues_upserted'] and not self.dry_run:
+            invalidate_autocomplete()
+        
+        elapsed = time.monotonic() - started
+        report['elapsed_seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['rows_total'] / elapsed, 1) if elapsed else None
+        return report
+    
+    def _read_records(self, stream, file_format, report):
+        # Read errors end the file but not the import: rows already read are still processed
+        records = iter_records(stream, file_format)
+        row_number = 1 if file_format == 'csv' else 0
+        try:
+            for row_number, record in records:
+                yield row_number, record
+        except csv.Error as e:
+            self._record_error(report, row_number + 1, {'file': [f'Malformed CSV: {e}']})
+        except UnicodeDecodeError as e:
+            self._record_error(report, row_number + 1, {'file': [f'File is not UTF-8 text: {e}']})
+        except ValueError as e:
+            self._record_error(report, row_number + 1, {'file': [f'Malformed file: {e}']})
+    
+    def _record_error(self, report, row_number, errors):
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': row_number, 'errors': errors})
+        else:
+            report['errors_truncated'] += 1
+    
+    def _venue_id(self, data):
+        if data.get('venue_id'):
+            return data['venue_id']
+        owner_key = self.owner.pk if self.owner else 'none'
+        natural_key = data.get('external_ref') or f"{data['venue_name']}|{data['address']}|{data['city']}"
+        return uuid.uuid5(IMPORT_NAMESPACE, f'{owner_key}:{natural_key}')
+    
+    def _foreign_venue_ids(self, venue_ids):
+        # Locked so a venue cannot change hands between this check and the upsert
+        owner_id = self.owner.pk if self.owner else None
+        return set(
+            Venue.objects.select_for_update()
+            .filter(venue_id__in=list(venue_ids))
+            .exclude(owner_user_id=owner_id)
+            .values_list('venue_id', flat=True)
+        )
+    
+    def _match_existing_spaces(self, spaces):
+        # Generated ids only name spaces the venue does not already have
+        existing = {
+            (venue_id, space_name): space_id
+            for venue_id, space_name, space_id in Space.objects.filter(
+                venue_id__in={space.venue_id for space in spaces.values()}
+            ).values_list('venue_id', 'space_name', 'space_id')
+        }
+        matched = {}
+        for space in spaces.values():
+            space.space_id = existing.get((space.venue_id, space.space_name), space.space_id)
+            matched[space.space_id] = space
+        return matched
+    
+    def _process_chunk(self, chunk, report):
+        if not chunk:
+            return
+        
+        venues = {}
+        spaces = {}
+        venue_rows = {}
+        for row_number, record in chunk:
+            report['rows_total'] += 1
+            if isinstance(record, MalformedRecord):
+                self._record_error(report, row_number, record.errors)
+                continue
+            serializer = VenueImportSerializer(data=record)
+            if not serializer.is_valid():
+                self._record_error(report, row_number, serializer.errors)
+                continue
+            
+            data = serializer.validated_data
+            venue_id = self._venue_id(data)
+            venue_rows.setdefault(venue_id, []).append(row_number)
+            # Later rows for the same venue win within a chunk
+            venues[venue_id] = Venue(
+                venue_id=venue_id,
+                venue_name=data['venue_name'],
+                venue_type_code=data['venue_type_code'],
+                owner_user=self.owner,
+                address=data['address'],
+                city=data['city'],
+                country_code=data['country_code'].upper(),
+                location=Point(data['longitude'], data['latitude'], srid=4326),
+                wifi_speed_mbps=data.get('wifi_speed_mbps'),
+                amenities_json=data.get('amenities_json') or {},
+                operating_hours_json=data.get('operating_hours_json') or {},
+                pricing_model=data['pricing_model'],
+                active_flag=data.get('active_flag', True),
+            )
+            for space in data.get('spaces', []):
+                space_id = uuid.uuid5(venue_id, space['space_name'])
+                spaces[space_id] = Space(
+                    space_id=space_id,
+                    venue_id=venue_id,
+                    space_name=space['space_name'],
+                    capacity=space['capacity'],
+                    hourly_rate=space.get('hourly_rate'),
+                    daily_rate=space.get('daily_rate'),
+                    space_type_code=space.get('space_type_code') or '',
+                    space_amenities_json=space.get('space_amenities_json') or {},
+                )
+            report['rows_imported'] += 1
+        
+        if not venues:
+            return
+        
+        with transaction.atomic():
+            foreign = self._foreign_venue_ids(venues.keys())
+            for venue_id in foreign:
+                del venues[venue_id]
+                for row_number in venue_rows[venue_id]:
+                    report['rows_imported'] -= 1
+                    self._record_error(report, row_number, {'venue_id': ['Venue belongs to another owner']})
+            spaces = {space_id: space for space_id, space in spaces.items() if space.venue_id not in foreign}
+            if self.dry_run or not venues:
+                return
+            spaces = self._match_existing_spaces(spaces)
+            
+            Venue.objects.bulk_create(
+                list(venues.values()),
+                update_conflicts=True,
+                unique_fields=['venue_id'],
+                update_fields=VENUE_UPDATE_FIELDS,
+            )
+            if spaces:
+                Space.objects.bulk_create(
+                    list(spaces.values()),
+                    update_conflicts=True,
+                    unique_fields=['space_id'],
+                    update_fields=SPACE_UPDATE_FIELDS,
+                )
+            # bulk_create skips model signals, so derived data is refreshed here
+            refresh_space_summaries(venues.keys())
+            sync_opening_intervals(venues.values())
+        space_state_cache.delete_many(spaces.keys())
+        
+        report['venues_upserted'] += len(venues)
+        report['spaces_upserted'] += len(spaces)
+
+def import_venues(fileobj, file_format, **options):
+    """Run an import from a binary or text file object"""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    return VenueImporter(**options).run(fileobj, file_format)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.venues.models import Venue, refresh_space_summaries
+
+class Command(BaseCommand):
+    help = 'Populate denormalized space summary columns on existing venues'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        venue_ids = Venue.objects.order_by('venue_id').values_list('venue_id', flat=True)
+        
+        batch = []
+        updated = 0
+        for venue_id in venue_ids.iterator(chunk_size=batch_size):
+            batch.append(venue_id)
+            if len(batch) >= batch_size:
+                updated += refresh_space_summaries(batch)
+                batch = []
+        updated += refresh_space_summaries(batch)
+        
+        self.stdout.write(self.style.SUCCESS(f'Refreshed space summaries for {updated} venues'))
@@ -0,0 +1,47 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from apps.authentication.models import User
+from apps.venues.importer import VenueImporter
+
+class Command(BaseCommand):
+    help = 'Bulk import venues and spaces from a partner CSV or GeoJSON file'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'geojson', 'geojsonl'], default=None,
+                            help='File format; inferred from the extension when omitted')
+        parser.add_argument('--owner-email', help='Partner user who will own the imported venues')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without writing')
+    
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.infer_format(path)
+        
+        owner = None
+        if options['owner_email']:
+            try:
+                owner = User.objects.get(email=options['owner_email'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner_email']}")
+        
+        importer = VenueImporter(owner=owner, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        with open(path, encoding='utf-8-sig', newline='') as stream:
+            report = importer.run(stream, file_format)
+        
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'], default=str)}")
+        
+        summary = {key: value for key, value in report.items() if key != 'errors'}
+        summary['error_count'] = len(report['errors']) + report['errors_truncated']
+        self.stdout.write(self.style.SUCCESS(json.dumps(summary)))
+    
+    def infer_format(self, path):
+        lowered = path.lower()
+        if lowered.endswith('.csv'):
+            return 'csv'
+        if lowered.endswith(('.geojsonl', '.geojsonseq', '.ndjson', '.jsonl')):
+            return 'geojsonl'
+        if lowered.endswith(('.geojson', '.json')):
+            return 'geojson'
+        raise CommandError('Cannot infer file format; pass --format')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from apps.venues.ranking import refresh_venue_popularity
+
+class Command(BaseCommand):
+    help = 'Recompute precomputed venue popularity scores used by ranked search'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--booking-window-days', type=int, default=30)
+        parser.add_argument('--occupancy-window-days', type=int, default=7)
+    
+    def handle(self, *args, **options):
+        refreshed = refresh_venue_popularity(
+            booking_window_days=options['booking_window_days'],
+            occupancy_window_days=options['occupancy_window_days'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Refreshed popularity for {refreshed} venues'))
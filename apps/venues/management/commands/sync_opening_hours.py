@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.venues.models import Venue
+from apps.venues.hours import sync_opening_intervals
+
+class Command(BaseCommand):
+    help = 'Rebuild normalized opening intervals from venue operating_hours_json'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        venues = Venue.objects.order_by('venue_id').only('venue_id', 'operating_hours_json')
+        
+        batch = []
+        intervals = 0
+        for venue in venues.iterator(chunk_size=batch_size):
+            batch.append(venue)
+            if len(batch) >= batch_size:
+                intervals += sync_opening_intervals(batch)
+                batch = []
+        intervals += sync_opening_intervals(batch)
+        
+        self.stdout.write(self.style.SUCCESS(f'Wrote {intervals} opening intervals'))
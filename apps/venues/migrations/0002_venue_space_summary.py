@@ -0,0 +1,45 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='max_space_capacity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='min_hourly_rate',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='space_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='space_types',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), blank=True, default=list, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['active_flag', 'max_space_capacity'], name='venue_active_capacity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['active_flag', 'min_hourly_rate'], name='venue_active_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['space_types'], name='venue_space_types_gin'),
+        ),
+    ]
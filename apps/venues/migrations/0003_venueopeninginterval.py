@@ -0,0 +1,31 @@
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0002_venue_space_summary'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='VenueOpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minutes', django.contrib.postgres.fields.ranges.IntegerRangeField()),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='venues.venue')),
+            ],
+            options={
+                'db_table': 'venue_opening_interval',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='venueopeninginterval',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['venue', 'minutes'], name='venue_opening_minutes_gist'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0004_venue_autocomplete_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenuePopularity',
+            fields=[
+                ('venue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='venues.venue')),
+                ('recent_bookings', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('occupancy_rate', models.FloatField(default=0)),
+                ('popularity_score', models.FloatField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'venue_popularity',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='venuepopularity',
+            index=models.Index(fields=['-popularity_score'], name='venue_popularity_score_idx'),
+        ),
+    ]
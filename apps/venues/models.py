@@ -1,6 +1,12 @@
 import uuid
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField, IntegerRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.indexes import OpClass
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Upper
 from apps.authentication.models import User
 
 class Venue(models.Model):
@@ -26,12 +32,29 @@ class Venue(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Denormalized space summary, maintained by apps.venues.signals
+    max_space_capacity = models.PositiveIntegerField(default=0)
+    min_hourly_rate = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    space_count = models.PositiveIntegerField(default=0)
+    space_types = ArrayField(models.CharField(max_length=20), default=list, blank=True)
+    
     class Meta:
         db_table = 'venue'
         indexes = [
             models.Index(fields=['venue_type_code']),
             models.Index(fields=['active_flag']),
+            models.Index(fields=['active_flag', 'max_space_capacity'], name='venue_active_capacity_idx'),
+            models.Index(fields=['active_flag', 'min_hourly_rate'], name='venue_active_rate_idx'),
+            GinIndex(fields=['space_types'], name='venue_space_types_gin'),
+            # Trigram indexes back case-insensitive prefix/contains autocomplete lookups
+            GinIndex(OpClass(Upper('venue_name'), name='gin_trgm_ops'), name='venue_name_trgm'),
+            GinIndex(OpClass(Upper('city'), name='gin_trgm_ops'), name='venue_city_trgm'),
         ]
+    
+    def refresh_space_summary(self):
+        """Recompute denormalized space summary for this venue"""
+        refresh_space_summaries([self.pk])
+        self.refresh_from_db(fields=list(SPACE_SUMMARY_FIELDS))
 
 class Space(models.Model):
     SPACE_TYPES = [
@@ -59,4 +82,66 @@ class Space(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        db_table = 'space'
\ No newline at end of file
+        db_table = 'space'
+
+class VenuePopularity(models.Model):
+    """Precomputed popularity signals, refreshed by refresh_venue_popularity"""
+    
+    venue = models.OneToOneField(Venue, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    recent_bookings = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    occupancy_rate = models.FloatField(default=0)
+    popularity_score = models.FloatField(default=0)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'venue_popularity'
+        indexes = [
+            models.Index(fields=['-popularity_score'], name='venue_popularity_score_idx'),
+        ]
+
+class VenueOpeningInterval(models.Model):
+    """Normalized weekly opening hours parsed from operating_hours_json"""
+    
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='opening_intervals')
+    # Half-open minute-of-week range, Monday 00:00 = 0
+    minutes = IntegerRangeField()
+    
+    class Meta:
+        db_table = 'venue_opening_interval'
+        indexes = [
+            GistIndex(fields=['venue', 'minutes'], name='venue_opening_minutes_gist'),
+        ]
+
+SPACE_SUMMARY_FIELDS = ('max_space_capacity', 'min_hourly_rate', 'space_count', 'space_types')
+
+def refresh_space_summaries(venue_ids):
+    """Recompute denormalized space summaries for the given venues in bulk"""
+    venue_ids = list(venue_ids)
+    if not venue_ids:
+        return 0
+    
+    summaries = {
+        row['venue_id']: row
+        for row in Space.objects.filter(venue_id__in=venue_ids).values('venue_id').annotate(
+            max_capacity=Max('capacity'),
+            min_rate=Min('hourly_rate'),
+            total=Count('space_id'),
+            types=ArrayAgg('space_type_code', distinct=True, filter=~Q(space_type_code='')),
+        )
+    }
+    
+    venues = []
+    for venue_id in venue_ids:
+        summary = summaries.get(venue_id, {})
+        venues.append(Venue(
+            venue_id=venue_id,
+            max_space_capacity=summary.get('max_capacity') or 0,
+            min_hourly_rate=summary.get('min_rate'),
+            space_count=summary.get('total') or 0,
+            space_types=sorted(summary.get('types') or []),
+        ))
+    
+    # bulk_update bypasses save(), so updated_at is left untouched
+    Venue.objects.bulk_update(venues, SPACE_SUMMARY_FIELDS)
+    return len(venues)
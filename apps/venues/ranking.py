@@ -0,0 +1,88 @@
+"""Venue popularity precomputation for ranked search"""
+
+import math
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.iot.models import OccupancyEvent
+from apps.reviews.models import VenueRating
+from .models import Venue, VenuePopularity
+
+BOOKING_WEIGHT = 0.5
+RATING_WEIGHT = 0.3
+OCCUPANCY_WEIGHT = 0.2
+
+def popularity_score(recent_bookings, max_bookings, average_rating, occupancy_rate):
+    """Blend normalized signals into a 0..1 score"""
+    booking_signal = math.log1p(recent_bookings) / math.log1p(max_bookings) if max_bookings else 0.0
+    rating_signal = float(average_rating or 0) / 5
+    occupancy_signal = min(max(occupancy_rate or 0.0, 0.0), 1.0)
+    return (
+        BOOKING_WEIGHT * booking_signal
+        + RATING_WEIGHT * rating_signal
+        + OCCUPANCY_WEIGHT * occupancy_signal
+    )
+
+def refresh_venue_popularity(booking_window_days=30, occupancy_window_days=7, batch_size=1000):
+    """Recompute the venue_popularity table from bookings, ratings and IoT occupancy
+    
+    Each signal is one grouped aggregate, so the cost is independent of how
+    often ranked search runs.
+    """
+    now = timezone.now()
+    
+    recent_bookings = dict(
+        Booking.objects.filter(
+            created_at__gte=now - timezone.timedelta(days=booking_window_days),
+            booking_status_code__in=['Confirmed', 'Completed'],
+        ).values('venue_id').annotate(total=Count('booking_id')).values_list('venue_id', 'total')
+    )
+    ratings = dict(VenueRating.objects.values_list('venue_id', 'average_overall_rating'))
+    occupancy = dict(
+        OccupancyEvent.objects.filter(
+            timestamp__gte=now - timezone.timedelta(days=occupancy_window_days),
+            space__capacity__gt=0,
+        ).values('space__venue_id').annotate(
+            rate=Avg(Cast('occupancy_count', FloatField()) / Cast(F('space__capacity'), FloatField()))
+        ).values_list('space__venue_id', 'rate')
+    )
+    max_bookings = max(recent_bookings.values(), default=0)
+    
+    venue_ids = Venue.objects.filter(active_flag=True).values_list('venue_id', flat=True)
+    refreshed = 0
+    batch = []
+    with transaction.atomic():
+        for venue_id in venue_ids.iterator(chunk_size=batch_size):
+            bookings = recent_bookings.get(venue_id, 0)
+            rating = ratings.get(venue_id) or 0
+            rate = occupancy.get(venue_id) or 0.0
+            batch.append(VenuePopularity(
+                venue_id=venue_id,
+                recent_bookings=bookings,
+                average_rating=rating,
+                occupancy_rate=rate,
+                popularity_score=popularity_score(bookings, max_bookings, rating, rate),
+                refreshed_at=now,
+            ))
+            if len(batch) >= batch_size:
+                refreshed += _upsert(batch)
+                batch = []
+        refreshed += _upsert(batch)
+        
+        # Venues deactivated since the last refresh drop out of the table
+        VenuePopularity.objects.filter(refreshed_at__lt=now).delete()
+    
+    return refreshed
+
+def _upsert(rows):
+    if not rows:
+        return 0
+    VenuePopularity.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['venue'],
+        update_fields=['recent_bookings', 'average_rating', 'occupancy_rate', 'popularity_score', 'refreshed_at'],
+    )
+    return len(rows)
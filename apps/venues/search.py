@@ -0,0 +1,210 @@
+"""Venue search queries shared by the search endpoints"""
+
+import hashlib
+import json
+import time
+from django.contrib.gis.db.models.functions import Distance as DistanceFunction
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import Distance
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Exists, ExpressionWrapper, FloatField, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Cast, Coalesce
+from .models import Venue, VenueOpeningInterval
+from .hours import minute_of_week
+
+AUTOCOMPLETE_GENERATION_KEY = 'venues:autocomplete:gen'
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+# Share of the blended rank given to popularity, the rest to proximity
+POPULARITY_RANK_WEIGHT = 0.4
+
+def build_search_queryset(data):
+    """Filtered, ordered venue queryset for validated VenueSearchSerializer data
+    
+    Returns the queryset and the search point. Results carry a `distance`
+    annotation; ranking='popular' blends precomputed popularity with
+    proximity instead of ordering purely by distance.
+    """
+    search_point = Point(data['longitude'], data['latitude'], srid=4326)
+    radius = Distance(km=data['radius_km'])
+    
+    queryset = Venue.objects.filter(
+        location__distance_lte=(search_point, radius),
+        active_flag=True
+    ).annotate(distance=DistanceFunction('location', search_point))
+    
+    if data.get('venue_type'):
+        queryset = queryset.filter(venue_type_code=data['venue_type'])
+    
+    # Space filters hit the denormalized venue summary, so no join or DISTINCT
+    if data.get('min_capacity'):
+        queryset = queryset.filter(max_space_capacity__gte=data['min_capacity'])
+    
+    if data.get('max_hourly_rate') is not None:
+        queryset = queryset.filter(min_hourly_rate__lte=data['max_hourly_rate'])
+    
+    if data.get('space_type'):
+        queryset = queryset.filter(space_types__contains=[data['space_type']])
+    
+    if data.get('open_at'):
+        queryset = queryset.filter(Exists(VenueOpeningInterval.objects.filter(
+            venue=OuterRef('pk'),
+            minutes__contains=minute_of_week(data['open_at'])
+        )))
+    
+    if data.get('amenities'):
+        for amenity in data['amenities']:
+            queryset = queryset.filter(amenities_json__contains={amenity: True})
+    
+    if data.get('ranking') == 'popular':
+        proximity = Value(1.0) - Cast('distance', FloatField()) / Value(radius.m)
+        queryset = queryset.annotate(rank_score=ExpressionWrapper(
+            Value(POPULARITY_RANK_WEIGHT) * Coalesce('popularity__popularity_score', Value(0.0))
+            + Value(1 - POPULARITY_RANK_WEIGHT) * proximity,
+            output_field=FloatField(),
+        )).order_by('-rank_score', 'distance')
+    else:
+        queryset = queryset.order_by('distance')
+    
+    return queryset, search_point
+
+def autocomplete_venues(query, limit=8, point=None):
+    """Top venue name/city matches for a typeahead prefix
+
+    Ranked by prefix match (venue name over city), then precomputed popularity, then
+    distance from `point` when given. Only the columns needed for the
+    suggestion are read, and results are cached briefly per prefix.
+    """
+    query = ' '.join(query.split())
+    cache_key = _autocomplete_cache_key(query, limit, point)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    queryset = Venue.objects.filter(
+        Q(venue_name__icontains=query) | Q(city__istartswith=query),
+        active_flag=True,
+    ).annotate(
+        prefix_rank=Case(
+            When(venue_name__istartswith=query, then=Value(2)),
+            When(city__istartswith=query, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        popularity=Coalesce('popularity__popularity_score', Value(0.0), output_field=FloatField()),
+    )
+
+    ordering = ['-prefix_rank', '-popularity']
+    fields = ['venue_id', 'venue_name', 'city']
+    if point is not None:
+        queryset = queryset.annotate(distance=DistanceFunction('location', point))
+        ordering.append('distance')
+        fields.append('distance')
+    ordering.append('venue_name')
+
+    results = []
+    for row in queryset.order_by(*ordering).values(*fields)[:limit]:
+        distance = row.pop('distance', None)
+        row['distance_m'] = round(distance.m) if distance is not None else None
+        results.append(row)
+
+    cache.set(cache_key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
+
+def _autocomplete_cache_key(query, limit, point):
+    # Round the origin so nearby clients share cache entries
+    origin = f'{point.y:.2f},{point.x:.2f}' if point is not None else ''
+    digest = hashlib.md5(f'{query.lower()}|{limit}|{origin}'.encode()).hexdigest()
+    return f'venues:autocomplete:{_autocomplete_generation()}:{digest}'
+
+def _autocomplete_generation():
+    # Seeded from the clock, so a generation evicted from the cache never
+    # comes back with a number that older entries were stored under
+    generation = cache.get(AUTOCOMPLETE_GENERATION_KEY)
+    if generation is None:
+        cache.add(AUTOCOMPLETE_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(AUTOCOMPLETE_GENERATION_KEY)
+    return generation
+
+def invalidate_autocomplete():
+    """Move autocomplete to a new generation; old entries are never read again and expire"""
+    try:
+        cache.incr(AUTOCOMPLETE_GENERATION_KEY)
+    except ValueError:
+        cache.add(AUTOCOMPLETE_GENERATION_KEY, time.time_ns(), None)
+
+BATCH_SEARCH_SQL = """
+SELECT q.query_id, match.venue_id, match.distance_m
+FROM (VALUES {values}) AS q(
+    query_id, lng, lat, radius_m, venue_type, min_capacity, max_rate,
+    space_type, amenities, open_minute, popular
+)
+CROSS JOIN LATERAL (
+    SELECT venue.venue_id, distance.meters AS distance_m,
+           CASE WHEN q.popular
+                THEN -(%s * COALESCE(venue_popularity.popularity_score, 0)
+                       + %s * (1 - distance.meters / q.radius_m))
+                ELSE distance.meters
+           END AS rank_key
+    FROM (SELECT ST_SetSRID(ST_MakePoint(q.lng, q.lat), 4326)::geography AS point) AS origin
+    CROSS JOIN venue
+    CROSS JOIN LATERAL (SELECT ST_Distance(venue.location, origin.point) AS meters) AS distance
+    LEFT JOIN venue_popularity ON venue_popularity.venue_id = venue.venue_id
+    WHERE venue.active_flag
+      AND ST_DWithin(venue.location, origin.point, q.radius_m)
+      AND (q.venue_type IS NULL OR venue.venue_type_code = q.venue_type)
+      AND (q.min_capacity IS NULL OR venue.max_space_capacity >= q.min_capacity)
+      AND (q.max_rate IS NULL OR venue.min_hourly_rate <= q.max_rate)
+      AND (q.space_type IS NULL OR venue.space_types @> ARRAY[q.space_type]::varchar(20)[])
+      AND (q.amenities IS NULL OR venue.amenities_json @> q.amenities)
+      AND (q.open_minute IS NULL OR EXISTS (
+          SELECT 1 FROM venue_opening_interval
+          WHERE venue_opening_interval.venue_id = venue.venue_id
+            AND venue_opening_interval.minutes @> q.open_minute
+      ))
+    ORDER BY rank_key, distance_m
+    LIMIT %s
+) AS match
+ORDER BY q.query_id, match.rank_key, match.distance_m
+"""
+
+BATCH_VALUES_ROW = (
+    "(%s::text, %s::float8, %s::float8, %s::float8, %s::text, %s::int, "
+    "%s::numeric, %s::text, %s::jsonb, %s::int, %s::bool)"
+)
+
+def batch_venue_search(queries, limit=20):
+    """Run many venue searches in one round trip
+    
+    Each validated VenueBatchQuerySerializer item becomes a VALUES row and
+    the same filters as build_search_queryset() run per row in a LATERAL
+    subquery, so every query keeps its own ordering and limit. Returns
+    {query_id: [(venue_id, distance_m), ...]} with every query id present.
+    """
+    values = []
+    params = []
+    for query in queries:
+        amenities = query.get('amenities')
+        values.append(BATCH_VALUES_ROW)
+        params.extend([
+            query['id'],
+            query['longitude'],
+            query['latitude'],
+            query['radius_km'] * 1000,
+            query.get('venue_type'),
+            query.get('min_capacity') or None,
+            query.get('max_hourly_rate'),
+            query.get('space_type'),
+            json.dumps({amenity: True for amenity in amenities}) if amenities else None,
+            minute_of_week(query['open_at']) if query.get('open_at') else None,
+            query.get('ranking') == 'popular',
+        ])
+    params.extend([POPULARITY_RANK_WEIGHT, 1 - POPULARITY_RANK_WEIGHT, limit])
+    
+    results = {query['id']: [] for query in queries}
+    with connection.cursor() as cursor:
+        cursor.execute(BATCH_SEARCH_SQL.format(values=', '.join(values)), params)
+        for query_id, venue_id, distance_m in cursor.fetchall():
+            results[query_id].append((venue_id, distance_m))
+    return results
@@ -12,8 +12,37 @@ class SpaceSerializer(serializers.ModelSerializer):
                  'availability_status', 'space_amenities_json', 'space_type_code']
         read_only_fields = ['space_id']
 
-class VenueSerializer(GeoFeatureModelSerializer):
+class SparseFieldsetMixin:
+    """Trim output to the `fields` and `include` lists passed in serializer context
+    
+    Expandable fields are dropped unless named in `include`; when `fields` is
+    given, everything outside it (plus `required_fields`) is dropped too.
+    Without either context key the serializer renders in full.
+    """
+    expandable_fields = ()
+    required_fields = ()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        include = self.context.get('include')
+        
+        if include is not None:
+            for name in self.expandable_fields:
+                if name not in include:
+                    self.fields.pop(name, None)
+        
+        if requested:
+            allowed = set(requested) | set(include or ()) | set(self.required_fields)
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
+
+class VenueSerializer(SparseFieldsetMixin, GeoFeatureModelSerializer):
     """Venue serializer with geospatial support"""
+    expandable_fields = ('spaces',)
+    required_fields = ('venue_id', 'location')
+    
     spaces = SpaceSerializer(many=True, read_only=True)
     latitude = serializers.FloatField(write_only=True)
     longitude = serializers.FloatField(write_only=True)
@@ -24,8 +53,10 @@ class VenueSerializer(GeoFeatureModelSerializer):
         geo_field = 'location'
         fields = ['venue_id', 'venue_name', 'venue_type_code', 'address', 'city',
                  'country_code', 'wifi_speed_mbps', 'amenities_json', 'operating_hours_json',
-                 'pricing_model', 'active_flag', 'spaces', 'latitude', 'longitude', 'distance']
-        read_only_fields = ['venue_id', 'distance']
+                 'pricing_model', 'active_flag', 'spaces', 'latitude', 'longitude', 'distance',
+                 'max_space_capacity', 'min_hourly_rate', 'space_count', 'space_types']
+        read_only_fields = ['venue_id', 'distance', 'max_space_capacity', 'min_hourly_rate',
+                           'space_count', 'space_types']
     
     def create(self, validated_data):
         latitude = validated_data.pop('latitude')
@@ -39,6 +70,9 @@ class VenueSerializer(GeoFeatureModelSerializer):
     
     def get_distance(self, obj):
         """Calculate distance from search point if provided"""
+        # Search querysets annotate the geodesic distance in SQL
+        if getattr(obj, 'distance', None) is not None:
+            return obj.distance.m
         request = self.context.get('request')
         if request and hasattr(request, 'search_point'):
             return obj.location.distance(request.search_point) * 111000  # Convert to meters
@@ -51,4 +85,38 @@ class VenueSearchSerializer(serializers.Serializer):
     radius_km = serializers.FloatField(default=10.0)
     venue_type = serializers.ChoiceField(choices=Venue.VENUE_TYPES, required=False)
     min_capacity = serializers.IntegerField(required=False)
-    amenities = serializers.ListField(child=serializers.CharField(), required=False)
\ No newline at end of file
+    max_hourly_rate = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    space_type = serializers.ChoiceField(choices=Space.SPACE_TYPES, required=False)
+    open_at = serializers.DateTimeField(required=False)
+    ranking = serializers.ChoiceField(choices=['distance', 'popular'], default='distance')
+    amenities = serializers.ListField(child=serializers.CharField(), required=False)
+
+class VenueBatchQuerySerializer(VenueSearchSerializer):
+    """One search in a batch, identified by a client-chosen id"""
+    id = serializers.CharField(max_length=64)
+
+class VenueBatchSearchSerializer(serializers.Serializer):
+    """Batch venue search parameters"""
+    queries = VenueBatchQuerySerializer(many=True, allow_empty=False, max_length=50)
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=50)
+    
+    def validate_queries(self, value):
+        ids = [query['id'] for query in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Query ids must be unique")
+        return value
+
+class VenueAutocompleteSerializer(serializers.Serializer):
+    """Venue autocomplete parameters"""
+    q = serializers.CharField(min_length=2, max_length=100)
+    limit = serializers.IntegerField(default=8, min_value=1, max_value=20)
+    latitude = serializers.FloatField(required=False)
+    longitude = serializers.FloatField(required=False)
+
+
+class VenueImportRequestSerializer(serializers.Serializer):
+    """Bulk venue import upload"""
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'geojson', 'geojsonl'])
+    chunk_size = serializers.IntegerField(default=500, min_value=1, max_value=5000)
+    dry_run = serializers.BooleanField(default=False)
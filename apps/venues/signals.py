@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Venue, Space, refresh_space_summaries
+from .cache import space_state_cache
+from apps.iot.occupancy import venue_occupancy
+from .hours import sync_opening_intervals
+from .search import invalidate_autocomplete
+
+def _deleting_venue(origin):
+    # Spaces deleted along with their venue need no per-space bookkeeping
+    if isinstance(origin, QuerySet):
+        return origin.model is Venue
+    return isinstance(origin, Venue)
+
+@receiver(pre_save, sender=Space)
+def space_saving(sender, instance, using, raw=False, update_fields=None, **kwargs):
+    """Remember the venue a space is saved away from, so both venues are refreshed"""
+    instance._previous_venue_id = None
+    if update_fields is not None and not {'venue', 'venue_id'} & set(update_fields):
+        return
+    if not raw and not instance._state.adding:
+        instance._previous_venue_id = (
+            Space.objects.using(using).filter(pk=instance.pk).values_list('venue_id', flat=True).first()
+        )
+
+@receiver(post_save, sender=Space)
+def space_saved(sender, instance, **kwargs):
+    """Keep venue search summary and cached space state in step with its spaces"""
+    venue_ids = [instance.venue_id]
+    previous_venue_id = getattr(instance, '_previous_venue_id', None)
+    if previous_venue_id not in (None, instance.venue_id):
+        venue_ids.append(previous_venue_id)
+        # As with a deletion, the old venue's Last-Modified loses this space's updated_at
+        Venue.objects.filter(pk=previous_venue_id).update(updated_at=timezone.now())
+        space_id = instance.pk
+        transaction.on_commit(lambda: venue_occupancy.remove_space(space_id))
+    refresh_space_summaries(venue_ids)
+    # After commit, so a rolled-back save never reaches the shared cache
+    transaction.on_commit(lambda: space_state_cache.set(instance))
+
+@receiver(post_delete, sender=Space)
+def space_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_venue(origin):
+        return
+    refresh_space_summaries([instance.venue_id])
+    # The venue's Last-Modified comes from updated_at values; a deletion leaves none behind
+    Venue.objects.filter(pk=instance.venue_id).update(updated_at=timezone.now())
+    space_id = instance.pk
+    transaction.on_commit(lambda: space_state_cache.delete(space_id))
+    transaction.on_commit(lambda: venue_occupancy.remove_space(space_id))
+
+@receiver(post_save, sender=Venue)
+def venue_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh autocomplete and re-normalize opening hours if they may have changed"""
+    invalidate_autocomplete()
+    if update_fields is not None and 'operating_hours_json' not in update_fields:
+        return
+    sync_opening_intervals([instance])
+
+@receiver(pre_delete, sender=Venue)
+def venue_deleting(sender, instance, using, **kwargs):
+    """Drop cached state of the spaces deleted with the venue in one batch"""
+    space_ids = list(Space.objects.using(using).filter(venue_id=instance.pk).values_list('pk', flat=True))
+    if space_ids:
+        transaction.on_commit(lambda: space_state_cache.delete_many(space_ids))
+        transaction.on_commit(lambda: venue_occupancy.remove_spaces(space_ids))
+
+@receiver(post_delete, sender=Venue)
+def venue_deleted(sender, instance, **kwargs):
+    invalidate_autocomplete()
@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+venue_search_view = views.venue_search_async if settings.ASYNC_FAST_PATH else views.venue_search
+
 urlpatterns = [
     path('', views.VenueListCreateView.as_view(), name='venue-list'),
     path('<uuid:venue_id>/', views.VenueDetailView.as_view(), name='venue-detail'),
-    path('search/', views.venue_search, name='venue-search'),
+    path('search/', venue_search_view, name='venue-search'),
+    path('search/batch/', views.venue_batch_search, name='venue-batch-search'),
+    path('autocomplete/', views.venue_autocomplete, name='venue-autocomplete'),
+    path('import/', views.venue_import, name='venue-import'),
     path('<uuid:venue_id>/spaces/', views.SpaceListCreateView.as_view(), name='space-list'),
     path('spaces/<uuid:space_id>/', views.SpaceDetailView.as_view(), name='space-detail'),
 ]
\ No newline at end of file
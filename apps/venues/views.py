@@ -1,73 +1,199 @@
+import copy
+import uuid
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import Distance
+from django.db.models import Max
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Venue, Space
-from .serializers import VenueSerializer, SpaceSerializer, VenueSearchSerializer
+from .serializers import (
+    VenueSerializer, SpaceSerializer, VenueSearchSerializer, VenueBatchSearchSerializer,
+    VenueAutocompleteSerializer, VenueImportRequestSerializer,
+)
+from .search import autocomplete_venues, batch_venue_search, build_search_queryset
+from .importer import import_venues
 from core.permissions.rbac import IsPartnerAdmin, IsVenueOwner
+from core.cache.conditional import ConditionalRetrieveMixin
+from core.db.routers import ReplicaReadMixin, use_replica
+from core.utils.async_api import async_api_view, json_response
 
-class VenueListCreateView(generics.ListCreateAPIView):
-    """Venue listing and creation"""
+class VenueListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
+    """Venue listing and creation
+    
+    Listings are lightweight by default: nested spaces are only rendered
+    (and prefetched) with `?include=spaces`, and `?fields=a,b` narrows both
+    the serialized properties and the columns loaded.
+    """
     serializer_class = VenueSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['venue_type_code', 'city', 'active_flag']
     
+    def get_query_list(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+    
     def get_queryset(self):
-        return Venue.objects.filter(active_flag=True).select_related('owner_user')
+        queryset = Venue.objects.filter(active_flag=True)
+        if self.request.method != 'GET':
+            return queryset
+        
+        fields = self.get_query_list('fields')
+        if fields:
+            concrete = {field.name for field in Venue._meta.concrete_fields}
+            columns = {'venue_id', 'location'} | {name for name in fields if name in concrete}
+            queryset = queryset.only(*columns)
+        
+        if 'spaces' in (self.get_query_list('include') or []):
+            queryset = queryset.prefetch_related('spaces')
+        
+        return queryset
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            context['fields'] = self.get_query_list('fields')
+            context['include'] = self.get_query_list('include') or []
+        return context
     
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsPartnerAdmin()]
         return super().get_permissions()
 
-class VenueDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VenueDetailView(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     """Venue detail operations"""
     serializer_class = VenueSerializer
     lookup_field = 'venue_id'
     permission_classes = [IsVenueOwner]
+    version_only_fields = ('owner_user', 'space_count')
     
     def get_queryset(self):
         return Venue.objects.filter(active_flag=True).prefetch_related('spaces')
     
+    def get_version_queryset(self):
+        # Nested spaces are part of the representation; space_count catches deletions
+        return super().get_version_queryset().annotate(spaces_updated_at=Max('spaces__updated_at'))
+    
+    def get_object_version(self, obj):
+        return [obj.updated_at, obj.spaces_updated_at, obj.space_count]
+    
     def perform_destroy(self, instance):
         # Soft delete
         instance.active_flag = False
         instance.save()
 
 @api_view(['POST'])
+@use_replica()
 def venue_search(request):
     """Geospatial venue search"""
     serializer = VenueSearchSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    queryset, search_point = build_search_queryset(serializer.validated_data)
+    
+    # Add search point to request for distance calculation
+    request.search_point = search_point
+    
+    serializer = VenueSerializer(queryset.prefetch_related('spaces')[:20], many=True, context={'request': request})
+    return Response(serializer.data)
+
+@async_api_view(['POST'])
+async def venue_search_async(request, data):
+    """Geospatial venue search on the async fast path
+    
+    Same contract as venue_search; the query runs through the async ORM so
+    the event loop keeps serving other connections meanwhile.
+    """
+    serializer = VenueSearchSerializer(data=data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    queryset, search_point = build_search_queryset(serializer.validated_data)
+    request.search_point = search_point
+    
+    with use_replica():
+        # Spaces are prefetched up front; serializing must not touch the database
+        venues = [venue async for venue in queryset.prefetch_related('spaces')[:20]]
+    
+    serializer = VenueSerializer(venues, many=True, context={'request': request})
+    return json_response(serializer.data)
+
+@api_view(['POST'])
+@use_replica()
+def venue_batch_search(request):
+    """Run many geospatial venue searches in one request
+    
+    Results are keyed by each query's id; every query is answered by a
+    single SQL statement and the matched venues are loaded once.
+    """
+    serializer = VenueBatchSearchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
     data = serializer.validated_data
-    search_point = Point(data['longitude'], data['latitude'])
-    radius = Distance(km=data['radius_km'])
+    matches = batch_venue_search(data['queries'], limit=data['limit'])
     
-    queryset = Venue.objects.filter(
-        location__distance_lte=(search_point, radius),
-        active_flag=True
-    ).distance(search_point).order_by('distance')
+    venue_ids = {uuid.UUID(str(venue_id)) for rows in matches.values() for venue_id, _ in rows}
+    venues = Venue.objects.in_bulk(venue_ids)
     
-    # Apply additional filters
-    if data.get('venue_type'):
-        queryset = queryset.filter(venue_type_code=data['venue_type'])
+    context = {'request': request, 'include': []}
+    results = {}
+    for query_id, rows in matches.items():
+        instances = []
+        for venue_id, distance_m in rows:
+            # The same venue can match several queries at different distances
+            venue = copy.copy(venues[uuid.UUID(str(venue_id))])
+            venue.distance = Distance(m=distance_m)
+            instances.append(venue)
+        results[query_id] = VenueSerializer(instances, many=True, context=context).data
+    
+    return Response({'results': results})
+
+@api_view(['GET'])
+@use_replica()
+def venue_autocomplete(request):
+    """Typeahead suggestions for venue names and cities"""
+    serializer = VenueAutocompleteSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    if data.get('min_capacity'):
-        queryset = queryset.filter(spaces__capacity__gte=data['min_capacity']).distinct()
+    data = serializer.validated_data
+    point = None
+    if data.get('latitude') is not None and data.get('longitude') is not None:
+        point = Point(data['longitude'], data['latitude'], srid=4326)
     
-    if data.get('amenities'):
-        for amenity in data['amenities']:
-            queryset = queryset.filter(amenities_json__contains={amenity: True})
+    results = autocomplete_venues(data['q'], limit=data['limit'], point=point)
+    return Response({'results': results})
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@parser_classes([MultiPartParser])
+def venue_import(request):
+    """Bulk import venues and spaces from an uploaded partner file"""
+    serializer = VenueImportRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    # Add search point to request for distance calculation
-    request.search_point = search_point
+    data = serializer.validated_data
+    try:
+        report = import_venues(
+            data['file'],
+            data['format'],
+            owner=request.user,
+            chunk_size=data['chunk_size'],
+            dry_run=data['dry_run'],
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = VenueSerializer(queryset[:20], many=True, context={'request': request})
-    return Response(serializer.data)
+    return Response(report)
 
 class SpaceListCreateView(generics.ListCreateAPIView):
     """Space management within venues"""
@@ -82,7 +208,7 @@ class SpaceListCreateView(generics.ListCreateAPIView):
         venue = Venue.objects.get(venue_id=venue_id)
         serializer.save(venue=venue)
 
-class SpaceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SpaceDetailView(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     """Individual space operations"""
     serializer_class = SpaceSerializer
     lookup_field = 'space_id'
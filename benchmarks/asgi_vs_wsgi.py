@@ -0,0 +1,204 @@
+"""Compare sync gunicorn workers with async uvicorn workers on the hot read endpoints
+
+Starts each server against the configured database, holds open a number of
+slow clients (connections that trickle their request headers, as mobile
+clients do), and drives concurrent fast clients at one endpoint. Reports
+throughput and latency percentiles per server as JSON.
+    
+    python -m benchmarks.asgi_vs_wsgi --endpoint health --concurrency 200 --slow-clients 500
+    python -m benchmarks.asgi_vs_wsgi --endpoint occupancy --space-id <uuid> --token <oauth token>
+
+Only the standard library is used on the client side so the numbers are not
+skewed by a client-side HTTP stack.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    'gunicorn': [
+        'gunicorn', 'config.wsgi:application', '-c', 'config/gunicorn.py',
+        '--bind', '127.0.0.1:{port}', '--workers', '{workers}',
+    ],
+    'uvicorn': [
+        'uvicorn', 'config.asgi:application',
+        '--host', '127.0.0.1', '--port', '{port}', '--workers', '{workers}', '--no-access-log',
+    ],
+}
+
+def build_request(args, host):
+    if args.endpoint == 'health':
+        method, path, body = 'GET', '/health/', b''
+    elif args.endpoint == 'occupancy':
+        method, path, body = 'GET', f'/api/v1/iot/spaces/{args.space_id}/occupancy/', b''
+    elif args.endpoint == 'search':
+        method, path = 'POST', '/api/v1/venues/search/'
+        body = json.dumps({'latitude': args.latitude, 'longitude': args.longitude, 'radius_km': 10}).encode()
+    else:
+        method, path = 'POST', '/api/v1/bookings/availability/'
+        body = json.dumps({
+            'venue_id': args.venue_id,
+            'start_time': '2030-01-07T10:00:00Z',
+            'end_time': '2030-01-07T12:00:00Z',
+        }).encode()
+    
+    # As nginx forwards it; plain http would only measure SECURE_SSL_REDIRECT's 301
+    headers = [f'{method} {path} HTTP/1.1', f'Host: {host}', 'Connection: keep-alive', 'X-Forwarded-Proto: https']
+    if args.token:
+        headers.append(f'Authorization: Bearer {args.token}')
+    if body:
+        headers.append('Content-Type: application/json')
+    headers.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    version, status = status_line.split()[:2]
+    keep_alive = version == b'HTTP/1.1'
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            keep_alive = value == 'keep-alive'
+    await reader.readexactly(length)
+    return int(status), keep_alive
+
+async def fast_client(host, port, request, deadline, latencies, errors):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 300:
+                errors[status] = errors.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            writer = None
+    if writer is not None:
+        writer.close()
+
+async def slow_client(host, port, request, deadline, interval):
+    """Trickle one request byte at a time, holding a server connection"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        for byte in request:
+            if time.monotonic() >= deadline:
+                break
+            writer.write(bytes([byte]))
+            await writer.drain()
+            await asyncio.sleep(interval)
+        writer.close()
+    except OSError:
+        pass
+
+async def run_load(args):
+    host, port = '127.0.0.1', args.port
+    request = build_request(args, f'{host}:{port}')
+    deadline = time.monotonic() + args.duration
+    latencies, errors = [], {}
+    
+    slow = [
+        asyncio.create_task(slow_client(host, port, request, deadline, args.slow_interval))
+        for _ in range(args.slow_clients)
+    ]
+    started = time.monotonic()
+    await asyncio.gather(*(
+        fast_client(host, port, request, deadline, latencies, errors)
+        for _ in range(args.concurrency)
+    ))
+    elapsed = time.monotonic() - started
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+    
+    latencies.sort()
+    def percentile(value):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000, 2)
+    
+    return {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'errors': errors,
+    }
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'Server did not start listening on port {port}')
+
+def benchmark_server(name, args):
+    command = [part.format(port=args.port, workers=args.workers) for part in SERVERS[name]]
+    process = subprocess.Popen(command, env=dict(os.environ), start_new_session=True)
+    try:
+        wait_for_port(args.port)
+        asyncio.run(run_load(argparse.Namespace(**{**vars(args), 'duration': args.warmup, 'slow_clients': 0})))
+        return asyncio.run(run_load(args))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=['gunicorn', 'uvicorn', 'both'], default='both')
+    parser.add_argument('--endpoint', choices=['health', 'occupancy', 'search', 'availability'], default='health')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--slow-interval', type=float, default=1.0, help='Seconds between slow-client bytes')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--token', default=os.getenv('BENCHMARK_TOKEN'))
+    parser.add_argument('--space-id')
+    parser.add_argument('--venue-id')
+    parser.add_argument('--latitude', type=float, default=40.7128)
+    parser.add_argument('--longitude', type=float, default=-74.0060)
+    args = parser.parse_args()
+    
+    if args.endpoint == 'occupancy' and not args.space_id:
+        parser.error('--space-id is required for the occupancy endpoint')
+    if args.endpoint == 'availability' and not args.venue_id:
+        parser.error('--venue-id is required for the availability endpoint')
+    
+    servers = ['gunicorn', 'uvicorn'] if args.server == 'both' else [args.server]
+    results = {name: benchmark_server(name, args) for name in servers}
+    json.dump({'endpoint': args.endpoint, 'workers': args.workers, 'results': results}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Synthetic dataset generator for the benchmark suite
+
+    python -m benchmarks.datagen --scale large
+    python -m benchmarks.datagen --venues 2000 --bookings 200000 --readings 5000000
+
+Loads users, companies, venues, spaces, sensors, bookings and sensor readings
+into the configured database with COPY. Catalogue rows come from the
+factory-boy/Faker factories in benchmarks.factories; bookings and readings
+are drawn with the seeded `random` module instead, because Faker costs tens
+of microseconds per row and the large scale has 50M readings. Rows are only
+ever added, so point DB_NAME at a disposable database.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+SCALES = {
+    'small': {'users': 2000, 'companies': 50, 'venues': 1000, 'bookings': 100_000, 'readings': 1_000_000},
+    'medium': {'users': 10_000, 'companies': 200, 'venues': 5000, 'bookings': 500_000, 'readings': 10_000_000},
+    'large': {'users': 50_000, 'companies': 1000, 'venues': 10_000, 'bookings': 1_000_000, 'readings': 50_000_000},
+}
+
+SENSOR_UNITS = {
+    'occupancy': ('people', 0, 20),
+    'temperature': ('celsius', 18, 27),
+    'humidity': ('percent', 30, 65),
+    'air_quality': ('aqi', 10, 120),
+    'noise_level': ('db', 30, 75),
+}
+
+NULL = '\\N'
+
+def setup_django():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+def copy_text(field, value):
+    """Render one value for COPY ... (FORMAT csv, NULL '\\N')"""
+    from django.contrib.gis.db.models import PointField
+    from django.contrib.postgres.fields import ArrayField
+    from django.db.models import JSONField
+    
+    if value is None:
+        return NULL
+    if isinstance(field, JSONField):
+        return json.dumps(value)
+    if isinstance(field, ArrayField):
+        return '{' + ','.join(f'"{item}"' for item in value) + '}'
+    if isinstance(field, PointField):
+        return f'SRID=4326;POINT({value[0]} {value[1]})'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value)
+
+class CopyLoader:
+    """Stream rows into one model's table with COPY, in chunks
+    
+    `add` takes a dict keyed by field name or attname; missing fields fall
+    back to the model default, auto_now timestamps, NULL or (for blank text
+    fields) '', and a NOT NULL field with none of those is an error.
+    `add_values` is the hot path for rows already rendered in `columns` order.
+    """
+    
+    def __init__(self, model, chunk_size=100_000):
+        from django.db import connection
+        from django.utils import timezone
+        self.connection = connection
+        self.table = model._meta.db_table
+        self.fields = model._meta.concrete_fields
+        self.columns = [field.column for field in self.fields]
+        self.chunk_size = chunk_size
+        self.now = timezone.now()
+        self.loaded = 0
+        self._reset()
+    
+    def _reset(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = 0
+    
+    def _value(self, field, row):
+        if field.name in row:
+            return row[field.name]
+        if field.attname in row:
+            return row[field.attname]
+        if field.has_default():
+            return field.get_default()
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            return self.now
+        if field.null:
+            return None
+        if field.blank and field.empty_strings_allowed:
+            return ''
+        raise ValueError(f'{self.table}.{field.column} is NOT NULL and has no value or default')
+    
+    def add(self, row):
+        self.add_values([copy_text(field, self._value(field, row)) for field in self.fields])
+    
+    def add_values(self, values):
+        self.writer.writerow(values)
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+    
+    def flush(self):
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        sql = f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')"
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(sql, self.buffer)
+        self.loaded += self.pending
+        self._reset()
+
+def generate_people(counts):
+    from apps.authentication.models import Company, User, UserProfile
+    from .factories import CompanyRow, UserProfileRow, UserRow
+    
+    users, profiles, companies = CopyLoader(User), CopyLoader(UserProfile), CopyLoader(Company)
+    user_ids = []
+    for _ in range(counts['users']):
+        user = UserRow()
+        users.add(user)
+        profiles.add(UserProfileRow(user_id=user['id']))
+        user_ids.append(user['id'])
+    
+    company_ids = []
+    for _ in range(counts['companies']):
+        company = CompanyRow(created_by_user_id=random.choice(user_ids))
+        companies.add(company)
+        company_ids.append(company['company_id'])
+    
+    for loader in (users, profiles, companies):
+        loader.flush()
+    return user_ids, company_ids
+
+def generate_venues(counts, user_ids):
+    """Venues with their spaces and sensors; returns [(space_id, venue_id, hourly_rate)] and sensors"""
+    from apps.iot.models import IoTSensor
+    from apps.venues.models import Space, Venue
+    from .factories import SpaceRow, VenueRow
+    
+    venues, spaces, sensors = CopyLoader(Venue), CopyLoader(Space), CopyLoader(IoTSensor)
+    space_rows, sensor_rows = [], []
+    for index in range(counts['venues']):
+        venue = VenueRow(owner_user_id=random.choice(user_ids))
+        venue_spaces = [
+            SpaceRow(venue_id=venue['venue_id'])
+            for _ in range(random.randint(1, counts['spaces_per_venue'] * 2 - 1))
+        ]
+        # Denormalized summary normally maintained by apps.venues.signals
+        venue.update(
+            max_space_capacity=max(space['capacity'] for space in venue_spaces),
+            min_hourly_rate=min(space['hourly_rate'] for space in venue_spaces),
+            space_count=len(venue_spaces),
+            space_types=sorted({space['space_type_code'] for space in venue_spaces}),
+        )
+        venues.add(venue)
+        for space in venue_spaces:
+            spaces.add(space)
+            space_rows.append((space['space_id'], venue['venue_id'], space['hourly_rate']))
+        
+        for sensor_index in range(counts['sensors_per_venue']):
+            sensor_type = 'occupancy' if sensor_index == 0 else random.choice(list(SENSOR_UNITS))
+            sensor = {
+                'sensor_id': uuid.uuid4(),
+                'sensor_external_id': f'bench-{index}-{sensor_index}-{uuid.uuid4().hex[:8]}',
+                'venue_id': venue['venue_id'],
+                'space_id': random.choice(venue_spaces)['space_id'],
+                'sensor_type': sensor_type,
+                'location_description': 'Generated',
+                'last_heartbeat': venues.now,
+            }
+            sensors.add(sensor)
+            sensor_rows.append((sensor['sensor_id'], sensor_type))
+    
+    for loader in (venues, spaces, sensors):
+        loader.flush()
+    return space_rows, sensor_rows
+
+def generate_bookings(counts, user_ids, company_ids, space_rows):
+    from apps.bookings.models import Booking
+    
+    loader = CopyLoader(Booking)
+    now = loader.now.replace(minute=0, second=0, microsecond=0)
+    stamp = str(loader.now)
+    
+    for _ in range(counts['bookings']):
+        space_id, venue_id, rate = random.choice(space_rows)
+        start = now + timedelta(days=random.randint(-180, 60), hours=random.randint(-12, 12))
+        hours = random.choice([1, 1, 2, 2, 3, 4, 8])
+        if start < now:
+            booking_status, payment_status = random.choice([('Completed', 'Paid')] * 8 + [('Cancelled', 'Refunded')])
+        else:
+            booking_status, payment_status = random.choice([('Confirmed', 'Paid')] * 3 + [('Pending', 'Pending')])
+        company_id = random.choice(company_ids) if company_ids and random.random() < 0.3 else None
+        
+        row = {
+            'booking_id': uuid.uuid4(),
+            'user': random.choice(user_ids),
+            'venue': venue_id,
+            'space': space_id,
+            'booking_start_time': start,
+            'booking_end_time': start + timedelta(hours=hours),
+            'booking_status_code': booking_status,
+            'payment_status_code': payment_status,
+            'total_price': rate * hours,
+            'company': company_id,
+            'created_at': stamp,
+            'updated_at': stamp,
+        }
+        loader.add(row)
+    loader.flush()
+    return loader.loaded
+
+def generate_readings(counts, sensor_rows):
+    """Sensor readings on the hot path: rows rendered straight to COPY text"""
+    from apps.iot.models import SensorData
+    
+    loader = CopyLoader(SensorData, chunk_size=200_000)
+    expected = {'data_id', 'sensor_id', 'timestamp', 'value', 'unit', 'metadata', 'created_at'}
+    if set(loader.columns) != expected:
+        raise ValueError(f'SensorData columns changed ({loader.columns}); update generate_readings')
+    
+    per_sensor = -(-counts['readings'] // max(1, len(sensor_rows)))
+    now = loader.now
+    stamp = str(now)
+    remaining = counts['readings']
+    for sensor_id, sensor_type in sensor_rows:
+        unit, low, high = SENSOR_UNITS[sensor_type]
+        sensor_id = str(sensor_id)
+        for step in range(min(per_sensor, remaining)):
+            row = {
+                'data_id': str(uuid.uuid4()),
+                'sensor_id': sensor_id,
+                'timestamp': str(now - timedelta(minutes=5 * step)),
+                'value': f'{random.uniform(low, high):.2f}',
+                'unit': unit,
+                'metadata': '{}',
+                'created_at': stamp,
+            }
+            loader.add_values([row[column] for column in loader.columns])
+        remaining -= min(per_sensor, remaining)
+        if remaining <= 0:
+            break
+    loader.flush()
+    return loader.loaded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name}', type=int, help=f'Override the {name} count of --scale')
+    parser.add_argument('--spaces-per-venue', type=int, default=5, help='Average spaces per venue')
+    parser.add_argument('--sensors-per-venue', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-derived', action='store_true',
+                        help='Skip opening intervals, popularity scores and ANALYZE')
+    args = parser.parse_args()
+    
+    counts = dict(SCALES[args.scale])
+    counts.update({name: getattr(args, name) for name in SCALES['small'] if getattr(args, name) is not None})
+    counts.update(spaces_per_venue=args.spaces_per_venue, sensors_per_venue=args.sensors_per_venue)
+    
+    setup_django()
+    import factory.random
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    random.seed(args.seed)
+    factory.random.reseed_random(args.seed)
+    
+    timings = {}
+    def timed(name, func, *func_args):
+        started = time.perf_counter()
+        result = func(*func_args)
+        timings[name] = round(time.perf_counter() - started, 1)
+        print(f'{name}: {timings[name]}s', file=sys.stderr)
+        return result
+    
+    # Chunks of child rows can be copied before their parents; Django's
+    # foreign keys are deferred, so they are checked at commit
+    with transaction.atomic():
+        user_ids, company_ids = timed('people', generate_people, counts)
+        space_rows, sensor_rows = timed('venues', generate_venues, counts, user_ids)
+    bookings = timed('bookings', generate_bookings, counts, user_ids, company_ids, space_rows)
+    readings = timed('readings', generate_readings, counts, sensor_rows)
+    
+    if not args.skip_derived:
+        timed('opening_hours', call_command, 'sync_opening_hours')
+        timed('popularity', call_command, 'refresh_venue_popularity')
+        with connection.cursor() as cursor:
+            timed('analyze', cursor.execute, 'ANALYZE')
+    
+    json.dump({
+        'seed': args.seed,
+        'counts': {
+            'users': len(user_ids),
+            'companies': len(company_ids),
+            'venues': counts['venues'],
+            'spaces': len(space_rows),
+            'sensors': len(sensor_rows),
+            'bookings': bookings,
+            'readings': readings,
+        },
+        'seconds': timings,
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""factory-boy row factories for the benchmark data generator
+
+Factories build plain dicts keyed by model field name, ready for
+datagen.CopyLoader; nothing here touches the database. Import only after
+django.setup().
+"""
+
+import random
+import uuid
+import factory
+from django.utils import timezone
+from apps.authentication.models import Company, UserProfile
+from apps.venues.models import Space, Venue
+
+NOW = timezone.now()
+
+# (city, country, longitude, latitude); venues are scattered around these
+CITY_CENTRES = [
+    ('New York', 'US', -74.0060, 40.7128),
+    ('London', 'GB', -0.1276, 51.5072),
+    ('Berlin', 'DE', 13.4050, 52.5200),
+    ('Nairobi', 'KE', 36.8219, -1.2921),
+    ('Singapore', 'SG', 103.8198, 1.3521),
+    ('Sao Paulo', 'BR', -46.6333, -23.5505),
+    ('Sydney', 'AU', 151.2093, -33.8688),
+    ('Toronto', 'CA', -79.3832, 43.6532),
+]
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+AMENITIES = ['wifi', 'coffee', 'printer', 'parking', 'lockers', 'phone_booth', 'kitchen', 'showers']
+
+def choices(options):
+    return [code for code, _ in options]
+
+def operating_hours():
+    opens, closes = random.choice([(7, 19), (8, 18), (9, 17), (6, 22)])
+    days = WEEKDAYS[:5] if random.random() < 0.3 else WEEKDAYS
+    return {day: f'{opens}:00-{closes}:00' for day in days}
+
+class UserRow(factory.DictFactory):
+    id = factory.LazyFunction(uuid.uuid4)
+    username = factory.Sequence(lambda n: f'bench-user-{n}@example.com')
+    email = factory.SelfAttribute('username')
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    password = '!'  # unusable
+    date_joined = NOW
+
+class UserProfileRow(factory.DictFactory):
+    id = factory.LazyFunction(uuid.uuid4)
+    full_name = factory.Faker('name')
+    user_type_code = factory.LazyFunction(lambda: random.choice(choices(UserProfile.USER_TYPE_CHOICES)))
+
+class CompanyRow(factory.DictFactory):
+    company_id = factory.LazyFunction(uuid.uuid4)
+    company_name = factory.Faker('company')
+    subscription_plan_code = factory.LazyFunction(lambda: random.choice(choices(Company.SUBSCRIPTION_PLANS)))
+    billing_cycle_code = 'Monthly'
+
+class VenueRow(factory.DictFactory):
+    class Params:
+        centre = factory.LazyFunction(lambda: random.choice(CITY_CENTRES))
+    
+    venue_id = factory.LazyFunction(uuid.uuid4)
+    venue_name = factory.Faker('company')
+    venue_type_code = factory.LazyFunction(lambda: random.choice(choices(Venue.VENUE_TYPES)))
+    address = factory.Faker('street_address')
+    city = factory.LazyAttribute(lambda o: o.centre[0])
+    country_code = factory.LazyAttribute(lambda o: o.centre[1])
+    # (longitude, latitude) within roughly 20 km of the centre
+    location = factory.LazyAttribute(
+        lambda o: (o.centre[2] + random.uniform(-0.2, 0.2), o.centre[3] + random.uniform(-0.2, 0.2))
+    )
+    wifi_speed_mbps = factory.LazyFunction(lambda: random.choice([None, 50, 100, 300, 1000]))
+    amenities_json = factory.LazyFunction(
+        lambda: {name: True for name in random.sample(AMENITIES, random.randint(1, 5))}
+    )
+    operating_hours_json = factory.LazyFunction(operating_hours)
+    pricing_model = 'hourly'
+
+class SpaceRow(factory.DictFactory):
+    space_id = factory.LazyFunction(uuid.uuid4)
+    space_name = factory.Sequence(lambda n: f'Space {n}')
+    space_type_code = factory.LazyFunction(lambda: random.choice(choices(Space.SPACE_TYPES)))
+    capacity = factory.LazyFunction(lambda: random.choice([1, 2, 4, 6, 8, 12, 20]))
+    hourly_rate = factory.LazyFunction(lambda: random.randrange(5, 80))
+    daily_rate = factory.LazyAttribute(lambda o: o.hourly_rate * 6)
+    space_amenities_json = factory.LazyFunction(dict)
@@ -0,0 +1,262 @@
+"""Stand-in for the Java Spring payment gateway with configurable latency and faults
+
+    python -m benchmarks.gateway_standin --port 8081 --delay 0.3 --jitter 0.1
+    python -m benchmarks.gateway_standin --error-rate 0.02 --timeout-rate 0.01 \\
+        --webhook-url http://127.0.0.1:8000/api/v1/payments/webhook/
+
+Serves the endpoints JavaSpringPaymentGateway calls, on one asyncio loop:
+    
+    POST /api/payments/process            capture; issues a transaction id
+    POST /api/payments/<transaction>/refund
+    GET  /api/payments/<transaction>/status
+    GET  /__stats                         request counts, outcomes and time
+
+Every gateway call waits a normally distributed delay, then fails with a 503
+(`--error-rate`), hangs past the client's timeout (`--timeout-rate`) or, for
+captures, is declined (`--decline-rate`). With `--webhook-url`, successful
+captures and refunds are followed by a status callback, as the real service
+does.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import time
+import uuid
+from urllib.parse import urlsplit
+
+ROUTES = [
+    ('POST', re.compile(r'^/api/payments/process$'), 'process'),
+    ('POST', re.compile(r'^/api/payments/(?P<transaction_id>[^/]+)/refund$'), 'refund'),
+    ('GET', re.compile(r'^/api/payments/(?P<transaction_id>[^/]+)/status$'), 'status'),
+    ('GET', re.compile(r'^/__stats$'), 'stats'),
+]
+
+REASONS = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+class GatewayStandin:
+    """In-memory gateway state and fault injection"""
+    
+    def __init__(self, delay=0.0, jitter=0.0, error_rate=0.0, decline_rate=0.0, timeout_rate=0.0,
+                 hang=35.0, webhook_url=None, webhook_delay=0.5, seed=None):
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.decline_rate = decline_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.webhook_url = webhook_url
+        self.webhook_delay = webhook_delay
+        self.rng = random.Random(seed)
+        self.transactions = {}
+        self.stats = {'endpoints': {}, 'webhooks': {}}
+        self._callbacks = set()
+    
+    def outcome(self, name):
+        draw = self.rng.random()
+        if draw < self.timeout_rate:
+            return 'timeout'
+        draw -= self.timeout_rate
+        if draw < self.error_rate:
+            return 'error'
+        draw -= self.error_rate
+        if name == 'process' and draw < self.decline_rate:
+            return 'declined'
+        return 'ok'
+    
+    def latency(self):
+        if not self.jitter:
+            return self.delay
+        return max(0.0, self.rng.gauss(self.delay, self.jitter))
+    
+    async def dispatch(self, method, path, body):
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(path)
+            if match and method == route_method:
+                break
+        else:
+            return 404, {'success': False, 'error': 'Not found'}
+        if name == 'stats':
+            return 200, self.stats
+        
+        endpoint = self.stats['endpoints'].setdefault(name, {'requests': 0, 'seconds': 0.0, 'outcomes': {}})
+        outcome = self.outcome(name)
+        endpoint['requests'] += 1
+        endpoint['outcomes'][outcome] = endpoint['outcomes'].get(outcome, 0) + 1
+        started = time.perf_counter()
+        try:
+            if outcome == 'timeout':
+                await asyncio.sleep(self.hang)
+                return 504, {'success': False, 'error': 'Gateway timeout'}
+            await asyncio.sleep(self.latency())
+            if outcome == 'error':
+                return 503, {'success': False, 'error': 'Injected gateway error'}
+            payload = json.loads(body or b'{}')
+            return getattr(self, name)(payload, declined=outcome == 'declined', **match.groupdict())
+        finally:
+            endpoint['seconds'] += time.perf_counter() - started
+    
+    def process(self, payload, declined=False):
+        if declined:
+            return 200, {'success': False, 'status': 'Failed', 'error': 'Card declined'}
+        transaction_id = f'txn_{uuid.uuid4().hex[:16]}'
+        self.transactions[transaction_id] = {'status': 'Paid', 'amount': payload.get('amount')}
+        self.notify(transaction_id, 'Paid')
+        return 200, {
+            'success': True,
+            'transaction_id': transaction_id,
+            'status': 'Paid',
+            'message': 'Payment successful',
+            'amount': payload.get('amount'),
+        }
+    
+    def refund(self, payload, transaction_id, declined=False):
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return 404, {'success': False, 'error': 'Unknown transaction'}
+        transaction['status'] = 'Refunded'
+        self.notify(transaction_id, 'Refunded')
+        return 200, {
+            'success': True,
+            'refund_id': f'rfd_{uuid.uuid4().hex[:16]}',
+            'status': 'Refunded',
+            'amount': payload.get('amount', transaction['amount']),
+        }
+    
+    def status(self, payload, transaction_id, declined=False):
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return 404, {'success': False, 'error': 'Unknown transaction'}
+        return 200, {'success': True, 'transaction_id': transaction_id, **transaction}
+    
+    def notify(self, transaction_id, status):
+        if not self.webhook_url:
+            return
+        # Held so pending callbacks are not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(self.send_webhook(transaction_id, status))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+    
+    async def send_webhook(self, transaction_id, status):
+        await asyncio.sleep(self.webhook_delay)
+        url = urlsplit(self.webhook_url)
+        body = json.dumps({'transaction_id': transaction_id, 'status': status}).encode()
+        request = (
+            f'POST {url.path or "/"} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+        ).encode() + body
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(url.hostname, url.port or 80), 10)
+            writer.write(request)
+            await writer.drain()
+            result = (await asyncio.wait_for(reader.readline(), 30)).split()[1].decode()
+            writer.close()
+        except (OSError, asyncio.TimeoutError, IndexError) as e:
+            result = type(e).__name__
+        self.stats['webhooks'][result] = self.stats['webhooks'].get(result, 0) + 1
+    
+    async def handle(self, reader, writer):
+        """One client connection; HTTP/1.1 keep-alive, no pipelining"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length') or 0))
+                
+                status, payload = await self.dispatch(method, urlsplit(target).path.rstrip('/'), body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                response = json.dumps(payload).encode()
+                writer.write((
+                    f'HTTP/1.1 {status} {REASONS.get(status, "Error")}\r\n'
+                    f'Content-Type: application/json\r\nContent-Length: {len(response)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+                ).encode() + response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            # Cancelled at shutdown with the connection idle
+            pass
+        finally:
+            writer.close()
+
+class StandinServer:
+    """Runs a GatewayStandin on its own event loop; serve_forever blocks until shutdown"""
+    
+    def __init__(self, gateway, host, port):
+        self.gateway = gateway
+        # Bound up front so callers can connect as soon as this returns
+        self.socket = socket.create_server((host, port), backlog=1024)
+        self.loop = asyncio.new_event_loop()
+    
+    def serve_forever(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self.gateway.handle, sock=self.socket))
+        try:
+            self.loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+    
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+    
+    def server_close(self):
+        self.socket.close()
+
+def make_server(port, delay, host='127.0.0.1', **options):
+    return StandinServer(GatewayStandin(delay=delay, **options), host, port)
+
+def main():
+    parser = argparse.ArgumentParser(description='Payment gateway stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--delay', type=float, default=0.0, help='Mean seconds before each gateway response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Standard deviation of the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with a 503')
+    parser.add_argument('--decline-rate', type=float, default=0.0, help='Fraction of captures declined')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of calls that hang')
+    parser.add_argument('--hang', type=float, default=35.0,
+                        help='Seconds a hanging call waits (the gateway client gives up after 30)')
+    parser.add_argument('--webhook-url', help='Status callback target, e.g. .../api/v1/payments/webhook/')
+    parser.add_argument('--webhook-delay', type=float, default=0.5)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    
+    server = make_server(
+        args.port, args.delay, args.host,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        decline_rate=args.decline_rate,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        webhook_url=args.webhook_url,
+        webhook_delay=args.webhook_delay,
+        seed=args.seed,
+    )
+    print(f'Gateway stand-in on http://{args.host}:{args.port} (delay {args.delay}s)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Payment throughput of sync vs gevent gunicorn workers against a slow gateway
+    
+    python -m benchmarks.gevent_payments --gateway-delay 2 --requests 400 --concurrency 100
+
+Creates a benchmark user, venue and one pending booking per request in the
+configured database (use a disposable one), points the active java_spring
+gateway config at a local stand-in that sleeps `--gateway-delay` seconds,
+then posts payments through /api/v1/payments/process/ under each worker
+class. With sync workers throughput is capped near workers / delay; gevent
+workers keep accepting requests while payments wait on the gateway.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+from .asgi_vs_wsgi import read_response, wait_for_port
+from .datagen import setup_django
+from .gateway_standin import make_server
+
+def create_payer(email):
+    """A user with a profile and a fresh OAuth2 access token"""
+    from django.utils import timezone
+    from oauth2_provider.models import AccessToken, Application
+    from apps.authentication.models import User, UserProfile
+    
+    user, created = User.objects.get_or_create(email=email, defaults={'username': email})
+    if created:
+        UserProfile.objects.create(user=user, full_name='Benchmark User', user_type_code='Individual')
+    application, _ = Application.objects.get_or_create(
+        name='benchmarks',
+        defaults={
+            'client_type': Application.CLIENT_CONFIDENTIAL,
+            'authorization_grant_type': Application.GRANT_CLIENT_CREDENTIALS,
+        },
+    )
+    token = AccessToken.objects.create(
+        user=user,
+        application=application,
+        token=uuid.uuid4().hex,
+        expires=timezone.now() + timedelta(hours=2),
+        scope='read write',
+    )
+    return user, token.token
+
+def create_space(capacity):
+    from django.contrib.gis.geos import Point
+    from apps.venues.models import Space, Venue
+    
+    venue = Venue.objects.create(
+        venue_name='Benchmark Venue',
+        venue_type_code='CoworkingHub',
+        address='1 Bench St',
+        city='Benchville',
+        country_code='US',
+        location=Point(-74.0060, 40.7128),
+        operating_hours_json={'daily': '24h'},
+        pricing_model='hourly',
+    )
+    return Space.objects.create(venue=venue, space_name='Bench Desk', capacity=capacity, hourly_rate=10)
+
+def use_gateway(gateway_url):
+    """Make a gateway at `gateway_url` the active java_spring config"""
+    from apps.payments.models import PaymentGatewayConfig
+    
+    PaymentGatewayConfig.objects.filter(gateway_type='java_spring').update(is_active=False)
+    config = PaymentGatewayConfig(
+        gateway_type='java_spring',
+        gateway_name='Benchmark stand-in',
+        endpoint_url=gateway_url,
+        is_active=True,
+    )
+    config.api_key = 'benchmark'
+    config.save()
+
+def setup_fixtures(count, gateway_url):
+    """Pending bookings for a benchmark user and an OAuth token to pay them"""
+    setup_django()
+    from django.utils import timezone
+    from apps.bookings.models import Booking
+    
+    user, token = create_payer('bench-payments@example.com')
+    space = create_space(count)
+    use_gateway(gateway_url)
+    
+    start = timezone.now() + timedelta(days=30)
+    # bulk_create skips Booking.full_clean, so overlapping slots are fine here
+    bookings = Booking.objects.bulk_create([
+        Booking(
+            user=user,
+            venue=space.venue,
+            space=space,
+            booking_start_time=start,
+            booking_end_time=start + timedelta(hours=1),
+            booking_status_code='Pending',
+            payment_status_code='Pending',
+            total_price=10,
+        )
+        for _ in range(count)
+    ])
+    return token, [str(booking.booking_id) for booking in bookings]
+
+def payment_request(host, token, booking_id):
+    body = json.dumps({'booking_id': booking_id, 'payment_method': 'Card'}).encode()
+    headers = [
+        'POST /api/v1/payments/process/ HTTP/1.1',
+        f'Host: {host}',
+        'Connection: keep-alive',
+        'X-Forwarded-Proto: https',
+        f'Authorization: Bearer {token}',
+        f'Idempotency-Key: {uuid.uuid4()}',
+        'Content-Type: application/json',
+        f'Content-Length: {len(body)}',
+    ]
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+async def drive_payments(port, token, booking_ids, concurrency):
+    host = f'127.0.0.1:{port}'
+    pending = iter(booking_ids)
+    latencies, statuses = [], {}
+    
+    async def client():
+        reader = writer = None
+        for booking_id in pending:
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                started = time.perf_counter()
+                writer.write(payment_request(host, token, booking_id))
+                await writer.drain()
+                status, keep_alive = await read_response(reader)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+            except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                writer = None
+        if writer is not None:
+            writer.close()
+    
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    
+    latencies.sort()
+    def percentile(value):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000, 1)
+    
+    return {
+        'payments': len(latencies),
+        'elapsed_seconds': round(elapsed, 2),
+        'payments_per_second': round(len(latencies) / elapsed, 2),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'statuses': statuses,
+    }
+
+def run_worker_class(worker_class, args, token, booking_ids):
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class)
+    command = [
+        'gunicorn', 'config.wsgi:application', '-c', 'config/gunicorn.py',
+        '--bind', f'127.0.0.1:{args.port}', '--workers', str(args.workers),
+    ]
+    process = subprocess.Popen(command, env=env, start_new_session=True)
+    try:
+        wait_for_port(args.port)
+        return asyncio.run(drive_payments(args.port, token, booking_ids, args.concurrency))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--worker-class', choices=['sync', 'gevent', 'both'], default='both')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--gateway-port', type=int, default=8081)
+    parser.add_argument('--gateway-delay', type=float, default=2.0)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+    
+    gateway = make_server(args.gateway_port, args.gateway_delay)
+    threading.Thread(target=gateway.serve_forever, daemon=True).start()
+    gateway_url = f'http://127.0.0.1:{args.gateway_port}'
+    
+    worker_classes = ['sync', 'gevent'] if args.worker_class == 'both' else [args.worker_class]
+    results = {}
+    try:
+        for worker_class in worker_classes:
+            token, booking_ids = setup_fixtures(args.requests, gateway_url)
+            results[worker_class] = run_worker_class(worker_class, args, token, booking_ids)
+    finally:
+        gateway.shutdown()
+    
+    json.dump({
+        'gateway_delay_seconds': args.gateway_delay,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'results': results,
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
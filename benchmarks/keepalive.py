@@ -0,0 +1,116 @@
+"""Per-call latency of fresh vs pooled keep-alive connections to the payment gateway
+
+    python -m benchmarks.keepalive --calls 2000 --concurrency 8
+    python -m benchmarks.keepalive --url https://payments.internal:8443 --calls 200
+
+Sends the same capture request through a new requests session per call (as
+a bare requests.post does: TCP, and TLS for https, set up every time) and
+through the pooled session from core.utils.http, and reports latency
+percentiles, connections opened and the mean latency saved per call. Without
+--url it starts the gateway stand-in in process with no injected delay, so
+the difference is connection setup alone; on loopback that excludes network
+round trips, so point --url at the real gateway to see the full saving.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .datagen import setup_django
+from .gateway_standin import make_server
+from .loadgen import percentiles
+
+PAYLOAD = {
+    'amount': 25.0,
+    'currency': 'USD',
+    'payment_method': 'Card',
+    'booking_id': 'keepalive-benchmark',
+    'customer_id': 'keepalive-benchmark',
+    'metadata': {},
+}
+
+def run(send, calls, concurrency):
+    """Latencies of `calls` sends spread over `concurrency` threads, and wall time"""
+    def timed(_):
+        started = time.perf_counter()
+        response = send()
+        response.raise_for_status()
+        return time.perf_counter() - started
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(timed, range(calls)))
+    return latencies, time.perf_counter() - started
+
+def connections_opened():
+    """The pooled session's own count, as exported on /metrics"""
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(
+        'outbound_http_connections_opened_total', {'upstream': 'keepalive_benchmark'}
+    ) or 0
+
+def report(latencies, elapsed, connections):
+    return {
+        'calls': len(latencies),
+        'connections_opened': int(connections),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        **percentiles(latencies),
+        'calls_per_second': round(len(latencies) / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Gateway base URL; defaults to a local stand-in')
+    parser.add_argument('--gateway-port', type=int, default=8083)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+    
+    setup_django()
+    import requests
+    from core.utils.http import get_session
+    
+    gateway = None
+    base_url = args.url
+    if base_url is None:
+        gateway = make_server(args.gateway_port, 0.0)
+        threading.Thread(target=gateway.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{args.gateway_port}'
+    endpoint = f'{base_url.rstrip("/")}/api/payments/process'
+    
+    def fresh():
+        with requests.Session() as session:
+            return session.post(endpoint, json=PAYLOAD, timeout=30)
+    
+    pooled_session = get_session('keepalive_benchmark')
+    
+    def pooled():
+        return pooled_session.post(endpoint, json=PAYLOAD)
+    
+    try:
+        run(fresh, args.warmup, args.concurrency)
+        fresh_latencies, fresh_elapsed = run(fresh, args.calls, args.concurrency)
+        run(pooled, args.warmup, args.concurrency)
+        opened_before = connections_opened()
+        pooled_latencies, pooled_elapsed = run(pooled, args.calls, args.concurrency)
+        opened = connections_opened() - opened_before
+    finally:
+        if gateway is not None:
+            gateway.shutdown()
+    
+    fresh_report = report(fresh_latencies, fresh_elapsed, args.calls)
+    pooled_report = report(pooled_latencies, pooled_elapsed, opened)
+    json.dump({
+        'endpoint': endpoint,
+        'concurrency': args.concurrency,
+        'fresh': fresh_report,
+        'pooled': pooled_report,
+        'saved_ms_per_call': round(fresh_report['mean_ms'] - pooled_report['mean_ms'], 3),
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""Drive the book -> pay -> confirm flow concurrently against a local server
+
+    python -m benchmarks.loadgen --flows 2000 --users 50 --gateway-delay 0.3
+    python -m benchmarks.loadgen --server gevent --gateway-error-rate 0.05 --gateway-webhooks
+    python -m benchmarks.loadgen --server none --port 8000   # a server that is already running
+
+Starts the payment gateway stand-in in process, points the active
+java_spring gateway config at it, starts the app server (unless --server
+none) with DB_SERVER_TIMING on, and runs one virtual user per benchmark
+account, each booking a fresh slot, paying for it and confirming it.
+Fixtures are written to the configured database, so use a disposable one.
+
+The report gives flow throughput, per-step latency percentiles, and splits
+each step's mean latency into database time and other app time (from the
+Server-Timing header), gateway time (measured by the stand-in, payment step
+only) and time spent queued for a worker or on the wire.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+from .asgi_vs_wsgi import SERVERS, wait_for_port
+from .datagen import setup_django
+from .gateway_standin import make_server
+from .gevent_payments import create_payer, create_space, use_gateway
+
+STEPS = ['book', 'pay', 'confirm']
+
+SERVER_TIMING = re.compile(r'(\w+);dur=([\d.]+)')
+
+def setup_fixtures(users, gateway_url):
+    """One account per virtual user, so per-user throttling does not cap the run"""
+    setup_django()
+    run_id = uuid.uuid4().hex[:8]
+    tokens = [create_payer(f'bench-loadgen-{run_id}-{index}@example.com')[1] for index in range(users)]
+    space = create_space(capacity=1)
+    use_gateway(gateway_url)
+    return tokens, space
+
+class Connection:
+    """One keep-alive HTTP/1.1 client connection"""
+    
+    def __init__(self, port, token, timeout):
+        self.port = port
+        self.host = f'127.0.0.1:{port}'
+        self.token = token
+        self.timeout = timeout
+        self.reader = self.writer = None
+    
+    async def request(self, method, path, payload=None, headers=()):
+        """Returns (status, headers, body); status is an exception name on failure"""
+        body = json.dumps(payload).encode() if payload is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}',
+            'Connection: keep-alive',
+            'X-Forwarded-Proto: https',
+            f'Authorization: Bearer {self.token}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            *headers,
+        ]
+        try:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+            self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+            await self.writer.drain()
+            status, response_headers, response_body = await asyncio.wait_for(self.read_response(), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, OSError) as e:
+            self.close()
+            return type(e).__name__, {}, b''
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, response_body
+    
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get('content-length') or 0))
+        return int(status_line.split()[1]), headers, body
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+class FlowStats:
+    def __init__(self):
+        self.steps = {step: {'latencies': [], 'statuses': {}, 'db': 0.0, 'app': 0.0, 'timed': 0} for step in STEPS}
+        self.flow_latencies = []
+        self.failed_at = {}
+    
+    def record(self, step, status, headers, latency):
+        stats = self.steps[step]
+        stats['latencies'].append(latency)
+        stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+        timings = dict(SERVER_TIMING.findall(headers.get('server-timing', '')))
+        if 'app' in timings:
+            stats['db'] += float(timings.get('db', 0)) / 1000
+            stats['app'] += float(timings['app']) / 1000
+            stats['timed'] += 1
+
+async def virtual_user(port, token, space, slots, start, stats, timeout):
+    connection = Connection(port, token, timeout)
+    
+    async def call(step, path, payload, expected, headers=()):
+        started = time.perf_counter()
+        status, response_headers, body = await connection.request('POST', path, payload, headers)
+        stats.record(step, status, response_headers, time.perf_counter() - started)
+        if status != expected:
+            stats.failed_at[step] = stats.failed_at.get(step, 0) + 1
+            return None
+        return json.loads(body)
+    
+    for slot in slots:
+        flow_started = time.perf_counter()
+        slot_start = start + timedelta(hours=slot)
+        booking = await call('book', '/api/v1/bookings/', {
+            'venue': str(space.venue_id),
+            'space': str(space.space_id),
+            'booking_start_time': slot_start.isoformat(),
+            'booking_end_time': (slot_start + timedelta(hours=1)).isoformat(),
+        }, 201)
+        if booking is None:
+            continue
+        payment = await call(
+            'pay', '/api/v1/payments/process/',
+            {'booking_id': booking['booking_id'], 'payment_method': 'Card'}, 200,
+            headers=(f'Idempotency-Key: {uuid.uuid4()}',),
+        )
+        if payment is None:
+            continue
+        if await call('confirm', f"/api/v1/bookings/{booking['booking_id']}/confirm/", {}, 200) is not None:
+            stats.flow_latencies.append(time.perf_counter() - flow_started)
+    connection.close()
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    def percentile(value):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000, 1)
+    return {'p50_ms': percentile(0.50), 'p95_ms': percentile(0.95), 'p99_ms': percentile(0.99)}
+
+def step_report(stats, gateway_stats):
+    """Latency percentiles and a breakdown of where the mean latency went"""
+    latencies = stats['latencies']
+    report = {'requests': len(latencies), 'statuses': stats['statuses'], **percentiles(latencies)}
+    if not latencies or not stats['timed']:
+        return report
+    
+    mean = sum(latencies) / len(latencies)
+    db = stats['db'] / stats['timed']
+    app = stats['app'] / stats['timed']
+    gateway = 0.0
+    if gateway_stats and gateway_stats['requests']:
+        gateway = gateway_stats['seconds'] / gateway_stats['requests']
+    report['mean_ms'] = {
+        'total': round(mean * 1000, 1),
+        'database': round(db * 1000, 1),
+        'gateway': round(gateway * 1000, 1),
+        'app_other': round(max(0.0, app - db - gateway) * 1000, 1),
+        'queue_and_network': round(max(0.0, mean - app) * 1000, 1),
+    }
+    return report
+
+async def drive(port, tokens, space, flows, timeout):
+    from django.utils import timezone
+    
+    stats = FlowStats()
+    slots = iter(range(flows))
+    # Past anything else on the fresh space, one hour per flow
+    start = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+    started = time.monotonic()
+    await asyncio.gather(*(
+        virtual_user(port, token, space, slots, start, stats, timeout) for token in tokens
+    ))
+    return stats, time.monotonic() - started
+
+def start_server(kind, port, workers):
+    server = 'uvicorn' if kind == 'uvicorn' else 'gunicorn'
+    command = [part.format(port=port, workers=workers) for part in SERVERS[server]]
+    env = dict(os.environ, DB_SERVER_TIMING='True', DB_INSTRUMENTATION_SAMPLE_RATE='1.0')
+    if kind == 'gevent':
+        env['GUNICORN_WORKER_CLASS'] = 'gevent'
+    if kind == 'uvicorn':
+        env['ASYNC_FAST_PATH'] = 'True'
+    return subprocess.Popen(command, env=env, start_new_session=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=['gunicorn', 'gevent', 'uvicorn', 'none'], default='gunicorn')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--flows', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=50, help='Concurrent virtual users')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Client timeout per request')
+    parser.add_argument('--gateway-port', type=int, default=8082)
+    parser.add_argument('--gateway-delay', type=float, default=0.3)
+    parser.add_argument('--gateway-jitter', type=float, default=0.1)
+    parser.add_argument('--gateway-error-rate', type=float, default=0.0)
+    parser.add_argument('--gateway-decline-rate', type=float, default=0.0)
+    parser.add_argument('--gateway-timeout-rate', type=float, default=0.0)
+    parser.add_argument('--gateway-webhooks', action='store_true',
+                        help='Have the stand-in call back /api/v1/payments/webhook/ after each capture')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    webhook_url = f'http://127.0.0.1:{args.port}/api/v1/payments/webhook/' if args.gateway_webhooks else None
+    gateway = make_server(
+        args.gateway_port, args.gateway_delay,
+        jitter=args.gateway_jitter,
+        error_rate=args.gateway_error_rate,
+        decline_rate=args.gateway_decline_rate,
+        timeout_rate=args.gateway_timeout_rate,
+        webhook_url=webhook_url,
+        seed=args.seed,
+    )
+    threading.Thread(target=gateway.serve_forever, daemon=True).start()
+    
+    tokens, space = setup_fixtures(args.users, f'http://127.0.0.1:{args.gateway_port}')
+    process = None
+    if args.server != 'none':
+        process = start_server(args.server, args.port, args.workers)
+    try:
+        wait_for_port(args.port)
+        stats, elapsed = asyncio.run(drive(args.port, tokens, space, args.flows, args.timeout))
+    finally:
+        if process is not None:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=30)
+        gateway.shutdown()
+    
+    gateway_stats = gateway.gateway.stats
+    steps = {
+        step: step_report(stats.steps[step], gateway_stats['endpoints'].get('process') if step == 'pay' else None)
+        for step in STEPS
+    }
+    completed = len(stats.flow_latencies)
+    json.dump({
+        'server': args.server,
+        'workers': args.workers,
+        'users': args.users,
+        'gateway': {
+            'delay_seconds': args.gateway_delay,
+            'error_rate': args.gateway_error_rate,
+            'decline_rate': args.gateway_decline_rate,
+            'timeout_rate': args.gateway_timeout_rate,
+            **gateway_stats,
+        },
+        'flows': {
+            'started': sum(steps['book']['statuses'].values()),
+            'completed': completed,
+            'failed_at': stats.failed_at,
+            'elapsed_seconds': round(elapsed, 2),
+            'flows_per_second': round(completed / elapsed, 2) if elapsed else None,
+            **percentiles(stats.flow_latencies),
+        },
+        'steps': steps,
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
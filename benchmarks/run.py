@@ -0,0 +1,171 @@
+"""Run the hot-path scenarios against a generated dataset and report JSON
+
+    python -m benchmarks.datagen --scale medium
+    python -m benchmarks.run --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --scenarios venue_search,check_availability --baseline results/main.json
+
+Each scenario runs in process, one request at a time, through the full
+middleware stack, so latencies exclude the network and the WSGI server and
+throughput is for a single thread (see benchmarks.asgi_vs_wsgi for
+concurrency). Scenarios that write run each call in a transaction that is
+rolled back, keeping the dataset identical between runs; pass --commit to
+keep the rows and include commit cost.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from .datagen import setup_django
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def dataset_size():
+    """Planner row estimates for the tables the scenarios read"""
+    from django.db import connection
+    from apps.bookings.models import Booking
+    from apps.iot.models import SensorData
+    from apps.venues.models import Space, Venue
+    
+    tables = {model._meta.db_table: name for name, model in
+              [('venues', Venue), ('spaces', Space), ('bookings', Booking), ('readings', SensorData)]}
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s)', [list(tables)])
+        return {tables[relname]: rows for relname, rows in cursor.fetchall()}
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    def percentile(value):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000, 2)
+    
+    return {
+        'iterations': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+        'errors': errors,
+    }
+
+def run_scenario(run, iterations, warmup, rollback, expected):
+    from django.db import transaction
+    
+    def call():
+        if not rollback:
+            return run()
+        with transaction.atomic():
+            status = run()
+            transaction.set_rollback(True)
+        return status
+    
+    for _ in range(warmup):
+        status = call()
+        if status != expected:
+            raise RuntimeError(f'Expected status {expected}, got {status}')
+    
+    latencies, errors = [], {}
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            status = call()
+        except Exception as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - call_started)
+        if status != expected:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+def compare(results, baseline):
+    """Percentage change of each percentile against a previous run"""
+    changes = {}
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        changes[name] = {
+            key: round((current[key] - previous[key]) / previous[key] * 100, 1)
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')
+            if current.get(key) and previous.get(key)
+        }
+    return changes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', help='Comma-separated scenario names (default: all)')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--commit', action='store_true', help='Commit writes instead of rolling them back')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    parser.add_argument('--baseline', help='Previous report to compare percentiles against')
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.test.utils import setup_test_environment
+    from rest_framework.throttling import SimpleRateThrottle
+    from . import scenarios
+    
+    # Admits the test client's host; throttling would cap each user at the
+    # configured rate long before the run finishes
+    setup_test_environment(debug=False)
+    SimpleRateThrottle.THROTTLE_RATES = {'anon': None, 'user': None}
+    
+    names = args.scenarios.split(',') if args.scenarios else list(scenarios.SCENARIOS)
+    unknown = set(names) - set(scenarios.SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(scenarios.SCENARIOS)})")
+    
+    client = scenarios.bench_client()
+    results = {}
+    for name in names:
+        run = scenarios.build(name, client, args.seed)
+        setup = scenarios.SCENARIOS[name]
+        try:
+            results[name] = run_scenario(run, args.iterations, args.warmup, setup.writes and not args.commit, setup.expected)
+        except RuntimeError as e:
+            parser.exit(1, f'{name}: {e}\n')
+        print(f"{name}: p50 {results[name]['p50_ms']}ms, p99 {results[name]['p99_ms']}ms", file=sys.stderr)
+    
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'iterations': args.iterations,
+        'dataset': dataset_size(),
+        'scenarios': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline_commit'] = baseline.get('commit')
+        report['change_pct'] = compare(results, baseline)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Hot-path scenarios for benchmarks.run
+
+Each scenario samples its inputs from the generated dataset once, then
+returns a callable that makes one request (or, for invoice generation, one
+model call) and returns its status code, which must match the scenario's
+`expected` status. Requests go through the full middleware stack with
+Django's test client and a real OAuth2 bearer token.
+Import only after django.setup().
+"""
+
+import hashlib
+import hmac
+import json
+import random
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.test import Client
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application
+from apps.authentication.models import User
+from apps.billing.models import BillingCycle
+from apps.bookings.models import Booking
+from apps.iot.models import IoTSensor
+from apps.venues.models import Space, Venue
+
+SAMPLE_SIZE = 200
+
+SCENARIOS = {}
+
+def scenario(name, writes=False, expected=200):
+    """Register a scenario; `writes` scenarios run inside a rolled-back transaction"""
+    def register(setup):
+        setup.writes = writes
+        setup.expected = expected
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+def bench_client():
+    """Test client authenticated as a generated user with a fresh access token"""
+    user = User.objects.filter(profile__isnull=False, email__startswith='bench-user-').first()
+    if user is None:
+        raise RuntimeError('No generated users found; run `python -m benchmarks.datagen` first')
+    application, _ = Application.objects.get_or_create(
+        name='benchmarks',
+        defaults={
+            'client_type': Application.CLIENT_CONFIDENTIAL,
+            'authorization_grant_type': Application.GRANT_CLIENT_CREDENTIALS,
+        },
+    )
+    token = AccessToken.objects.create(
+        user=user,
+        application=application,
+        token=uuid.uuid4().hex,
+        expires=timezone.now() + timedelta(hours=6),
+        scope='read write',
+    )
+    # Marked https as nginx forwards it, or SECURE_SSL_REDIRECT answers every request with a 301
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token.token}', HTTP_X_FORWARDED_PROTO='https')
+
+def post_json(client, path, payload, **extra):
+    return client.post(path, json.dumps(payload), content_type='application/json', **extra).status_code
+
+@scenario('venue_search')
+def venue_search(client, rng):
+    venues = list(Venue.objects.order_by('?').values_list('location', flat=True)[:SAMPLE_SIZE])
+    space_types = [code for code, _ in Space.SPACE_TYPES]
+    
+    def run():
+        point = rng.choice(venues)
+        payload = {'latitude': point.y, 'longitude': point.x, 'radius_km': rng.choice([2, 5, 10])}
+        if rng.random() < 0.3:
+            payload['space_type'] = rng.choice(space_types)
+        if rng.random() < 0.2:
+            payload['ranking'] = 'popular'
+        return post_json(client, '/api/v1/venues/search/', payload)
+    return run
+
+@scenario('check_availability')
+def check_availability(client, rng):
+    venue_ids = list(Venue.objects.order_by('?').values_list('venue_id', flat=True)[:SAMPLE_SIZE])
+    today = timezone.now().replace(minute=0, second=0, microsecond=0)
+    
+    def run():
+        start = today + timedelta(days=rng.randint(1, 45), hours=rng.randint(0, 10))
+        return post_json(client, '/api/v1/bookings/availability/', {
+            'venue_id': str(rng.choice(venue_ids)),
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(hours=rng.choice([1, 2, 4]))).isoformat(),
+        })
+    return run
+
+@scenario('booking_create', writes=True, expected=201)
+def booking_create(client, rng):
+    spaces = list(Space.objects.order_by('?').values_list('space_id', 'venue_id')[:SAMPLE_SIZE])
+    # Well past anything datagen books, so every slot is free
+    start = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=400)
+    slots = iter(range(10 ** 9))
+    
+    def run():
+        space_id, venue_id = rng.choice(spaces)
+        slot_start = start + timedelta(hours=next(slots))
+        return post_json(client, '/api/v1/bookings/', {
+            'venue': str(venue_id),
+            'space': str(space_id),
+            'booking_start_time': slot_start.isoformat(),
+            'booking_end_time': (slot_start + timedelta(hours=1)).isoformat(),
+        })
+    return run
+
+@scenario('sensor_webhook', writes=True)
+def sensor_webhook(client, rng):
+    sensors = list(
+        IoTSensor.objects.filter(is_active=True)
+        .order_by('?')
+        .values_list('sensor_external_id', 'sensor_type')[:SAMPLE_SIZE]
+    )
+    secret = settings.IOT_WEBHOOK_SECRET.encode()
+    
+    def run():
+        external_id, sensor_type = rng.choice(sensors)
+        body = json.dumps({
+            'sensor_id': external_id,
+            'sensor_type': sensor_type,
+            'timestamp': timezone.now().isoformat(),
+            'value': rng.randint(0, 20) if sensor_type == 'occupancy' else round(rng.uniform(18, 80), 2),
+            'metadata': {},
+        }).encode()
+        signature = 'sha256=' + hmac.new(secret, body, hashlib.sha256).hexdigest()
+        return client.post(
+            '/api/v1/iot/webhook/', body, content_type='application/json', HTTP_X_IOT_SIGNATURE=signature
+        ).status_code
+    return run
+
+@scenario('invoice_generation', writes=True)
+def invoice_generation(client, rng):
+    """One company's invoice for the last 30 days of completed bookings"""
+    period_end = timezone.now().date()
+    period_start = period_end - timedelta(days=30)
+    company_ids = list(
+        Booking.objects.filter(
+            company__isnull=False,
+            booking_status_code='Completed',
+            booking_start_time__date__range=[period_start, period_end],
+        )
+        .values_list('company_id', flat=True)
+        .distinct()[:SAMPLE_SIZE]
+    )
+    if not company_ids:
+        raise RuntimeError('No completed company bookings in the last 30 days')
+    
+    def run():
+        cycle = BillingCycle.objects.create(
+            company_id=rng.choice(company_ids),
+            cycle_start_date=period_start,
+            cycle_end_date=period_end,
+        )
+        return 200 if cycle.generate_invoice() else 404
+    return run
+
+def build(name, client, seed):
+    return SCENARIOS[name](client, random.Random(seed))
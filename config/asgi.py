@@ -1,5 +1,8 @@
 import os
 from django.core.asgi import get_asgi_application
+from core.tracing import configure_tracing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ASYNC_FAST_PATH', 'true')
+configure_tracing()
 application = get_asgi_application()
\ No newline at end of file
@@ -1,7 +1,8 @@
 """Enterprise Gunicorn configuration for production deployment"""
 
 import multiprocessing
-from os import getenv
+import os
+from os import environ, getenv
 
 # Server socket
 bind = getenv('GUNICORN_BIND', '0.0.0.0:8000')
@@ -10,16 +11,37 @@ backlog = 2048
 # Worker processes
 workers = int(getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
 worker_class = getenv('GUNICORN_WORKER_CLASS', 'sync')
-worker_connections = 1000
+worker_connections = int(getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Cooperative profile: GUNICORN_WORKER_CLASS=gevent
+gevent_workers = worker_class in ('gevent', 'gunicorn.workers.ggevent.GeventWorker')
+if gevent_workers:
+    # Each greenlet gets its own Django connection; don't keep them past the request
+    environ.setdefault('DB_CONN_MAX_AGE', '0')
+    # That connection stays open while the request waits on the gateway, so
+    # workers x worker_connections must fit Postgres max_connections. Behind
+    # PgBouncer (DB_PGBOUNCER=true) the pooler enforces its own limit;
+    # otherwise cap concurrent requests per worker to the connection budget.
+    if getenv('DB_PGBOUNCER', '').lower() not in ('1', 'true', 'yes', 'on'):
+        db_connection_budget = int(getenv('GUNICORN_DB_CONNECTION_BUDGET', 80))
+        worker_connections = min(worker_connections, max(1, db_connection_budget // workers))
+
 timeout = 30
 keepalive = 2
 
-# Restart workers after this many requests, to prevent memory leaks
-max_requests = 1000
-max_requests_jitter = 100
+# Restart workers after this many requests, to prevent memory leaks. Each
+# restart costs a cold worker (and a full import without preload_app), so
+# keep this as high as memory growth allows; 0 disables restarts.
+max_requests = int(getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+# Load application code before the worker processes are forked. Gevent
+# workers must patch the standard library before the app imports it.
+preload_app = not gevent_workers
 
-# Load application code before the worker processes are forked
-preload_app = True
+# Prometheus multiprocess mode: each worker writes its samples to mmap'd
+# files here and /metrics merges them
+prometheus_multiproc_dir = getenv('PROMETHEUS_MULTIPROC_DIR')
 
 # Logging
 accesslog = '-'
@@ -41,6 +63,14 @@ tmp_upload_dir = None
 keyfile = getenv('SSL_KEYFILE')
 certfile = getenv('SSL_CERTFILE')
 
+def on_starting(server):
+    # Samples from a previous run would otherwise be merged into this one
+    if prometheus_multiproc_dir:
+        os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+        for name in os.listdir(prometheus_multiproc_dir):
+            if name.endswith('.db'):
+                os.remove(os.path.join(prometheus_multiproc_dir, name))
+
 def when_ready(server):
     server.log.info("Server is ready. Spawning workers")
 
@@ -49,12 +79,33 @@ def worker_int(worker):
 
 def pre_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
+    if server.cfg.preload_app:
+        # Close connections opened while preloading before a worker inherits
+        # their sockets; closing them in a child would end the shared session
+        from django.db import connections
+        connections.close_all()
 
 def post_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
+    if gevent_workers:
+        from gevent import monkey
+        monkey.patch_all()
+        # psycopg2 waits on sockets in C; make those waits yield to other greenlets
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
 
 def post_worker_init(worker):
     worker.log.info("Worker initialized (pid: %s)", worker.pid)
+    # kill -USR2 <worker pid> writes a stack profile of that worker (the
+    # master treats USR2 as an upgrade, so never send it there)
+    from apps.metrics.profiler import install_signal_handler
+    install_signal_handler()
+
+def child_exit(server, worker):
+    if prometheus_multiproc_dir:
+        # Drop the dead worker's live gauges; its counters stay in the totals
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
 
 def worker_abort(worker):
     worker.log.info("Worker aborted (pid: %s)", worker.pid)
\ No newline at end of file
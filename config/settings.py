@@ -1,6 +1,7 @@
 from os import getenv, path, environ
 from sys import argv
 from pathlib import Path
+import socket
 
 env = environ.Env(DEBUG=(bool, False))
 
@@ -9,6 +10,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = env('SECRET_KEY', default='your-secret-key-here')
 DEBUG = env('DEBUG')
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost', '127.0.0.1'])
+# Prometheus scrapes each container by IP (monitoring/prometheus.yml), so the
+# container's own addresses must be accepted as hosts too
+if env.bool('ALLOW_CONTAINER_IP_HOSTS', default=False):
+    ALLOWED_HOSTS += sorted({info[4][0] for info in socket.getaddrinfo(socket.gethostname(), None)})
 
 DJANGO_APPS = [
     'django.contrib.admin',
@@ -18,6 +23,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -46,6 +52,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'oauth2_provider.middleware.OAuth2TokenMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.replica.ReplicaRoutingMiddleware',
+    'core.middleware.db_instrumentation.DBInstrumentationMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +66,21 @@ MIDDLEWARE = [
     'apps.metrics.collectors.metrics_middleware',
 ]
 
+# Async views for the hottest read endpoints; config/asgi.py turns this on
+ASYNC_FAST_PATH = env.bool('ASYNC_FAST_PATH', default=False)
+if ASYNC_FAST_PATH:
+    # Sync-only middleware would run the rest of the chain, views included, in
+    # a worker thread, so it is dropped to keep the async views on the event
+    # loop. Hops remain: MiddlewareMixin middleware (Django's own, AuditMiddleware,
+    # core SecurityMiddleware) still runs its process_* hooks through
+    # sync_to_async. The bearer-token middleware is inert without OAuth2Backend
+    # (DRF authenticates OAuth2 itself) and nginx serves static files in front
+    # of uvicorn.
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in (
+        'oauth2_provider.middleware.OAuth2TokenMiddleware',
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+    )]
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -86,9 +109,36 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD', default='password'),
         'HOST': env('DB_HOST', default='localhost'),
         'PORT': env('DB_PORT', default='5432'),
+        # Persistent connections, checked before reuse so a dropped one is replaced
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+        'OPTIONS': {
+            'connect_timeout': env.int('DB_CONNECT_TIMEOUT', default=5),
+        },
     }
 }
 
+# PgBouncer transaction pooling hands each transaction to any server
+# connection, so cursors must not outlive a transaction
+DB_PGBOUNCER = env.bool('DB_PGBOUNCER', default=False)
+if DB_PGBOUNCER:
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replicas as host or host:port; tests mirror them onto the default database
+for index, replica_host in enumerate(env.list('DB_REPLICA_HOSTS', default=[]), start=1):
+    host, _, port = replica_host.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = env.float('REPLICA_MAX_LAG_SECONDS', default=5.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float('REPLICA_LAG_CHECK_INTERVAL', default=10.0)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 12}},
@@ -172,6 +222,8 @@ SECURE_HSTS_SECONDS = 31536000 if not DEBUG else 0
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
 SECURE_SSL_REDIRECT = not DEBUG
+# Scraped over plain http from inside the backend network, never through nginx
+SECURE_REDIRECT_EXEMPT = [r'^metrics$']
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 # Session Security (Production)
@@ -207,4 +259,63 @@ LOGGING = {
 
 ENCRYPTION_KEY = env('ENCRYPTION_KEY', default='your-encryption-key-here')
 PAYMENT_GATEWAY_URL = env('PAYMENT_GATEWAY_URL', default='http://localhost:8081')
-IOT_WEBHOOK_SECRET = env('IOT_WEBHOOK_SECRET', default='iot-secret')
\ No newline at end of file
+IOT_WEBHOOK_SECRET = env('IOT_WEBHOOK_SECRET', default='iot-secret')
+
+# Keep-alive connections kept per upstream service in each worker process
+OUTBOUND_HTTP_POOL_SIZE = env.int('OUTBOUND_HTTP_POOL_SIZE', default=50)
+# Default outbound timeouts: a dead upstream fails fast on connect while slow
+# responses (a gateway waiting on the card network) still get the read budget
+OUTBOUND_HTTP_CONNECT_TIMEOUT = env.float('OUTBOUND_HTTP_CONNECT_TIMEOUT', default=3.05)
+OUTBOUND_HTTP_READ_TIMEOUT = env.float('OUTBOUND_HTTP_READ_TIMEOUT', default=30.0)
+
+# How often each worker checks whether payment gateway configs changed
+# elsewhere; changes made in the same worker apply immediately
+PAYMENT_GATEWAY_CONFIG_CHECK_SECONDS = env.float('PAYMENT_GATEWAY_CONFIG_CHECK_SECONDS', default=5.0)
+
+# Bearer token required to scrape /metrics; empty leaves it open (restrict at the proxy)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Distinct route labels kept on request metrics before the rest share '<other>'
+METRICS_MAX_ENDPOINT_LABELS = env.int('METRICS_MAX_ENDPOINT_LABELS', default=500)
+
+# Per-request query counting: fraction of requests sampled (0 disables), the
+# budgets that trigger a db_budget_exceeded warning, and an optional
+# Server-Timing response header for browser dev tools
+DB_INSTRUMENTATION_SAMPLE_RATE = env.float('DB_INSTRUMENTATION_SAMPLE_RATE', default=1.0)
+DB_QUERY_BUDGET_COUNT = env.int('DB_QUERY_BUDGET_COUNT', default=30)
+DB_QUERY_BUDGET_MS = env.float('DB_QUERY_BUDGET_MS', default=250.0)
+DB_SERVER_TIMING = env.bool('DB_SERVER_TIMING', default=False)
+
+# OpenTelemetry tracing: TRACING_EXPORTER is 'none' (off), 'jaeger', 'console'
+# or 'file' (JSON lines at TRACING_FILE_PATH, for offline analysis). With tail
+# sampling every request is recorded and kept if it failed or took over
+# TRACING_TAIL_LATENCY_MS, plus TRACING_SAMPLE_RATE of the rest; without it
+# TRACING_SAMPLE_RATE is a plain head-sampling ratio
+TRACING_EXPORTER = env('TRACING_EXPORTER', default='none')
+TRACING_SERVICE_NAME = env('TRACING_SERVICE_NAME', default='coworking-platform')
+TRACING_FILE_PATH = env('TRACING_FILE_PATH', default='traces.jsonl')
+TRACING_SAMPLE_RATE = env.float('TRACING_SAMPLE_RATE', default=0.05)
+TRACING_TAIL_SAMPLING = env.bool('TRACING_TAIL_SAMPLING', default=True)
+TRACING_TAIL_LATENCY_MS = env.float('TRACING_TAIL_LATENCY_MS', default=500.0)
+TRACING_TAIL_MAX_TRACES = env.int('TRACING_TAIL_MAX_TRACES', default=10000)
+# Comma-separated regexes searched in the full request URL, so anchor them on the path
+TRACING_EXCLUDED_URLS = env('TRACING_EXCLUDED_URLS', default=r'^https?://[^/]+/health/$,^https?://[^/]+/metrics$')
+
+# On-demand stack sampling: GET /debug/profile (staff only) or SIGUSR2 to a
+# worker, which writes PROFILER_SIGNAL_SECONDS of samples to PROFILER_OUTPUT_DIR.
+# One run per process at a time, within these caps. A profile request waits
+# out its run, so keep the cap below gunicorn's 30s worker timeout
+PROFILER_MAX_SECONDS = env.float('PROFILER_MAX_SECONDS', default=20.0)
+PROFILER_MIN_INTERVAL_MS = env.float('PROFILER_MIN_INTERVAL_MS', default=5.0)
+PROFILER_MAX_STACKS = env.int('PROFILER_MAX_STACKS', default=5000)
+PROFILER_SIGNAL_SECONDS = env.float('PROFILER_SIGNAL_SECONDS', default=20.0)
+PROFILER_OUTPUT_DIR = env('PROFILER_OUTPUT_DIR', default='/tmp')
+
+# Live venue occupancy totals kept in Redis by the IoT webhook and exported
+# at scrape time as venue_occupancy_rate / venue_occupants. Totals are summed
+# from per-space readings, so the shared (allkeys-lru) Redis only risks losing
+# readings until sensors report again; point this at a non-evicting instance
+# to avoid even that. Readings older than OCCUPANCY_STALE_SECONDS are dropped
+OCCUPANCY_REDIS_URL = env('OCCUPANCY_REDIS_URL', default=env('REDIS_URL', default='redis://localhost:6379/1'))
+OCCUPANCY_REDIS_TIMEOUT = env.float('OCCUPANCY_REDIS_TIMEOUT', default=0.5)
+OCCUPANCY_STALE_SECONDS = env.float('OCCUPANCY_STALE_SECONDS', default=900.0)
\ No newline at end of file
@@ -1,11 +1,17 @@
 from django.contrib import admin
 from django.urls import path, include
-from apps.health import health_check
+from django.conf import settings
+from apps.health import health_check, health_check_async
 from apps.api_root import api_root
+from apps.metrics.views import metrics, profile
+
+health_view = health_check_async if settings.ASYNC_FAST_PATH else health_check
 
 urlpatterns = [
-    path('', health_check, name='health'),
-    path('health/', health_check, name='health_check'),
+    path('', health_view, name='health'),
+    path('health/', health_view, name='health_check'),
+    path('metrics', metrics, name='metrics'),
+    path('debug/profile', profile, name='profile'),
     path('api/v1/', api_root, name='api_root'),
     path('admin/', admin.site.urls),
     path('o/', include('oauth2_provider.urls', namespace='oauth2_provider')),
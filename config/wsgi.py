@@ -1,5 +1,7 @@
 import os
 from django.core.wsgi import get_wsgi_application
+from core.tracing import configure_tracing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+configure_tracing()
 application = get_wsgi_application()
\ No newline at end of file
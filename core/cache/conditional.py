@@ -0,0 +1,68 @@
+"""Conditional GET support (ETag/Last-Modified) for DRF retrieve views"""
+
+import hashlib
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+class ConditionalRetrieveMixin:
+    """Answer If-None-Match/If-Modified-Since with 304 before serializing
+    
+    A cheap version query loads only the version field (plus any fields the
+    object permissions need) and runs the usual permission checks. When the
+    client's validators still match, the full object is never fetched or
+    serialized. Views whose representation depends on related rows can
+    extend get_version_queryset() with annotations and get_object_version().
+    """
+    version_field = 'updated_at'
+    version_only_fields = ()
+    
+    def get_version_queryset(self):
+        return self.get_queryset().select_related(None).prefetch_related(None)
+    
+    def get_version_object(self):
+        queryset = self.filter_queryset(self.get_version_queryset())
+        queryset = queryset.only(self.version_field, *self.version_only_fields)
+        
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def get_object_version(self, obj):
+        """Values that change whenever the representation changes"""
+        return [getattr(obj, self.version_field)]
+    
+    def get_last_modified(self, obj):
+        timestamps = [value for value in self.get_object_version(obj) if hasattr(value, 'timestamp')]
+        # Whole seconds, matching the resolution of If-Modified-Since
+        return int(max(timestamps).timestamp()) if timestamps else None
+    
+    def get_etag(self, obj):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        parts = [
+            self.__class__.__name__,
+            str(obj.pk),
+            getattr(renderer, 'format', ''),
+            self.request.META.get('QUERY_STRING', ''),
+        ]
+        parts.extend(str(value) for value in self.get_object_version(obj))
+        digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        # Weak: equivalent content, not byte-for-byte identical renderings
+        return f'W/{quote_etag(digest)}'
+    
+    def retrieve(self, request, *args, **kwargs):
+        version_obj = self.get_version_object()
+        etag = self.get_etag(version_obj)
+        last_modified = self.get_last_modified(version_obj)
+        
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -1,8 +1,16 @@
 from dependency_injector import containers, providers
-from apps.payments.gateway_enterprise import EnterprisePaymentProcessor
-from apps.payments.services import PaymentService
-from apps.bookings.services import BookingService
-from apps.venues.services import VenueService
+from django.utils.module_loading import import_string
+
+def deferred(path):
+    """Factory target that imports `path` the first time it is provided
+    
+    Keeps importing the container from pulling in the payment gateway
+    modules (and their HTTP and ORM dependencies) at start-up.
+    """
+    def create(*args, **kwargs):
+        return import_string(path)(*args, **kwargs)
+    create.__qualname__ = path
+    return create
 
 class Container(containers.DeclarativeContainer):
     """Enterprise dependency injection container"""
@@ -11,23 +19,9 @@ class Container(containers.DeclarativeContainer):
     
     # Payment Gateway
     payment_gateway = providers.Factory(
-        EnterprisePaymentProcessor,
-        gateway_url=config.payment.gateway_url,
-        api_key=config.payment.api_key,
-        timeout=config.payment.timeout.as_(int)
-    )
-    
-    # Services
-    payment_service = providers.Factory(
-        PaymentService,
-        gateway=payment_gateway
-    )
-    
-    booking_service = providers.Factory(
-        BookingService,
-        payment_service=payment_service
+        deferred('apps.payments.gateway_enterprise.EnterprisePaymentProcessor')
     )
     
-    venue_service = providers.Factory(
-        VenueService
+    payment_processor = providers.Factory(
+        deferred('apps.payments.gateway.PaymentProcessor')
     )
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""Primary/replica database routing with replica-lag awareness"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import ContextDecorator, contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+_write_scope = contextvars.ContextVar('write_scope', default=None)
+
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class _WriteScope:
+    """Whether a write happened in the scope
+    
+    Mutated rather than re-set, so a write in a copied context (a
+    sync_to_async thread, a child task) still pins the scope that owns it.
+    """
+    __slots__ = ('written',)
+    
+    def __init__(self):
+        self.written = False
+
+class use_replica(ContextDecorator):
+    """Send reads in the block (or decorated function) to a healthy replica
+    
+    Writes still go to the primary, and after the first write the rest of
+    the routing scope (or of this block, outside one) reads from the primary.
+    """
+    
+    def _recreate_cm(self):
+        # A fresh instance per call keeps the reset token thread-safe
+        return self.__class__()
+    
+    def __enter__(self):
+        self._token = _replica_reads.set(True)
+        self._scope_token = _write_scope.set(_WriteScope()) if _write_scope.get() is None else None
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self._scope_token is not None:
+            _write_scope.reset(self._scope_token)
+        _replica_reads.reset(self._token)
+        return False
+
+class pin_to_primary(ContextDecorator):
+    """Read from the primary in the block (or decorated function), even inside use_replica"""
+    
+    def _recreate_cm(self):
+        return self.__class__()
+    
+    def __enter__(self):
+        self._token = _pinned_to_primary.set(True)
+        return self
+    
+    def __exit__(self, *exc_info):
+        _pinned_to_primary.reset(self._token)
+        return False
+
+@contextmanager
+def routing_scope():
+    """Isolate replica/pinning state, e.g. for the lifetime of one request"""
+    replica_token = _replica_reads.set(False)
+    pinned_token = _pinned_to_primary.set(False)
+    scope_token = _write_scope.set(_WriteScope())
+    try:
+        yield
+    finally:
+        _write_scope.reset(scope_token)
+        _pinned_to_primary.reset(pinned_token)
+        _replica_reads.reset(replica_token)
+
+class ReplicaLagMonitor:
+    """Per-process replica health, refreshed at most every check interval"""
+    
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+    
+    def lag_seconds(self, alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(alias)
+        if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return checked[1]
+        
+        try:
+            lag = self.lag_seconds(alias)
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                logger.warning(f"Replica {alias} lagging {lag:.1f}s, reading from primary")
+        except DatabaseError as e:
+            logger.warning(f"Replica {alias} unavailable: {e}")
+            healthy = False
+        
+        with self._lock:
+            self._checked[alias] = (now, healthy)
+        return healthy
+    
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+replica_lag_monitor = ReplicaLagMonitor()
+
+def choose_replica():
+    """A random healthy replica alias, or None"""
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_lag_monitor.is_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+class PrimaryReplicaRouter:
+    """Route opted-in reads to replicas and everything else to the primary"""
+    
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        scope = _write_scope.get()
+        if scope is not None and scope.written:
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+    
+    def db_for_write(self, model, **hints):
+        # Read your own writes; outside any scope there is nothing to pin
+        scope = _write_scope.get()
+        if scope is not None:
+            scope.written = True
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+class ReplicaReadMixin:
+    """Serve safe-method requests of a DRF view from a replica"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
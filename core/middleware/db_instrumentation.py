@@ -0,0 +1,116 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from apps.metrics.collectors import EndpointLabels, track_db_request
+
+logger = logging.getLogger(__name__)
+
+class QueryStats:
+    """Execute wrapper that tallies the queries run through it"""
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = ''
+        self.slowest_duration = 0.0
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+    
+    def install(self):
+        """Wrap every configured connection in the current thread"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+class DBInstrumentationMiddleware:
+    """Count queries and database time for a sample of requests
+    
+    Sampled requests are recorded in per-route histograms, and a structured
+    warning is logged when a request goes over DB_QUERY_BUDGET_COUNT queries
+    or DB_QUERY_BUDGET_MS of database time. Unsampled requests (everything,
+    with DB_INSTRUMENTATION_SAMPLE_RATE=0) pass straight through.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.DB_INSTRUMENTATION_SAMPLE_RATE
+        self.budget_count = settings.DB_QUERY_BUDGET_COUNT
+        self.budget_seconds = settings.DB_QUERY_BUDGET_MS / 1000
+        self.server_timing = settings.DB_SERVER_TIMING
+        self.endpoint_label = EndpointLabels(settings.METRICS_MAX_ENDPOINT_LABELS)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def sampled(self):
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        
+        stats = QueryStats()
+        started = time.perf_counter()
+        with stats.install():
+            response = self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+    
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        
+        # The ORM runs in the request's thread-sensitive worker thread, and
+        # connections are per thread, so the wrappers are installed there
+        stats = QueryStats()
+        started = time.perf_counter()
+        stack = await sync_to_async(stats.install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+    
+    def record(self, request, response, stats, elapsed):
+        endpoint = self.endpoint_label(request)
+        track_db_request(endpoint, stats.count, stats.duration)
+        
+        if stats.count > self.budget_count or stats.duration > self.budget_seconds:
+            details = {
+                'event': 'db_budget_exceeded',
+                'method': request.method,
+                'endpoint': endpoint,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': stats.count,
+                'db_ms': round(stats.duration * 1000, 1),
+                'slowest_ms': round(stats.slowest_duration * 1000, 1),
+                'slowest_sql': stats.slowest_sql[:500],
+            }
+            logger.warning(json.dumps(details), extra={'db_budget': details})
+        
+        if self.server_timing:
+            # app covers everything below this middleware, database time included
+            timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed * 1000:.1f}'
+            existing = response.headers.get('Server-Timing')
+            response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
\ No newline at end of file
@@ -0,0 +1,26 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.db.routers import routing_scope
+
+class ReplicaRoutingMiddleware:
+    """Give each request its own replica routing state
+    
+    Reads only go to replicas inside views that opt in, and a write pins
+    the remainder of the request to the primary so it reads its own writes.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_scope():
+            return self.get_response(request)
+    
+    async def __acall__(self, request):
+        with routing_scope():
+            return await self.get_response(request)
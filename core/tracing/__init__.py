@@ -0,0 +1,105 @@
+"""OpenTelemetry tracing bootstrap and manual span helpers
+
+configure_tracing() is called from config/wsgi.py and config/asgi.py before
+the application is built. With TRACING_EXPORTER=none (the default) it does
+nothing and the helpers below fall back to the API's no-op tracer.
+"""
+
+import functools
+import threading
+from django.conf import settings
+
+_configured = False
+_lock = threading.Lock()
+
+def _exporter(name):
+    if name == 'jaeger':
+        # Agent host and port come from OTEL_EXPORTER_JAEGER_AGENT_HOST/_PORT
+        from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+        return JaegerExporter()
+    
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if name == 'console':
+        return ConsoleSpanExporter()
+    if name == 'file':
+        # One JSON span per line, appended by every worker
+        out = open(settings.TRACING_FILE_PATH, 'a', buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + '\n')
+    raise ValueError(f"Unknown TRACING_EXPORTER {name!r}; expected 'jaeger', 'console', 'file' or 'none'")
+
+def configure_tracing():
+    """Install the tracer provider and library instrumentation once per process"""
+    global _configured
+    if settings.TRACING_EXPORTER == 'none':
+        return
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+        
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.django import DjangoInstrumentor
+        from opentelemetry.instrumentation.psycopg2 import Psycopg2Instrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ALWAYS_ON, ParentBased, TraceIdRatioBased
+        from .sampling import TailSamplingProcessor
+        
+        processor = BatchSpanProcessor(_exporter(settings.TRACING_EXPORTER))
+        if settings.TRACING_TAIL_SAMPLING:
+            # Every trace is recorded so the decision can wait for the outcome
+            sampler = ParentBased(ALWAYS_ON)
+            processor = TailSamplingProcessor(
+                processor,
+                latency_threshold=settings.TRACING_TAIL_LATENCY_MS / 1000,
+                sample_rate=settings.TRACING_SAMPLE_RATE,
+                max_traces=settings.TRACING_TAIL_MAX_TRACES,
+            )
+        else:
+            sampler = ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE))
+        
+        provider = TracerProvider(
+            sampler=sampler,
+            resource=Resource.create({'service.name': settings.TRACING_SERVICE_NAME}),
+        )
+        provider.add_span_processor(processor)
+        trace.set_tracer_provider(provider)
+        
+        # The Django instrumentor adds its middleware to settings.MIDDLEWARE,
+        # so it has to run before the handler loads the middleware chain
+        DjangoInstrumentor().instrument(excluded_urls=settings.TRACING_EXCLUDED_URLS)
+        # The dependency check looks for 'psycopg2' and we install psycopg2-binary
+        Psycopg2Instrumentor().instrument(skip_dep_check=True)
+        RedisInstrumentor().instrument()
+        RequestsInstrumentor().instrument()
+
+def get_tracer():
+    from opentelemetry import trace
+    return trace.get_tracer('coworking_platform')
+
+def traced(name):
+    """Run the decorated function in a span called `name`; exceptions mark it failed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def annotate(**attributes):
+    """Set attributes on the current span; `payment__gateway` sets payment.gateway"""
+    from opentelemetry import trace
+    span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key.replace('__', '.'), value)
+
+def mark_failed(description):
+    """Flag the current span as an error without an exception (tail sampling keeps it)"""
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+    trace.get_current_span().set_status(Status(StatusCode.ERROR, description))
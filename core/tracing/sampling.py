@@ -0,0 +1,96 @@
+"""Tail-based sampling for OpenTelemetry spans"""
+
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from opentelemetry.sdk.trace import SpanProcessor
+from opentelemetry.trace import StatusCode
+
+class TailSamplingProcessor(SpanProcessor):
+    """Hold each trace's spans until its local root ends, then keep or drop it whole
+    
+    A trace is kept when any of its spans failed, when the root took at least
+    `latency_threshold` seconds, or otherwise with probability `sample_rate`.
+    Kept spans go to `processor` (normally a BatchSpanProcessor). At most
+    `max_traces` unfinished traces and `max_spans` spans per trace are held;
+    past that the oldest trace is dropped and extra spans are discarded.
+    Decisions are remembered for `decision_ttl` seconds (and at most
+    `max_traces` of them), so spans ending after their root are exported or
+    dropped with their trace instead of opening a new buffer.
+    """
+    
+    def __init__(self, processor, latency_threshold, sample_rate, max_traces=10_000, max_spans=1000,
+                 decision_ttl=30.0):
+        self.processor = processor
+        self.latency_threshold_ns = int(latency_threshold * 1e9)
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self.decision_ttl = decision_ttl
+        self.dropped_traces = 0
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+    
+    def _reset(self):
+        # Buffers and locks inherited from the master belong to no trace here
+        self._traces = OrderedDict()
+        self._decided = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def on_start(self, span, parent_context=None):
+        pass
+    
+    def on_end(self, span):
+        trace_id = span.context.trace_id
+        with self._lock:
+            self._expire_decisions()
+            decided = self._decided.get(trace_id)
+            if decided is not None:
+                keep, spans = decided[0], [span]
+            else:
+                keep, spans = self._buffer(span, trace_id)
+        
+        if keep:
+            for kept in spans:
+                self.processor.on_end(kept)
+    
+    def _buffer(self, span, trace_id):
+        # (keep, spans) once the local root ends, (False, []) while the trace is open
+        spans = self._traces.get(trace_id)
+        if spans is None:
+            if len(self._traces) >= self.max_traces:
+                self._traces.popitem(last=False)
+                self.dropped_traces += 1
+            spans = self._traces[trace_id] = []
+        if len(spans) < self.max_spans:
+            spans.append(span)
+        if span.parent is not None and not span.parent.is_remote:
+            return False, []
+        del self._traces[trace_id]
+        # Decided under the lock, so a late span can't slip in before the decision is recorded
+        keep = self.keep(span, spans)
+        self._decided[trace_id] = (keep, time.monotonic() + self.decision_ttl)
+        return keep, spans
+    
+    def _expire_decisions(self):
+        now = time.monotonic()
+        while self._decided:
+            _, expires_at = next(iter(self._decided.values()))
+            if expires_at > now and len(self._decided) < self.max_traces:
+                break
+            self._decided.popitem(last=False)
+    
+    def keep(self, root, spans):
+        if any(span.status.status_code is StatusCode.ERROR for span in spans):
+            return True
+        if root.end_time - root.start_time >= self.latency_threshold_ns:
+            return True
+        return random.random() < self.sample_rate
+    
+    def shutdown(self):
+        self.processor.shutdown()
+    
+    def force_flush(self, timeout_millis=30000):
+        return self.processor.force_flush(timeout_millis)
@@ -1,11 +1,14 @@
-from cryptography.fernet import Fernet
 from django.conf import settings
+from django.utils.functional import cached_property
 from base64 import urlsafe_b64encode
 
 class FieldEncryption:
-    def __init__(self):
+    @cached_property
+    def cipher(self):
+        # Built on first use so importing models doesn't load cryptography
+        from cryptography.fernet import Fernet
         key = settings.ENCRYPTION_KEY.encode()
-        self.cipher = Fernet(urlsafe_b64encode(key[:32]))
+        return Fernet(urlsafe_b64encode(key[:32]))
     
     def encrypt(self, data: str) -> str:
         if not data:
@@ -1,8 +1,12 @@
 """High-grade test configuration for enterprise testing"""
 
 import os
+import time
+from contextlib import ContextDecorator, ExitStack
 import pytest
+from django.db import connections
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from unittest.mock import Mock
@@ -67,6 +71,16 @@ def enable_db_access_for_all_tests(db):
     """Enable database access for all tests"""
     pass
 
+@pytest.fixture(autouse=True)
+def replica_reads_on_primary(request, settings):
+    """Keep opted-in replica reads on the primary unless the test uses every database
+    
+    Replicas mirror the test database through separate connections, so a
+    TestCase may not query them and would not see its own rows there.
+    """
+    if getattr(request.cls, 'databases', None) != '__all__':
+        settings.DATABASE_REPLICAS = []
+
 @pytest.fixture
 def mock_payment_gateway():
     """Mock payment gateway for testing"""
@@ -77,4 +91,49 @@ def mock_payment_gateway():
         'transaction_id': 'test_txn_123',
         'status': 'Paid'
     }
-    return gateway
\ No newline at end of file
+    return gateway
+
+class QueryBudget(ContextDecorator):
+    """Fail when the wrapped call runs too many queries or takes too long
+    
+    Counts queries on every database alias, so reads routed to replicas
+    are included. Usable as a context manager or a test decorator:
+        
+        with QueryBudget(max_queries=3, max_seconds=0.5):
+            client.get('/api/v1/bookings/')
+    """
+    
+    def __init__(self, max_queries, max_seconds=1.0):
+        self.max_queries = max_queries
+        self.max_seconds = max_seconds
+    
+    def __enter__(self):
+        self._stack = ExitStack()
+        self._captures = [
+            self._stack.enter_context(CaptureQueriesContext(connection))
+            for connection in connections.all()
+        ]
+        self._started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self._started
+        self._stack.close()
+        if exc_type is not None:
+            return False
+        
+        queries = [query['sql'] for capture in self._captures for query in capture.captured_queries]
+        self.query_count = len(queries)
+        if self.query_count > self.max_queries:
+            listing = '\n'.join(f'{i}. {sql}' for i, sql in enumerate(queries, start=1))
+            raise AssertionError(
+                f'{self.query_count} queries executed, budget is {self.max_queries}:\n{listing}'
+            )
+        if self.max_seconds is not None and self.elapsed > self.max_seconds:
+            raise AssertionError(f'Took {self.elapsed:.3f}s, budget is {self.max_seconds}s')
+        return False
+
+@pytest.fixture
+def query_budget():
+    """Query and wall-time budget for an endpoint call"""
+    return QueryBudget
\ No newline at end of file
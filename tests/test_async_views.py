@@ -0,0 +1,86 @@
+import json
+import uuid
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+from apps.health import health_check, health_check_async
+from apps.iot import views as iot_views
+from apps.venues import views as venue_views
+from apps.venues.cache import space_state_cache
+from apps.venues.models import Venue, Space
+
+User = get_user_model()
+
+# Both variants side by side; the real URLconf picks one by ASYNC_FAST_PATH
+urlpatterns = [
+    path('sync/venues/search/', venue_views.venue_search),
+    path('async/venues/search/', venue_views.venue_search_async),
+    path('sync/spaces/<uuid:space_id>/occupancy/', iot_views.space_occupancy_status),
+    path('async/spaces/<uuid:space_id>/occupancy/', iot_views.space_occupancy_status_async),
+    path('sync/health/', health_check),
+    path('async/health/', health_check_async),
+]
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncFastPathTestCase(TestCase):
+    """Test async fast-path views answer exactly like their sync counterparts"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='async@example.com',
+            email='async@example.com',
+            password='asyncpass123'
+        )
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        
+        self.venue = Venue.objects.create(
+            venue_name='Async Venue',
+            venue_type_code='CoworkingHub',
+            address='1 Loop St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly'
+        )
+        self.space = Space.objects.create(venue=self.venue, space_name='Desk', capacity=4, hourly_rate=10.00)
+    
+    def assertSamePayload(self, method, path, *args, **kwargs):
+        sync_response = getattr(self.client, method)(f'/sync/{path}', *args, **kwargs)
+        async_response = async_to_sync(getattr(self.async_client, method))(f'/async/{path}', *args, **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+        return sync_response
+    
+    def test_venue_search(self):
+        """Test venue_search_async returns the sync search results"""
+        response = self.assertSamePayload(
+            'post', 'venues/search/',
+            {'latitude': 40.7128, 'longitude': -74.0060, 'radius_km': 5.0},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['features']), 1)
+        
+        response = self.assertSamePayload('post', 'venues/search/', {'latitude': 'north'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_space_occupancy_status(self):
+        """Test space_occupancy_status_async returns the sync occupancy state"""
+        space_state_cache.update_occupancy(self.space, 3, timezone.now())
+        
+        response = self.assertSamePayload('get', f'spaces/{self.space.space_id}/occupancy/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['current_occupancy'], 3)
+        
+        response = self.assertSamePayload('get', f'spaces/{uuid.uuid4()}/occupancy/')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_health_check(self):
+        """Test health_check_async returns the sync health payload"""
+        response = self.assertSamePayload('get', 'health/')
+        self.assertEqual(response.status_code, 200)
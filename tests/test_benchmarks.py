@@ -0,0 +1,30 @@
+from django.test import TestCase
+from apps.bookings.models import Booking
+from apps.payments.models import PaymentGatewayConfig
+from benchmarks import gevent_payments, loadgen
+
+GATEWAY_URL = 'http://127.0.0.1:8081'
+
+class BenchmarkFixturesTestCase(TestCase):
+    """Test benchmark fixture setup against the test database"""
+    
+    def assertGatewayActive(self):
+        config = PaymentGatewayConfig.objects.get(gateway_type='java_spring', is_active=True)
+        self.assertEqual(config.endpoint_url, GATEWAY_URL)
+    
+    def test_loadgen_fixtures(self):
+        """Test loadgen gets one token per virtual user and a bookable space"""
+        tokens, space = loadgen.setup_fixtures(2, GATEWAY_URL)
+        
+        self.assertEqual(len(set(tokens)), 2)
+        self.assertEqual(space.capacity, 1)
+        self.assertTrue(space.venue.opening_intervals.exists())
+        self.assertGatewayActive()
+    
+    def test_gevent_payments_fixtures(self):
+        """Test gevent_payments gets one pending booking per request"""
+        token, booking_ids = gevent_payments.setup_fixtures(3, GATEWAY_URL)
+        
+        self.assertTrue(token)
+        self.assertEqual(Booking.objects.filter(pk__in=booking_ids, payment_status_code='Pending').count(), 3)
+        self.assertGatewayActive()
@@ -1,6 +1,9 @@
 import os
+import json
 import pytest
-from django.test import TestCase
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, TestCase
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
 from django.utils import timezone
@@ -9,6 +12,7 @@ from rest_framework import status
 from apps.authentication.models import UserProfile
 from apps.venues.models import Venue, Space
 from apps.bookings.models import Booking, BookingPolicy
+from apps.bookings.views import check_availability_async
 
 User = get_user_model()
 
@@ -122,6 +126,28 @@ class BookingTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['available_spaces']), 1)
     
+    def test_availability_check_async_fast_path(self):
+        """Test the async availability view answers like the sync one"""
+        start_time = timezone.now() + timezone.timedelta(hours=1)
+        end_time = start_time + timezone.timedelta(hours=2)
+        
+        request = AsyncRequestFactory().post(
+            '/api/v1/bookings/availability/',
+            {
+                'venue_id': str(self.venue.venue_id),
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat()
+            },
+            content_type='application/json'
+        )
+        with patch('core.utils.async_api.check_request', return_value=self.user):
+            response = async_to_sync(check_availability_async)(request)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = json.loads(response.content)
+        self.assertEqual(payload['total_available'], 1)
+        self.assertEqual(payload['available_spaces'][0]['space_id'], str(self.space.space_id))
+    
     def test_booking_policy_enforcement(self):
         """Test booking policy enforcement"""
         # Create advance booking policy
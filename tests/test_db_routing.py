@@ -0,0 +1,88 @@
+from unittest.mock import patch
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.test import TestCase, TransactionTestCase, override_settings
+from apps.venues.models import Venue
+from core.db.routers import PrimaryReplicaRouter, pin_to_primary, replica_lag_monitor, routing_scope, use_replica
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_MAX_LAG_SECONDS=5.0, REPLICA_LAG_CHECK_INTERVAL=10.0)
+class ReplicaRoutingTestCase(TestCase):
+    """Test primary/replica routing decisions"""
+    # Lag checks are patched, so no replica is queried; '__all__' keeps the replica list
+    databases = '__all__'
+    
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        replica_lag_monitor.reset()
+        self.addCleanup(replica_lag_monitor.reset)
+    
+    def test_reads_default_to_primary(self):
+        """Test reads outside use_replica stay on the primary"""
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Venue), 'default')
+    
+    def test_replica_reads_until_first_write(self):
+        """Test a write pins the rest of the scope to the primary"""
+        with patch.object(replica_lag_monitor, 'lag_seconds', return_value=0.0):
+            with routing_scope(), use_replica():
+                self.assertEqual(self.router.db_for_read(Venue), 'replica_1')
+                self.assertEqual(self.router.db_for_write(Venue), 'default')
+                self.assertEqual(self.router.db_for_read(Venue), 'default')
+            
+            with routing_scope(), use_replica():
+                self.assertEqual(self.router.db_for_read(Venue), 'replica_1')
+    
+    def test_pinning_is_scoped(self):
+        """Test pin_to_primary and write pinning end with their block"""
+        with patch.object(replica_lag_monitor, 'lag_seconds', return_value=0.0):
+            with routing_scope(), use_replica():
+                with pin_to_primary():
+                    self.assertEqual(self.router.db_for_read(Venue), 'default')
+                self.assertEqual(self.router.db_for_read(Venue), 'replica_1')
+            
+            # Outside a routing scope a write pins only its use_replica block
+            with use_replica():
+                self.router.db_for_write(Venue)
+                self.assertEqual(self.router.db_for_read(Venue), 'default')
+            self.router.db_for_write(Venue)
+            with use_replica():
+                self.assertEqual(self.router.db_for_read(Venue), 'replica_1')
+    
+    def test_lagging_replica_is_skipped(self):
+        """Test replicas behind the lag budget fall back to the primary"""
+        with patch.object(replica_lag_monitor, 'lag_seconds', return_value=30.0) as lag_seconds:
+            with routing_scope(), use_replica():
+                self.assertEqual(self.router.db_for_read(Venue), 'default')
+                self.assertEqual(self.router.db_for_read(Venue), 'default')
+        # Health is cached between checks
+        self.assertEqual(lag_seconds.call_count, 1)
+
+class ReplicaDatabaseTestCase(TransactionTestCase):
+    """Test reads through configured replicas against the mirrored test database"""
+    # Mirrors are separate connections, so rows must be committed to be seen there
+    databases = '__all__'
+    
+    def setUp(self):
+        replica_lag_monitor.reset()
+        self.addCleanup(replica_lag_monitor.reset)
+    
+    def test_replica_read_sees_primary_data(self):
+        """Test opted-in reads resolve against a replica alias"""
+        if not settings.DATABASE_REPLICAS:
+            self.skipTest('No DB_REPLICA_HOSTS configured')
+        
+        Venue.objects.create(
+            venue_name='Replica Venue',
+            venue_type_code='CoworkingHub',
+            address='1 Main St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly'
+        )
+        
+        with routing_scope(), use_replica():
+            queryset = Venue.objects.filter(venue_name='Replica Venue')
+            self.assertIn(queryset.db, settings.DATABASE_REPLICAS)
+            self.assertEqual(queryset.count(), 1)
@@ -0,0 +1,313 @@
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.iot.occupancy import VenueOccupancy
+from apps.metrics.collectors import EndpointLabels, LazyMetric, VenueOccupancyCollector
+from apps.metrics import views
+from apps.metrics.signals import db_connection_request_started
+from apps.metrics.importtime import by_package, parse_importtime, total_import_us
+from apps.metrics.profiler import ProfilerBusy, clamp, profile, start
+from core.middleware.db_instrumentation import DBInstrumentationMiddleware
+from core.utils.http import get_session
+
+IMPORTTIME_OUTPUT = '''import time: self [us] | cumulative | imported package
+import time:       143 |        143 |   _io
+import time:       320 |        463 | _frozen_importlib_external
+import time:        50 |         50 |     django.utils.version
+import time:       200 |        250 |   django.utils
+import time:       400 |        650 | django
+'''
+
+class ImportTimeTestCase(SimpleTestCase):
+    """Test parsing of python -X importtime output"""
+    
+    def test_parse_importtime(self):
+        """Test records keep nesting depth and timings"""
+        records = parse_importtime(IMPORTTIME_OUTPUT)
+        
+        self.assertEqual([r.module for r in records], [
+            '_io', '_frozen_importlib_external', 'django.utils.version', 'django.utils', 'django',
+        ])
+        self.assertEqual([r.depth for r in records], [1, 0, 2, 1, 0])
+        self.assertEqual(total_import_us(records), 463 + 650)
+        self.assertEqual(by_package(records)[0], ('django', 650))
+
+class LazyMetricTestCase(SimpleTestCase):
+    """Test deferred metric registration"""
+    
+    def test_metric_registered_on_first_use(self):
+        """Test the metric is created once, on first attribute access"""
+        metric = LazyMetric('Counter', 'lazy_metric_test_total', 'Lazy metric test', ['kind'])
+        self.assertIsNone(metric._metric)
+        
+        metric.labels(kind='a').inc()
+        metric.labels(kind='a').inc()
+        
+        self.assertEqual(metric.labels(kind='a')._value.get(), 2)
+        self.assertIs(metric.resolve(), metric._metric)
+
+class EndpointLabelsTestCase(SimpleTestCase):
+    """Test bounded route-template labels for request metrics"""
+    
+    def test_label_is_route_template(self):
+        """Test requests for different objects share one label"""
+        labels = EndpointLabels(limit=10)
+        request = RequestFactory().get('/metrics')
+        request.resolver_match = resolve('/metrics')
+        
+        self.assertEqual(labels(request), '/metrics')
+        self.assertEqual(labels(SimpleNamespace(resolver_match=None)), EndpointLabels.UNMATCHED)
+        
+        first = SimpleNamespace(resolver_match=SimpleNamespace(route='api/v1/bookings/<uuid:pk>/'))
+        second = SimpleNamespace(resolver_match=SimpleNamespace(route='api/v1/bookings/<uuid:pk>/'))
+        self.assertEqual(labels(first), labels(second))
+    
+    def test_label_set_is_bounded(self):
+        """Test routes past the limit collapse into the overflow label"""
+        labels = EndpointLabels(limit=2)
+        routes = [SimpleNamespace(resolver_match=SimpleNamespace(route=f'route-{i}/')) for i in range(4)]
+        
+        self.assertEqual([labels(r) for r in routes], ['/route-0/', '/route-1/', '<other>', '<other>'])
+        self.assertEqual(labels(routes[0]), '/route-0/')
+
+class MetricsEndpointTestCase(SimpleTestCase):
+    """Test the Prometheus scrape endpoint"""
+    
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_exposed(self):
+        """Test registered metrics are rendered in exposition format"""
+        response = self.client.get('/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE api_requests_total counter', response.content)
+    
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_token_required(self):
+        """Test scrapes need the bearer token when one is configured"""
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+
+@override_settings(DB_INSTRUMENTATION_SAMPLE_RATE=1.0, DB_QUERY_BUDGET_COUNT=1, DB_QUERY_BUDGET_MS=10000, DB_SERVER_TIMING=True)
+class DBInstrumentationTestCase(TestCase):
+    """Test per-request query counting"""
+    
+    def get_response(self, request):
+        request.resolver_match = resolve('/metrics')
+        User = get_user_model()
+        User.objects.count()
+        User.objects.filter(email='nobody@example.com').exists()
+        return HttpResponse('ok')
+    
+    def test_queries_counted_and_budget_logged(self):
+        """Test a request over its query budget is reported"""
+        middleware = DBInstrumentationMiddleware(self.get_response)
+        
+        with self.assertLogs('core.middleware.db_instrumentation', level='WARNING') as logs:
+            response = middleware(RequestFactory().get('/metrics'))
+        
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertIn('app;dur=', response['Server-Timing'])
+        self.assertIn('"queries": 2', logs.output[0])
+        self.assertIn('"endpoint": "/metrics"', logs.output[0])
+    
+    @override_settings(DB_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_pass_through(self):
+        """Test nothing is recorded when sampling is disabled"""
+        middleware = DBInstrumentationMiddleware(self.get_response)
+        response = middleware(RequestFactory().get('/metrics'))
+        
+        self.assertNotIn('Server-Timing', response)
+
+class DBConnectionMetricsTestCase(TestCase):
+    """Test database connection open and reuse counters"""
+    
+    def sample(self, name, **labels):
+        from prometheus_client import REGISTRY
+        return REGISTRY.get_sample_value(name, labels) or 0
+    
+    def test_connection_created_counted(self):
+        """Test opening a connection fires the connection_created receiver"""
+        before = self.sample('db_connections_opened_total', alias='default')
+        connection = connections.create_connection('default')
+        try:
+            connection.ensure_connection()
+        finally:
+            connection.close()
+        self.assertEqual(self.sample('db_connections_opened_total', alias='default'), before + 1)
+    
+    def test_request_on_open_connection_counted_as_reused(self):
+        """Test a request starting with an open connection counts as reused"""
+        get_user_model().objects.exists()
+        before = self.sample('db_connection_requests_total', alias='default', reused='true')
+        # Called directly: request_started would also run close_old_connections mid-test
+        db_connection_request_started(sender=None)
+        self.assertEqual(self.sample('db_connection_requests_total', alias='default', reused='true'), before + 1)
+
+def spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(100))
+
+@override_settings(PROFILER_MAX_SECONDS=1, PROFILER_MIN_INTERVAL_MS=5, PROFILER_MAX_STACKS=100)
+class ProfilerTestCase(SimpleTestCase):
+    """Test the on-demand stack sampler"""
+    
+    def test_collapsed_stacks_of_other_threads(self):
+        """Test busy threads show up in collapsed stacks and the caller does not"""
+        worker = threading.Thread(target=spin, args=(0.5,), name='spinner')
+        worker.start()
+        sampler = profile(0.3, 5)
+        worker.join()
+        
+        output = sampler.collapsed()
+        self.assertGreater(sampler.samples, 10)
+        self.assertRegex(output, r'(?m)^spinner;.*spin \(.*\) \d+$')
+        self.assertNotIn('test_collapsed_stacks_of_other_threads', output)
+    
+    def test_one_sampler_per_process(self):
+        """Test a second run is refused while one is in progress"""
+        sampler = start(0.2, 5, None)
+        with self.assertRaises(ProfilerBusy):
+            start(0.2, 5, None)
+        while not sampler.finished:
+            time.sleep(0.01)
+    
+    def test_endpoint_staff_only(self):
+        """Test non-staff users cannot start a profile"""
+        request = APIRequestFactory().get('/debug/profile', {'seconds': 0.1})
+        force_authenticate(request, user=get_user_model()(email='user@example.com', is_staff=False))
+        
+        self.assertEqual(views.profile(request).status_code, 403)
+    
+    def test_non_finite_durations_rejected(self):
+        """Test NaN and infinite durations are refused without taking the sampler"""
+        for seconds in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                clamp(seconds, 5)
+            with self.assertRaises(ValueError):
+                start(seconds, 5, None)
+        self.assertEqual(clamp(1000, 1), (1, 0.005))
+        
+        staff = get_user_model()(email='staff@example.com', is_staff=True)
+        request = APIRequestFactory().get('/debug/profile', {'seconds': 'nan'}, **{'wsgi.multithread': True})
+        force_authenticate(request, user=staff)
+        self.assertEqual(views.profile(request).status_code, 400)
+    
+    def test_endpoint_refused_in_sync_worker(self):
+        """Test a single-threaded WSGI worker is told to use SIGUSR2 instead"""
+        staff = get_user_model()(email='staff@example.com', is_staff=True)
+        request = APIRequestFactory().get('/debug/profile', {'seconds': 0.1}, **{'wsgi.multithread': False})
+        force_authenticate(request, user=staff)
+        self.assertEqual(views.profile(request).status_code, 409)
+        
+        request = APIRequestFactory().get('/debug/profile', {'seconds': 0.1}, **{'wsgi.multithread': True})
+        force_authenticate(request, user=staff)
+        response = views.profile(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Profile-Samples', response)
+
+@override_settings(OCCUPANCY_STALE_SECONDS=900)
+class VenueOccupancyTestCase(SimpleTestCase):
+    """Test venue occupancy totals shared through Redis"""
+    
+    def setUp(self):
+        self.store = VenueOccupancy(key_prefix='test-occupancy:')
+        self.addCleanup(self.store.clear)
+        venue = SimpleNamespace(venue_type_code='Coworking')
+        self.desk = SimpleNamespace(pk='desk', venue_id='venue-1', venue=venue, capacity=4)
+        self.room = SimpleNamespace(pk='room', venue_id='venue-1', venue=venue, capacity=6)
+        self.now = timezone.now()
+    
+    def samples(self):
+        return {
+            (sample.name, sample.labels['venue_id']): sample.value
+            for family in VenueOccupancyCollector(self.store).collect()
+            for sample in family.samples
+        }
+    
+    def test_readings_replace_previous_count(self):
+        """Test each space counts once in its venue's rate"""
+        self.store.record(self.desk, 2, self.now)
+        self.store.record(self.room, 3, self.now)
+        self.store.record(self.desk, 4, self.now + timedelta(seconds=1))
+        
+        samples = self.samples()
+        self.assertEqual(samples[('venue_occupancy_rate', 'venue-1')], 0.7)
+        self.assertEqual(samples[('venue_occupants', 'venue-1')], 7)
+    
+    def test_stale_reading_ignored(self):
+        """Test a reading older than the stored one does not change the totals"""
+        self.store.record(self.desk, 3, self.now)
+        
+        self.assertFalse(self.store.record(self.desk, 1, self.now - timedelta(seconds=1)))
+        self.assertEqual(self.store.venues()['venue-1']['occupied'], 3)
+    
+    def test_removed_space_leaves_totals(self):
+        """Test deleting a space subtracts its occupancy and capacity"""
+        self.store.record(self.desk, 2, self.now)
+        self.store.record(self.room, 3, self.now)
+        self.store.remove_space(self.room.pk)
+        
+        self.assertEqual(self.store.venues()['venue-1'], {'occupied': 2, 'capacity': 4, 'venue_type': 'Coworking'})
+    
+    def test_stale_readings_dropped(self):
+        """Test readings past OCCUPANCY_STALE_SECONDS leave the totals and the hash"""
+        self.store.record(self.desk, 2, self.now - timedelta(hours=1))
+        self.store.record(self.room, 3, self.now)
+        
+        self.assertEqual(self.store.venues()['venue-1'], {'occupied': 3, 'capacity': 6, 'venue_type': 'Coworking'})
+        self.assertFalse(self.store.client.hexists(self.store.spaces_key, 'desk'))
+        self.assertLessEqual(self.store.client.ttl(self.store.spaces_key), 900)
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+    
+    def log_message(self, *args):
+        pass
+
+class PooledSessionTestCase(SimpleTestCase):
+    """Test outbound sessions reuse connections and report it"""
+    
+    def setUp(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_port}/api/payments/process'
+    
+    def sample(self, name):
+        from prometheus_client import REGISTRY
+        return REGISTRY.get_sample_value(name, {'upstream': 'test_keepalive'}) or 0
+    
+    @override_settings(OUTBOUND_HTTP_CONNECT_TIMEOUT=1, OUTBOUND_HTTP_READ_TIMEOUT=2)
+    def test_connection_reused_across_calls(self):
+        """Test sequential calls share one connection and get default timeouts"""
+        session = get_session('test_keepalive')
+        requests_before = self.sample('outbound_http_requests_total')
+        opened_before = self.sample('outbound_http_connections_opened_total')
+        
+        for _ in range(3):
+            self.assertEqual(session.post(self.url, json={}).status_code, 200)
+        
+        self.assertEqual(session.get_adapter(self.url).timeout, (1, 2))
+        self.assertEqual(self.sample('outbound_http_requests_total') - requests_before, 3)
+        self.assertEqual(self.sample('outbound_http_connections_opened_total') - opened_before, 1)
+        self.assertEqual(self.sample('outbound_http_in_flight'), 0)
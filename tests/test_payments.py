@@ -1,6 +1,7 @@
 import os
 import pytest
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
 from django.utils import timezone
@@ -10,8 +11,9 @@ from unittest.mock import patch, MagicMock
 from apps.authentication.models import UserProfile
 from apps.venues.models import Venue, Space
 from apps.bookings.models import Booking
-from apps.payments.models import Payment, PaymentAuditLog
+from apps.payments.models import Payment, PaymentAuditLog, PaymentGatewayConfig
 from apps.payments.gateway import PaymentProcessor
+from apps.payments.registry import GATEWAY_CLASSES, GatewayRegistry
 
 User = get_user_model()
 
@@ -339,4 +341,64 @@ class PaymentSecurityTestCase(TestCase):
         # Verify data is encrypted in database
         payment.refresh_from_db()
         self.assertNotEqual(payment._encrypted_card_last4, '1234')
-        self.assertEqual(payment.card_last4, '1234')
\ No newline at end of file
+        self.assertEqual(payment.card_last4, '1234')
+
+@override_settings(PAYMENT_GATEWAY_CONFIG_CHECK_SECONDS=0)
+class GatewayRegistryTestCase(TestCase):
+    """Test gateway clients are built once per worker and rebuilt on config change"""
+    
+    def setUp(self):
+        self.config = PaymentGatewayConfig(
+            gateway_type='java_spring',
+            gateway_name='Spring',
+            endpoint_url='http://gateway.test'
+        )
+        self.config.api_key = 'first-key'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.save()
+        self.registry = GatewayRegistry(GATEWAY_CLASSES)
+    
+    def test_client_reused_without_queries(self):
+        """Test later lookups skip the config query and decryption"""
+        gateway = self.registry.get('java_spring')
+        
+        with self.assertNumQueries(0), patch('core.utils.encryption.encryption.decrypt') as decrypt:
+            self.assertIs(self.registry.get('java_spring'), gateway)
+        decrypt.assert_not_called()
+        self.assertEqual(gateway.headers['Authorization'], 'Bearer first-key')
+    
+    def test_config_change_rebuilds_client(self):
+        """Test a saved config stores a new version token and other registries reload"""
+        gateway = self.registry.get('java_spring')
+        
+        self.config.api_key = 'second-key'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.save()
+        
+        reloaded = self.registry.get('java_spring')
+        self.assertIsNot(reloaded, gateway)
+        self.assertEqual(reloaded.headers['Authorization'], 'Bearer second-key')
+    
+    def test_config_change_after_version_evicted(self):
+        """Test a config saved after the version key was evicted still reloads clients"""
+        gateway = self.registry.get('java_spring')
+        cache.delete(GatewayRegistry.version_key)
+        
+        self.config.api_key = 'second-key'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.save()
+        
+        self.assertIsNot(self.registry.get('java_spring'), gateway)
+    
+    def test_cache_error_keeps_clients(self):
+        """Test an unreachable cache leaves the loaded clients in use"""
+        gateway = self.registry.get('java_spring')
+        
+        with patch('apps.payments.registry.cache.get', side_effect=ConnectionError), \
+                self.assertLogs('apps.payments.registry', 'WARNING'):
+            self.assertIs(self.registry.get('java_spring'), gateway)
+    
+    def test_unknown_gateway_rejected(self):
+        """Test gateway types without a client class raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.registry.get('mpesa')
@@ -0,0 +1,159 @@
+"""Query and latency budgets for list and search endpoints
+
+Each endpoint is called with several rows in place, so a serializer that
+touches a relation per row blows its budget instead of passing quietly.
+"""
+
+from datetime import timedelta
+import pytest
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+from apps.authentication.models import UserProfile
+from apps.bookings.models import Booking, BookingParticipant, BookingPolicy
+from apps.iot.models import IoTSensor, OccupancyEvent, SensorData
+from apps.payments.models import Payment, PaymentAuditLog
+from apps.venues.models import Space, Venue
+
+# Replica-routed views read through the replica aliases when configured
+pytestmark = pytest.mark.django_db(databases='__all__')
+
+ROWS = 5
+
+@pytest.fixture
+def catalog(test_user):
+    UserProfile.objects.create(user=test_user, full_name='Budget User', user_type_code='Individual')
+    venues, spaces = [], []
+    for i in range(ROWS):
+        venue = Venue.objects.create(
+            venue_name=f'Budget Venue {i}',
+            venue_type_code='CoworkingHub',
+            address=f'{i} Budget St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060 + i * 0.001, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly'
+        )
+        venues.append(venue)
+        spaces.append(Space.objects.create(
+            venue=venue,
+            space_name=f'Desk {i}',
+            capacity=4,
+            hourly_rate=20,
+            space_type_code='SharedDesk'
+        ))
+    
+    start = timezone.now() + timedelta(days=7)
+    bookings = []
+    for i, space in enumerate(spaces):
+        booking = Booking.objects.create(
+            user=test_user,
+            venue=space.venue,
+            space=space,
+            booking_start_time=start + timedelta(hours=i),
+            booking_end_time=start + timedelta(hours=i + 1),
+            booking_status_code='Confirmed',
+            payment_status_code='Paid',
+            total_price=20
+        )
+        BookingParticipant.objects.create(booking=booking, guest_email=f'guest{i}@example.com')
+        BookingPolicy.objects.create(venue=space.venue, policy_type='max_duration', policy_value={'hours': 8})
+        bookings.append(booking)
+    
+    payments = [
+        Payment.objects.create(
+            booking=booking,
+            amount=20,
+            payment_method_code='Card',
+            status_code='Paid'
+        )
+        for booking in bookings
+    ]
+    for payment in payments[:1]:
+        for _ in range(ROWS):
+            PaymentAuditLog.objects.create(
+                payment=payment,
+                action_type='CAPTURED',
+                performed_by_user=test_user,
+                amount=20
+            )
+    
+    sensor = None
+    for i, space in enumerate(spaces):
+        sensor = IoTSensor.objects.create(
+            sensor_external_id=f'budget-sensor-{i}',
+            venue=space.venue,
+            space=space,
+            sensor_type='occupancy',
+            location_description='Entrance'
+        )
+    now = timezone.now()
+    for i in range(ROWS):
+        SensorData.objects.create(sensor=sensor, timestamp=now - timedelta(minutes=i), value=i, unit='people')
+        OccupancyEvent.objects.create(
+            space=spaces[0],
+            event_type='entry',
+            occupancy_count=i,
+            timestamp=now - timedelta(minutes=i),
+            booking=bookings[0]
+        )
+    
+    return {'venues': venues, 'spaces': spaces, 'payments': payments, 'sensor': sensor}
+
+def endpoint_cases(catalog):
+    """(method, url, body, max queries); one query of headroom covers a replica lag probe"""
+    venue = catalog['venues'][0]
+    search = {'latitude': 40.7128, 'longitude': -74.0060, 'radius_km': 5}
+    return [
+        ('get', '/api/v1/bookings/', None, 5),
+        ('get', '/api/v1/bookings/policies/', None, 3),
+        ('get', '/api/v1/payments/', None, 3),
+        ('get', f"/api/v1/payments/{catalog['payments'][0].payment_id}/audit/", None, 3),
+        ('get', '/api/v1/venues/', None, 3),
+        ('get', '/api/v1/venues/?include=spaces', None, 4),
+        ('post', '/api/v1/venues/search/', search, 3),
+        ('post', '/api/v1/venues/search/batch/', {'queries': [dict(search, id='a'), dict(search, id='b')]}, 3),
+        ('get', '/api/v1/venues/autocomplete/?q=Budget', None, 3),
+        ('get', f'/api/v1/venues/{venue.venue_id}/spaces/', None, 3),
+        ('get', '/api/v1/iot/sensors/', None, 3),
+        ('get', f"/api/v1/iot/sensors/{catalog['sensor'].sensor_id}/data/", None, 3),
+        ('get', f"/api/v1/iot/spaces/{catalog['spaces'][0].space_id}/events/", None, 3),
+    ]
+
+def test_list_and_search_endpoints_within_budget(authenticated_client, catalog, query_budget):
+    """Test every list and search endpoint stays within its query and time budget"""
+    failures = []
+    for method, url, body, max_queries in endpoint_cases(catalog):
+        try:
+            with query_budget(max_queries=max_queries, max_seconds=1.0):
+                if method == 'post':
+                    response = authenticated_client.post(url, body, format='json')
+                else:
+                    response = authenticated_client.get(url)
+        except AssertionError as e:
+            failures.append(f'{method.upper()} {url}: {e}')
+            continue
+        assert response.status_code == 200, f'{method.upper()} {url}: {response.status_code}'
+    
+    assert not failures, '\n\n'.join(failures)
+
+def test_booking_list_queries_do_not_grow_with_rows(authenticated_client, catalog, test_user, query_budget):
+    """Test doubling the bookings listed adds no queries"""
+    with query_budget(max_queries=ROWS * 2) as small:
+        authenticated_client.get('/api/v1/bookings/')
+    
+    start = timezone.now() + timedelta(days=30)
+    for i, space in enumerate(catalog['spaces']):
+        Booking.objects.create(
+            user=test_user,
+            venue=space.venue,
+            space=space,
+            booking_start_time=start + timedelta(hours=i),
+            booking_end_time=start + timedelta(hours=i + 1),
+            booking_status_code='Pending',
+            payment_status_code='Pending',
+            total_price=20
+        )
+    
+    with query_budget(max_queries=small.query_count):
+        authenticated_client.get('/api/v1/bookings/')
\ No newline at end of file
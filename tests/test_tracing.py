@@ -0,0 +1,87 @@
+import re
+from django.conf import settings
+from django.test import SimpleTestCase
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from core.tracing import mark_failed
+from core.tracing.sampling import TailSamplingProcessor
+
+class TailSamplingTestCase(SimpleTestCase):
+    """Test whole traces are kept or dropped once their root ends"""
+    
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.sampler = TailSamplingProcessor(
+            SimpleSpanProcessor(self.exporter), latency_threshold=60, sample_rate=0.0, max_traces=2
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(self.sampler)
+        self.tracer = provider.get_tracer(__name__)
+    
+    def exported(self):
+        return sorted(span.name for span in self.exporter.get_finished_spans())
+    
+    def test_fast_successful_trace_dropped(self):
+        """Test a quick trace without errors is not exported at a zero sample rate"""
+        with self.tracer.start_as_current_span('request'):
+            with self.tracer.start_as_current_span('query'):
+                pass
+        
+        self.assertEqual(self.exported(), [])
+        self.assertEqual(len(self.sampler._traces), 0)
+    
+    def test_failed_child_keeps_whole_trace(self):
+        """Test an error anywhere in a trace exports all of its spans"""
+        with self.tracer.start_as_current_span('request'):
+            with self.tracer.start_as_current_span('payment'):
+                mark_failed('Card declined')
+            with self.tracer.start_as_current_span('query'):
+                pass
+            # Nothing leaves before the root has ended
+            self.assertEqual(self.exported(), [])
+        
+        self.assertEqual(self.exported(), ['payment', 'query', 'request'])
+    
+    def test_slow_trace_kept(self):
+        """Test a trace over the latency threshold is exported"""
+        self.sampler.latency_threshold_ns = 0
+        with self.tracer.start_as_current_span('request'):
+            pass
+        
+        self.assertEqual(self.exported(), ['request'])
+    
+    def test_unfinished_traces_bounded(self):
+        """Test the oldest unfinished trace is dropped past max_traces"""
+        roots = [self.tracer.start_span(f'request-{i}') for i in range(3)]
+        for root in roots:
+            with trace.use_span(root, end_on_exit=False):
+                self.tracer.start_span('query').end()
+        
+        self.assertEqual(len(self.sampler._traces), 2)
+        self.assertEqual(self.sampler.dropped_traces, 1)
+    
+    def test_late_span_follows_trace_decision(self):
+        """Test a span ending after its root is exported or dropped with its trace, not buffered"""
+        self.sampler.latency_threshold_ns = 0
+        with self.tracer.start_as_current_span('request'):
+            kept_task = self.tracer.start_span('kept-task')
+        kept_task.end()
+        
+        self.sampler.latency_threshold_ns = 60 * 10**9
+        with self.tracer.start_as_current_span('request'):
+            dropped_task = self.tracer.start_span('dropped-task')
+        dropped_task.end()
+        
+        self.assertEqual(self.exported(), ['kept-task', 'request'])
+        self.assertEqual(len(self.sampler._traces), 0)
+    
+    def test_excluded_urls_anchored(self):
+        """Test the default exclusions match the health and metrics paths only"""
+        patterns = re.compile('|'.join(settings.TRACING_EXCLUDED_URLS.split(',')))
+        
+        self.assertTrue(patterns.search('http://web:8000/metrics'))
+        self.assertTrue(patterns.search('https://api.example.com/health/'))
+        self.assertFalse(patterns.search('https://api.example.com/api/v1/venues/metrics'))
+        self.assertFalse(patterns.search('https://api.example.com/api/v1/health/metrics'))
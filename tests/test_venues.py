@@ -1,11 +1,27 @@
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
 import pytest
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from apps.authentication.models import UserProfile
-from apps.venues.models import Venue, Space
+from apps.venues.models import Venue, Space, VenuePopularity
+from apps.venues.cache import space_state_cache
+from apps.venues.importer import VenueImporter
+from apps.venues.ranking import popularity_score
+from apps.bookings.models import Booking
+from apps.iot.models import IoTSensor, OccupancyEvent
+from apps.iot.views import process_occupancy_data
+from apps.reviews.models import VenueRating
 
 User = get_user_model()
 
@@ -114,6 +130,161 @@ class VenueTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['venue_type_code'], 'CoworkingHub')
+    
+    def test_venue_list_sparse_fields(self):
+        """Test list omits spaces unless included and honors ?fields="""
+        venue = Venue.objects.create(
+            venue_name='Sparse Venue',
+            venue_type_code='CoworkingHub',
+            address='1 Sparse St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly',
+            owner_user=self.partner_user
+        )
+        Space.objects.create(venue=venue, space_name='Desk', capacity=1, hourly_rate=10.00)
+        
+        response = self.client.get('/api/v1/venues/', {'fields': 'venue_name,city'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        properties = response.data['results']['features'][0]['properties']
+        self.assertEqual(set(properties), {'venue_name', 'city'})
+        
+        response = self.client.get('/api/v1/venues/', {'include': 'spaces'})
+        properties = response.data['results']['features'][0]['properties']
+        self.assertEqual(len(properties['spaces']), 1)
+        
+        response = self.client.get('/api/v1/venues/')
+        properties = response.data['results']['features'][0]['properties']
+        self.assertNotIn('spaces', properties)
+    
+    def test_venue_autocomplete(self):
+        """Test typeahead ranks venue name prefixes ahead of city matches"""
+        for name, city in [('Harbor Hub', 'Boston'), ('Desk Co', 'Harborview')]:
+            Venue.objects.create(
+                venue_name=name,
+                venue_type_code='CoworkingHub',
+                address='1 Main St',
+                city=city,
+                country_code='US',
+                location=Point(-74.0060, 40.7128),
+                operating_hours_json={'monday': '9:00-18:00'},
+                pricing_model='hourly'
+            )
+        
+        response = self.client.get('/api/v1/venues/autocomplete/', {'q': 'harb'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [row['venue_name'] for row in response.data['results']]
+        self.assertEqual(names, ['Harbor Hub', 'Desk Co'])
+    
+    def test_venue_autocomplete_invalidated_on_save(self):
+        """Test a saved venue moves autocomplete to a fresh cache generation"""
+        venue = Venue.objects.create(
+            venue_name='Harbor Hub',
+            venue_type_code='CoworkingHub',
+            address='1 Main St',
+            city='Boston',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly'
+        )
+        self.client.get('/api/v1/venues/autocomplete/', {'q': 'harb'})
+        
+        venue.venue_name = 'Harbor House'
+        venue.save()
+        
+        response = self.client.get('/api/v1/venues/autocomplete/', {'q': 'harb'})
+        names = [row['venue_name'] for row in response.data['results']]
+        self.assertEqual(names, ['Harbor House'])
+    
+    def test_venue_batch_search(self):
+        """Test batch search answers each query independently by id"""
+        for name, venue_type, location in [
+            ('Manhattan Hub', 'CoworkingHub', Point(-74.0060, 40.7128)),
+            ('Boston Cafe', 'CoffeeShop', Point(-71.0589, 42.3601)),
+        ]:
+            Venue.objects.create(
+                venue_name=name,
+                venue_type_code=venue_type,
+                address='1 Main St',
+                city='Test City',
+                country_code='US',
+                location=location,
+                operating_hours_json={'monday': '9:00-18:00'},
+                pricing_model='hourly'
+            )
+        
+        batch_data = {
+            'queries': [
+                {'id': 'nyc', 'latitude': 40.7128, 'longitude': -74.0060, 'radius_km': 5.0},
+                {'id': 'bos', 'latitude': 42.3601, 'longitude': -71.0589, 'radius_km': 5.0,
+                 'venue_type': 'CoworkingHub'},
+            ]
+        }
+        response = self.client.post('/api/v1/venues/search/batch/', batch_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [feature['properties']['venue_name'] for feature in results['nyc']['features']],
+            ['Manhattan Hub']
+        )
+        self.assertEqual(results['bos']['features'], [])
+    
+    def test_venue_detail_conditional_get(self):
+        """Test unchanged venue detail answers 304 to If-None-Match"""
+        venue = Venue.objects.create(
+            venue_name='Cached Venue',
+            venue_type_code='CoworkingHub',
+            address='1 Cache St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly',
+            owner_user=self.partner_user
+        )
+        url = f'/api/v1/venues/{venue.venue_id}/'
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        Space.objects.create(venue=venue, space_name='New Desk', capacity=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_venue_detail_modified_after_space_deleted(self):
+        """Test deleting a space moves the venue's Last-Modified"""
+        venue = Venue.objects.create(
+            venue_name='Cached Venue',
+            venue_type_code='CoworkingHub',
+            address='1 Cache St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly',
+            owner_user=self.partner_user
+        )
+        space = Space.objects.create(venue=venue, space_name='Old Desk', capacity=1)
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Venue.objects.filter(pk=venue.pk).update(updated_at=an_hour_ago)
+        Space.objects.filter(pk=space.pk).update(updated_at=an_hour_ago)
+        url = f'/api/v1/venues/{venue.venue_id}/'
+        
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        space.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 class SpaceTestCase(TestCase):
     """Test space management"""
@@ -211,4 +382,452 @@ class SpaceTestCase(TestCase):
         # Verify update
         space.refresh_from_db()
         self.assertEqual(float(space.hourly_rate), 18.00)
-        self.assertEqual(space.capacity, 3)
\ No newline at end of file
+        self.assertEqual(space.capacity, 3)
+    
+    def test_space_summary_denormalized_on_venue(self):
+        """Test venue summary columns track space changes"""
+        Space.objects.create(
+            venue=self.venue,
+            space_name='Desk 1',
+            capacity=1,
+            hourly_rate=10.00,
+            space_type_code='SharedDesk'
+        )
+        room = Space.objects.create(
+            venue=self.venue,
+            space_name='Room 1',
+            capacity=6,
+            hourly_rate=30.00,
+            space_type_code='PrivateRoom'
+        )
+        
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.space_count, 2)
+        self.assertEqual(self.venue.max_space_capacity, 6)
+        self.assertEqual(float(self.venue.min_hourly_rate), 10.00)
+        self.assertEqual(self.venue.space_types, ['PrivateRoom', 'SharedDesk'])
+        
+        room.delete()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.space_count, 1)
+        self.assertEqual(self.venue.max_space_capacity, 1)
+    
+    def test_space_moved_refreshes_both_venues(self):
+        """Test moving a space to another venue updates the summaries of both"""
+        other_venue = Venue.objects.create(
+            venue_name='Other Venue',
+            venue_type_code='CoworkingHub',
+            address='456 Test St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={},
+            pricing_model='hourly',
+            owner_user=self.partner_user
+        )
+        room = Space.objects.create(
+            venue=self.venue,
+            space_name='Room 1',
+            capacity=6,
+            hourly_rate=30.00,
+            space_type_code='PrivateRoom'
+        )
+        
+        room.venue = other_venue
+        room.save()
+        
+        self.venue.refresh_from_db()
+        other_venue.refresh_from_db()
+        self.assertEqual((self.venue.space_count, self.venue.max_space_capacity, self.venue.space_types), (0, 0, []))
+        self.assertEqual((other_venue.space_count, other_venue.max_space_capacity), (1, 6))
+    
+    def test_venue_delete_skips_per_space_refresh(self):
+        """Test deleting a venue drops its spaces' cached state without refreshing per space"""
+        spaces = [
+            Space.objects.create(venue=self.venue, space_name=f'Desk {i}', capacity=1, hourly_rate=10.00)
+            for i in range(3)
+        ]
+        space_ids = [space.space_id for space in spaces]
+        space_state_cache.get_many(space_ids)
+        
+        with patch('apps.venues.signals.refresh_space_summaries') as refresh, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.venue.delete()
+        
+        refresh.assert_not_called()
+        space_state_cache.clear_local()
+        self.assertEqual(space_state_cache.get_many(space_ids), {})
+    
+    def test_search_capacity_filter_uses_summary(self):
+        """Test min_capacity search matches venues through summary columns"""
+        Space.objects.create(
+            venue=self.venue,
+            space_name='Boardroom',
+            capacity=12,
+            hourly_rate=50.00,
+            space_type_code='Boardroom'
+        )
+        
+        search_data = {
+            'latitude': 40.7128,
+            'longitude': -74.0060,
+            'radius_km': 5.0,
+            'min_capacity': 10
+        }
+        response = self.client.post('/api/v1/venues/search/', search_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['features']), 1)
+        
+        search_data['min_capacity'] = 20
+        response = self.client.post('/api/v1/venues/search/', search_data)
+        self.assertEqual(len(response.data['features']), 0)
+    
+    def test_space_state_cache_write_through(self):
+        """Test cached space state follows saves and occupancy readings"""
+        space = Space.objects.create(
+            venue=self.venue,
+            space_name='Desk 1',
+            capacity=1,
+            hourly_rate=10.00,
+            space_type_code='SharedDesk'
+        )
+        space_id = space.space_id
+        space_state_cache.update_occupancy(space, 1, timezone.now())
+        # An older reading without a UTC offset is compared, and ignored, like any other
+        space_state_cache.update_occupancy(space, 5, timezone.now().replace(tzinfo=None) - timedelta(days=1))
+        
+        space.availability_status = 'Maintenance'
+        with self.captureOnCommitCallbacks(execute=True):
+            space.save()
+        
+        state = space_state_cache.get_many([space_id])[str(space_id)]
+        self.assertEqual(state['availability_status'], 'Maintenance')
+        self.assertEqual(state['current_occupancy'], 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            space.delete()
+        space_state_cache.clear_local()
+        self.assertIsNone(space_state_cache.get(space_id))
+    
+    def test_occupancy_reading_cached_after_commit(self):
+        """Test a webhook reading reaches the space cache only once its transaction commits"""
+        space = Space.objects.create(venue=self.venue, space_name='Desk 1', capacity=4, hourly_rate=10.00)
+        sensor = IoTSensor.objects.create(
+            sensor_external_id='occupancy-1',
+            venue=self.venue,
+            space=space,
+            sensor_type='occupancy',
+            location_description='Door'
+        )
+        self.assertIsNone(space_state_cache.get(space.space_id)['current_occupancy'])
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            process_occupancy_data(sensor, 3, timezone.now(), {})
+        space_state_cache.clear_local()
+        self.assertIsNone(space_state_cache.get(space.space_id)['current_occupancy'])
+        
+        for callback in callbacks:
+            callback()
+        space_state_cache.clear_local()
+        self.assertEqual(space_state_cache.get(space.space_id)['current_occupancy'], 3)
+
+class OperatingHoursTestCase(TestCase):
+    """Test operating hours normalization"""
+    
+    def test_parse_operating_hours(self):
+        """Test free-form hours become minute-of-week intervals"""
+        from apps.venues.hours import parse_operating_hours
+        
+        self.assertEqual(parse_operating_hours({'monday': '9:00-18:00'}), [(540, 1080)])
+        self.assertEqual(parse_operating_hours({'saturday': 'closed', 'notes': 'n/a'}), [])
+        self.assertEqual(
+            parse_operating_hours({'sunday': '22:00-02:00'}),
+            [(0, 120), (9960, 10080)]
+        )
+    
+    def test_opening_intervals_synced_on_save(self):
+        """Test venue save writes normalized intervals"""
+        venue = Venue.objects.create(
+            venue_name='Hours Venue',
+            venue_type_code='CoffeeShop',
+            address='1 Hours St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, 40.7128),
+            operating_hours_json={'weekdays': '8:00-20:00'},
+            pricing_model='hourly'
+        )
+        self.assertEqual(venue.opening_intervals.count(), 5)
+        
+        venue.operating_hours_json = {'daily': '24h'}
+        venue.save()
+        self.assertEqual(venue.opening_intervals.count(), 1)
+
+IMPORT_CSV_HEADER = (
+    'venue_name,venue_type_code,address,city,country_code,latitude,longitude,'
+    'pricing_model,space_name,capacity,hourly_rate,space_type_code\n'
+)
+
+class VenueImportTestCase(TestCase):
+    """Test bulk venue import from partner files"""
+    
+    def setUp(self):
+        self.partner_user = User.objects.create_user(
+            username='partner@venue.com',
+            email='partner@venue.com',
+            password='partnerpass123'
+        )
+        self.other_partner = User.objects.create_user(
+            username='other@venue.com',
+            email='other@venue.com',
+            password='partnerpass123'
+        )
+        self.staff_user = User.objects.create_user(
+            username='staff@venue.com',
+            email='staff@venue.com',
+            password='staffpass123',
+            is_staff=True
+        )
+    
+    def csv_file(self, *rows):
+        return io.StringIO(IMPORT_CSV_HEADER + ''.join(f'{row}\n' for row in rows))
+    
+    def test_reimport_updates_in_place(self):
+        """Test importing the same file twice upserts rather than duplicating"""
+        rows = (
+            'Harbor Hub,CoworkingHub,1 Main St,Boston,us,42.36,-71.05,hourly,Desk 1,1,10.00,SharedDesk',
+            'Harbor Hub,CoworkingHub,1 Main St,Boston,us,42.36,-71.05,hourly,Room A,6,40.00,Boardroom',
+        )
+        report = VenueImporter(owner=self.partner_user).run(self.csv_file(*rows), 'csv')
+        self.assertEqual((report['rows_imported'], report['errors']), (2, []))
+        
+        rows = (rows[0].replace('10.00', '12.00'),)
+        VenueImporter(owner=self.partner_user).run(self.csv_file(*rows), 'csv')
+        
+        venue = Venue.objects.get(venue_name='Harbor Hub')
+        self.assertEqual(venue.owner_user, self.partner_user)
+        self.assertEqual(venue.country_code, 'US')
+        self.assertEqual(venue.spaces.count(), 2)
+        self.assertEqual(float(venue.spaces.get(space_name='Desk 1').hourly_rate), 12.00)
+    
+    def test_other_owners_venue_not_updated(self):
+        """Test an explicit venue_id owned by another partner is reported, not taken over"""
+        venue = Venue.objects.create(
+            venue_name='Their Venue',
+            venue_type_code='CoworkingHub',
+            owner_user=self.other_partner,
+            address='2 Side St',
+            city='Boston',
+            country_code='US',
+            location=Point(-71.05, 42.36),
+            operating_hours_json={},
+            pricing_model='hourly'
+        )
+        stream = io.StringIO(
+            'venue_id,venue_name,venue_type_code,address,city,country_code,latitude,longitude,pricing_model\n'
+            f'{venue.venue_id},Taken Over,CoworkingHub,2 Side St,Boston,US,42.36,-71.05,hourly\n'
+        )
+        
+        report = VenueImporter(owner=self.partner_user).run(stream, 'csv')
+        
+        self.assertEqual(report['rows_imported'], 0)
+        self.assertEqual(report['errors'][0]['row'], 2)
+        venue.refresh_from_db()
+        self.assertEqual((venue.venue_name, venue.owner_user), ('Their Venue', self.other_partner))
+    
+    def test_malformed_csv_reported(self):
+        """Test a CSV the parser rejects becomes a file error instead of an exception"""
+        stream = self.csv_file(
+            'Harbor Hub,CoworkingHub,1 Main St,Boston,US,42.36,-71.05,hourly,,,,',
+            'x' * 200000,
+        )
+        
+        report = VenueImporter(owner=self.partner_user).run(stream, 'csv')
+        
+        self.assertEqual(report['rows_imported'], 1)
+        self.assertIn('file', report['errors'][0]['errors'])
+        self.assertTrue(Venue.objects.filter(venue_name='Harbor Hub').exists())
+    
+    def test_malformed_geojsonl_line_reported(self):
+        """Test a bad GeoJSON line is reported on its row and the lines after it still import"""
+        feature = json.dumps({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [-71.05, 42.36]},
+            'properties': {
+                'venue_name': 'Harbor Hub',
+                'venue_type_code': 'CoworkingHub',
+                'address': '1 Main St',
+                'city': 'Boston',
+                'country_code': 'US',
+                'pricing_model': 'hourly',
+            },
+        })
+        stream = io.StringIO(f'{{"type": "Feature", "geometry":\n{feature}\n')
+        
+        report = VenueImporter(owner=self.partner_user).run(stream, 'geojsonl')
+        
+        self.assertEqual((report['rows_total'], report['rows_imported']), (2, 1))
+        self.assertEqual(report['errors'][0]['row'], 1)
+        self.assertTrue(Venue.objects.filter(venue_name='Harbor Hub').exists())
+    
+    def test_truncated_geojson_reported(self):
+        """Test a GeoJSON document cut off mid-feature keeps the features before it"""
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [-71.05, 42.36]},
+            'properties': {
+                'venue_name': 'Harbor Hub',
+                'venue_type_code': 'CoworkingHub',
+                'address': '1 Main St',
+                'city': 'Boston',
+                'country_code': 'US',
+                'pricing_model': 'hourly',
+            },
+        }
+        document = json.dumps({'type': 'FeatureCollection', 'features': [feature, feature]})
+        stream = io.StringIO(document[:len(document) - 40])
+        
+        report = VenueImporter(owner=self.partner_user).run(stream, 'geojson')
+        
+        self.assertEqual(report['rows_imported'], 1)
+        self.assertEqual(report['errors'][0]['row'], 2)
+        self.assertIn('file', report['errors'][0]['errors'])
+        self.assertTrue(Venue.objects.filter(venue_name='Harbor Hub').exists())
+    
+    def test_reimport_matches_existing_spaces_by_name(self):
+        """Test an imported space updates a same-named space created outside the import"""
+        row = 'Harbor Hub,CoworkingHub,1 Main St,Boston,US,42.36,-71.05,hourly,,,,'
+        VenueImporter(owner=self.partner_user).run(self.csv_file(row), 'csv')
+        venue = Venue.objects.get(venue_name='Harbor Hub')
+        space = Space.objects.create(venue=venue, space_name='Desk 1', capacity=1, hourly_rate=10.00)
+        
+        row = 'Harbor Hub,CoworkingHub,1 Main St,Boston,US,42.36,-71.05,hourly,Desk 1,2,15.00,SharedDesk'
+        report = VenueImporter(owner=self.partner_user).run(self.csv_file(row), 'csv')
+        
+        self.assertEqual(report['errors'], [])
+        self.assertEqual(list(venue.spaces.values_list('space_id', flat=True)), [space.space_id])
+        space.refresh_from_db()
+        self.assertEqual((space.capacity, float(space.hourly_rate)), (2, 15.00))
+    
+    def test_import_command(self):
+        """Test the management command imports a file for the given owner"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(IMPORT_CSV_HEADER)
+            handle.write('Harbor Hub,CoworkingHub,1 Main St,Boston,US,42.36,-71.05,hourly,Desk 1,1,10.00,SharedDesk\n')
+        self.addCleanup(os.remove, handle.name)
+        out = io.StringIO()
+        
+        call_command('import_venues', handle.name, '--owner-email', 'partner@venue.com', stdout=out)
+        
+        self.assertEqual(json.loads(out.getvalue())['venues_upserted'], 1)
+        self.assertEqual(Venue.objects.get(venue_name='Harbor Hub').owner_user, self.partner_user)
+    
+    def test_upload_endpoint_staff_only(self):
+        """Test uploads are imported for staff and refused for partners"""
+        client = APIClient()
+        upload = {
+            'format': 'csv',
+            'dry_run': True,
+        }
+        
+        client.force_authenticate(user=self.partner_user)
+        upload['file'] = SimpleUploadedFile('venues.csv', IMPORT_CSV_HEADER.encode())
+        self.assertEqual(client.post('/api/v1/venues/import/', upload).status_code, status.HTTP_403_FORBIDDEN)
+        
+        client.force_authenticate(user=self.staff_user)
+        upload['file'] = SimpleUploadedFile(
+            'venues.csv',
+            (IMPORT_CSV_HEADER + 'Harbor Hub,CoworkingHub,1 Main St,Boston,US,42.36,-71.05,hourly,,,,\n').encode()
+        )
+        response = client.post('/api/v1/venues/import/', upload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows_imported'], 1)
+        self.assertFalse(Venue.objects.filter(venue_name='Harbor Hub').exists())
+
+
+class VenuePopularityTestCase(TestCase):
+    """Test precomputed popularity and popularity-ranked search"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='ranker@example.com',
+            email='ranker@example.com',
+            password='rankerpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def create_venue(self, name, latitude=40.7128):
+        return Venue.objects.create(
+            venue_name=name,
+            venue_type_code='CoworkingHub',
+            address='1 Rank St',
+            city='Test City',
+            country_code='US',
+            location=Point(-74.0060, latitude),
+            operating_hours_json={'monday': '9:00-18:00'},
+            pricing_model='hourly'
+        )
+    
+    def test_popularity_score(self):
+        """Test signals are normalized and blended by weight"""
+        self.assertEqual(popularity_score(0, 0, None, None), 0.0)
+        self.assertAlmostEqual(popularity_score(10, 10, 5, 1.0), 1.0)
+        self.assertAlmostEqual(popularity_score(0, 10, 4, 0.0), 0.3 * 0.8)
+        # Occupancy over capacity is clamped, and bookings are log-scaled against the busiest venue
+        self.assertAlmostEqual(popularity_score(0, 10, 0, 1.5), 0.2)
+        self.assertGreater(popularity_score(3, 10, 0, 0), 0.5 * 3 / 10)
+    
+    def test_refresh_command_upserts(self):
+        """Test the refresh command fills, updates and prunes venue_popularity"""
+        busy = self.create_venue('Busy Venue')
+        rated = self.create_venue('Rated Venue')
+        space = Space.objects.create(venue=busy, space_name='Desk', capacity=4)
+        start = timezone.now() + timedelta(days=1)
+        for i in range(2):
+            Booking.objects.create(
+                user=self.user,
+                venue=busy,
+                space=space,
+                booking_start_time=start + timedelta(hours=i),
+                booking_end_time=start + timedelta(hours=i + 1),
+                booking_status_code='Confirmed',
+                payment_status_code='Paid'
+            )
+        OccupancyEvent.objects.create(
+            space=space,
+            event_type='occupancy_change',
+            occupancy_count=3,
+            timestamp=timezone.now()
+        )
+        VenueRating.objects.create(venue=rated, average_overall_rating=4)
+        
+        call_command('refresh_venue_popularity', stdout=io.StringIO())
+        popularity = VenuePopularity.objects.get(venue=busy)
+        self.assertEqual(popularity.recent_bookings, 2)
+        self.assertAlmostEqual(popularity.occupancy_rate, 0.75)
+        self.assertAlmostEqual(popularity.popularity_score, 0.5 + 0.2 * 0.75)
+        self.assertAlmostEqual(VenuePopularity.objects.get(venue=rated).popularity_score, 0.3 * 0.8)
+        
+        rated.active_flag = False
+        rated.save()
+        call_command('refresh_venue_popularity', stdout=io.StringIO())
+        self.assertEqual(list(VenuePopularity.objects.values_list('venue_id', flat=True)), [busy.venue_id])
+        self.assertGreater(VenuePopularity.objects.get(venue=busy).refreshed_at, popularity.refreshed_at)
+    
+    def test_search_ranking_popular(self):
+        """Test ranking=popular lets a popular venue outrank a closer one"""
+        near = self.create_venue('Near Venue')
+        far = self.create_venue('Far Venue', latitude=40.7308)
+        now = timezone.now()
+        VenuePopularity.objects.create(venue=near, popularity_score=0.0, refreshed_at=now)
+        VenuePopularity.objects.create(venue=far, popularity_score=1.0, refreshed_at=now)
+        search_data = {'latitude': 40.7128, 'longitude': -74.0060, 'radius_km': 5.0}
+        
+        for ranking, expected in (('distance', ['Near Venue', 'Far Venue']), ('popular', ['Far Venue', 'Near Venue'])):
+            response = self.client.post('/api/v1/venues/search/', {**search_data, 'ranking': ranking})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [feature['properties']['venue_name'] for feature in response.data['features']],
+                expected
+            )
\ No newline at end of file